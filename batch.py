@@ -0,0 +1,109 @@
+import csv
+import json
+import traceback
+
+from result_cache import ResultCache
+from solver_server import parse_request, solve_request
+
+# Request fields; CSV input uses them as its header
+FIELDS = ['id', 'command', 'limit', 'items', 'company', 'algorithm', 'budget_ms', 'time_limit_ms', 'epsilon']
+
+class MalformedLine:
+    """A JSONL line that does not parse, kept in place of its request so the rest of the batch still runs."""
+    
+    def __init__(self, line, error):
+        self.line = line
+        self.error = error
+
+def parse_csv_value(field, value):
+    if value is None or value.strip() == '':
+        return None
+    if field in ('limit', 'budget_ms', 'time_limit_ms', 'epsilon'):
+        number = float(value)
+        return int(number) if number.is_integer() else number
+    if field == 'items':
+        return int(value)
+    return value
+
+def read_requests(file, fmt='jsonl'):
+    """Read solve requests (dicts shaped like solver server payloads) from JSONL or CSV.
+    
+    A JSONL line that is not valid JSON becomes a MalformedLine, which
+    solve_one answers with its line number and the parse error.
+    """
+    if fmt == 'csv':
+        requests = []
+        for row in csv.DictReader(file):
+            request = {}
+            for field, value in row.items():
+                try:
+                    request[field] = parse_csv_value(field, value)
+                except ValueError:
+                    # Left as text, so the request fails validation with its own error
+                    request[field] = value
+            requests.append(request)
+        return requests
+    requests = []
+    for number, line in enumerate(file, 1):
+        if not line.strip():
+            continue
+        try:
+            requests.append(json.loads(line))
+        except ValueError as e:
+            requests.append(MalformedLine(number, str(e)))
+    return requests
+
+def group_key(request):
+    """Requests sharing this key can be answered from one solver table; None for an invalid request.
+    
+    Requests are checked here, before any is solved, so one of the wrong shape
+    fails alone when solved instead of stopping the batch while it is grouped.
+    """
+    try:
+        fields = parse_request(request)
+    except (ValueError, TypeError):
+        return None
+    return fields['command'], (fields['company'] or '').lower(), fields['algorithm']
+
+def solve_order(requests):
+    """Indexes of requests grouped by (command, company, algorithm), largest problems first.
+    
+    Within a group the largest item limit and calorie limit come first, so the
+    DP table built for them answers every smaller limit in the group by
+    backtracking alone.
+    """
+    def size(limit):
+        return limit if isinstance(limit, (int, float)) else 0
+    
+    def key(i):
+        # Malformed and invalid requests sort first, in input order, and fail when solved
+        group = group_key(requests[i])
+        if group is None:
+            return (False,)
+        request = requests[i]
+        return (True, group, request.get('items') is not None, -size(request.get('items')),
+                -size(request.get('limit')))
+    
+    return sorted(range(len(requests)), key=key)
+
+def solve_one(store, request, cache=None):
+    """Answer one request like the solver server, returning {'error': message} if it is invalid."""
+    if isinstance(request, MalformedLine):
+        return {'line': request.line, 'error': request.error}
+    try:
+        response = solve_request(store, request, cache)
+    except (ValueError, TypeError) as e:
+        response = {'error': str(e)}
+    except Exception as e:
+        # As the solver server answers 500: the batch goes on, and the traceback goes to stderr
+        traceback.print_exc()
+        response = {'error': f"Internal error: {type(e).__name__}: {e}"}
+    if isinstance(request, dict) and request.get('id') is not None:
+        response = {'id': request['id'], **response}
+    return response
+
+def solve_batch(store, requests, cache=None):
+    """Solve requests against one ItemStore, yielding (index, response) as each completes."""
+    cache = cache or ResultCache()
+    for index in solve_order(requests):
+        yield index, solve_one(store, requests[index], cache)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Compare the value-scaled DP (FPTAS) against the exact calorie-indexed DP as limits grow.
+
+The exact DP's table grows with the calorie limit; the FPTAS's does not. Each
+row reports both times and the FPTAS's protein as a share of the optimum.
+
+Run from the repository root after create_database.py:
+    python3 benchmarks/fptas_limits.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from item_store import ItemStore
+from knapsack import fptas_max_protein, knapsack_max_protein
+from planner import DP_MEMORY_LIMIT, dp_cells
+
+CALORIE_LIMITS = [1500, 14000, 50000, 140000]
+ITEM_LIMITS = [None, 5, 20]
+EPSILONS = [0.1, 0.01]
+
+def timed(solve):
+    start = time.perf_counter()
+    selected_items = solve()
+    return time.perf_counter() - start, sum(item[2] for item in selected_items)
+
+def main():
+    if not os.path.exists('fast_food.db'):
+        print("Error: Database file not found. Run create_database.py first.")
+        sys.exit(1)
+    
+    items = ItemStore('fast_food.db').items('max-protein')
+    print(f"Benchmarking max-protein over {len(items)} items\n")
+    header = ''.join(f" {f'eps={epsilon:g} (ms)':>15} {'share':>7}" for epsilon in EPSILONS)
+    print(f"{'Calories':>8} {'K':>4} {'DP (ms)':>10}{header}")
+    print("-" * (24 + 23 * len(EPSILONS)))
+    
+    for calorie_limit in CALORIE_LIMITS:
+        for item_limit in ITEM_LIMITS:
+            if dp_cells(len(items), calorie_limit, item_limit) / 8 <= DP_MEMORY_LIMIT:
+                dp_time, best = timed(lambda: knapsack_max_protein(items, calorie_limit, item_limit))
+                dp_cell = f"{dp_time * 1000:>10.1f}"
+            else:
+                best = None
+                dp_cell = f"{'too big':>10}"
+    
+            cells = ''
+            for epsilon in EPSILONS:
+                fptas_time, protein = timed(lambda: fptas_max_protein(items, calorie_limit, item_limit, epsilon))
+                share = f"{protein / best:.2%}" if best else '-'
+                cells += f" {fptas_time * 1000:>15.1f} {share:>7}"
+            print(f"{calorie_limit:>8} {item_limit or '-':>4} {dp_cell}{cells}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Time ILP sweeps with a persistent SelectionModel against rebuilding the model for every solve.
+
+Run from the repository root after create_database.py:
+    python3 benchmarks/ilp_models.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ilp_model
+from item_store import ItemStore
+from knapsack import ilp_max_calories, ilp_max_protein
+from optimizer import optimize
+
+# Each sweep returns solve functions giving the objective total of their answer; tied
+# optima may pick different items, so the totals are what must agree
+
+def max_protein_sweep(store):
+    items = store.items('max-protein')
+    return [lambda limit=limit, k=k: sum(item[2] for item in ilp_max_protein(items, limit, k))
+            for limit in range(300, 3001, 300) for k in [None, 3, 5]]
+
+def max_calories_sweep(store):
+    items = store.items('max-calories')
+    return [lambda limit=limit, k=k: sum(item[1] for item in ilp_max_calories(items, limit, k))
+            for limit in range(10, 101, 10) for k in [3, 5]]
+
+def optimize_sweep(store):
+    columns = ['protein', 'calories', 'sodium']
+    rows = store.rows(columns)
+    
+    def solve(limit):
+        selected, *_ = optimize(rows, columns, 'protein', maximums={'calories': limit, 'sodium': 2300},
+                                item_limit=5, algorithm='ilp')
+        return sum(row[3] for row in selected)
+    
+    return [lambda limit=limit: solve(limit) for limit in range(500, 3001, 250)]
+
+def timed(solves, persistent):
+    ilp_model.MODELS.clear()
+    start = time.perf_counter()
+    results = []
+    for solve in solves:
+        if not persistent:
+            ilp_model.MODELS.clear()
+        results.append(round(solve(), 6))
+    return (time.perf_counter() - start) / len(solves), results
+
+def main():
+    if not os.path.exists('fast_food.db'):
+        print("Error: Database file not found. Run create_database.py first.")
+        sys.exit(1)
+    
+    modules = dict(zip(['HiGHS', 'CBC'], ilp_model.load_backends()))
+    backends = [name for name, module in modules.items() if module]
+    if not backends:
+        print("Neither highspy nor PuLP is installed.")
+        sys.exit(1)
+    
+    store = ItemStore('fast_food.db')
+    print(f"{'Sweep':<14} {'Backend':<8} {'Solves':>6} {'Rebuilt (ms)':>13} {'Persistent (ms)':>16} {'Speedup':>8} {'Same':>5}")
+    print("-" * 76)
+    for name, build in [('max-protein', max_protein_sweep), ('max-calories', max_calories_sweep),
+                        ('optimize', optimize_sweep)]:
+        solves = build(store)
+        for backend in backends:
+            # Hiding the other solver module forces every model onto this backend
+            ilp_model.highspy = modules['HiGHS'] if backend == 'HiGHS' else None
+            ilp_model.pulp = modules['CBC'] if backend == 'CBC' else None
+            rebuilt, expected = timed(solves, persistent=False)
+            persistent, results = timed(solves, persistent=True)
+            same = 'yes' if results == expected else 'NO'
+            print(f"{name:<14} {backend:<8} {len(solves):>6} {rebuilt * 1000:>13.1f} {persistent * 1000:>16.1f} "
+                  f"{rebuilt / max(persistent, 1e-9):>8.2f} {same:>5}")
+    ilp_model.highspy, ilp_model.pulp = modules['HiGHS'], modules['CBC']
+
+if __name__ == "__main__":
+    main()
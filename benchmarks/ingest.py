@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Time each phase of a database build, and the work deferred to first use, on a synthetic catalog.
+
+The bulk load itself is only part of a build: the indexes and the companies
+table are built before the file is swapped in, and the binary item snapshot
+is written after. The item_search trigram
+index is built by the first search instead; it is timed here too, along with
+loading the store from SQLite and from the snapshot, so a regression in any
+of them shows up.
+
+Run from the repository root:
+    python3 benchmarks/ingest.py --rows 1000000
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import profiling
+from create_database import CSV_SOURCE, build_database, load_rows, menu_files
+from item_store import ItemStore, load_item_store
+from search import ensure_item_search
+from synthetic_catalog import CatalogModel, generate_rows
+
+def timed(run):
+    start = time.perf_counter()
+    result = run()
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-phase timing of a database build')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Synthetic rows to load (default: 1000000)')
+    parser.add_argument('--companies', type=int, default=50, help='Synthetic chains (default: 50)')
+    parser.add_argument('--source', default=CSV_SOURCE, help=f'Menu CSVs to fit (default: {CSV_SOURCE})')
+    args = parser.parse_args()
+    
+    if not menu_files(args.source):
+        print(f"Error: No menu CSV files match {args.source}")
+        sys.exit(1)
+    
+    model = CatalogModel.fit(list(load_rows(args.source)))
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, 'ingest.db')
+        profile = profiling.enable()
+        with profiling.span('build'):
+            build_database(generate_rows(model, args.rows, args.companies), db_path)
+        profiling.disable()
+    
+        build_seconds, _ = profile.totals()[('build',)]
+        phases = [(path[-1], seconds) for path, (seconds, _) in profile.totals().items() if len(path) == 2]
+        # Whatever the spans leave out: generating rows is inside 'insert', the rest is schema and swap
+        phases.append(('other', build_seconds - sum(seconds for _, seconds in phases)))
+    
+        conn = sqlite3.connect(db_path)
+        search_seconds, _ = timed(lambda: ensure_item_search(conn))
+        conn.close()
+        sqlite_load, _ = timed(lambda: ItemStore(db_path))
+        mapped_load, _ = timed(lambda: load_item_store(db_path))
+    
+    print(f"\nBuild of {args.rows} rows: {build_seconds:.2f} s ({args.rows / build_seconds:,.0f} rows/s)")
+    print(f"{'Phase':<28} {'Seconds':>9} {'Share':>7}")
+    print("-" * 46)
+    for name, seconds in phases:
+        print(f"{name:<28} {seconds:>9.2f} {seconds / build_seconds:>7.1%}")
+    
+    print("\nDeferred to first use:")
+    print(f"{'item_search index (search)':<28} {search_seconds:>9.2f}")
+    print("\nStore loads:")
+    print(f"{'load from SQLite':<28} {sqlite_load:>9.2f}")
+    print(f"{'load from snapshot':<28} {mapped_load:>9.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Drive a running solver_server.py with concurrent requests and report latency percentiles.
+
+Start the server first, then from the repository root:
+    python3 solver_server.py &
+    python3 benchmarks/load_generator.py --requests 2000 --concurrency 16
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from solver_server import DEFAULT_HOST, DEFAULT_PORT, request_solve
+
+COMPANIES = [None, 'McDonald', 'Burger King', 'KFC', 'Wendy', 'Taco Bell', 'Pizza Hut']
+
+def random_request(rng):
+    command = rng.choice(['max-protein', 'max-calories', 'max-fat', 'max-carbs', 'max-calorie-protein'])
+    if command == 'max-protein':
+        limit = rng.choice([500, 800, 1000, 1500, 2000])
+    elif command == 'max-calorie-protein':
+        limit = None
+    else:
+        limit = rng.choice([10, 20, 30, 50, 80])
+    return {
+        'command': command,
+        'limit': limit,
+        'items': rng.choice([None, 2, 3, 5]) if command != 'max-calorie-protein' else rng.choice([3, 5]),
+        'company': rng.choice(COMPANIES),
+    }
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def main():
+    parser = argparse.ArgumentParser(description='Load generator for solver_server.py')
+    parser.add_argument('--server', default=f'{DEFAULT_HOST}:{DEFAULT_PORT}', help='Server address as HOST:PORT')
+    parser.add_argument('--requests', type=int, default=1000, help='Total number of requests (default: 1000)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients (default: 8)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the request mix')
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    requests = [random_request(rng) for _ in range(args.requests)]
+    
+    def timed(payload):
+        start = time.perf_counter()
+        try:
+            ok = 'error' not in request_solve(args.server, payload)
+        except OSError:
+            ok = False
+        return time.perf_counter() - start, ok
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(timed, requests))
+    elapsed = time.perf_counter() - start
+    
+    latencies = sorted(latency * 1000 for latency, ok in results if ok)
+    errors = sum(1 for _, ok in results if not ok)
+    if not latencies:
+        print(f"All {errors} requests failed; is the server running at {args.server}?")
+        sys.exit(1)
+    
+    print(f"Requests: {len(results)} ({errors} errors), concurrency {args.concurrency}")
+    print(f"Throughput: {len(results) / elapsed:.1f} requests/s")
+    print(f"Latency p50: {percentile(latencies, 0.50):.2f} ms")
+    print(f"Latency p90: {percentile(latencies, 0.90):.2f} ms")
+    print(f"Latency p99: {percentile(latencies, 0.99):.2f} ms")
+    print(f"Latency max: {latencies[-1]:.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Compare the cardinality-constrained DP against ILP for max-protein --items K.
+
+Run from the repository root after create_database.py:
+    python3 benchmarks/max_protein_items.py
+"""
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ilp_model
+from knapsack import knapsack_max_protein, ilp_max_protein
+
+CALORIE_LIMITS = [500, 1000, 2000, 3000, 5000]
+ITEM_LIMITS = [1, 2, 3, 5, 10]
+
+def load_items():
+    conn = sqlite3.connect('fast_food.db')
+    cursor = conn.cursor()
+    cursor.execute('''
+    SELECT id, calories, protein, item, company 
+    FROM fast_food_items 
+    WHERE calories IS NOT NULL AND protein IS NOT NULL AND calories > 0
+    ''')
+    items = cursor.fetchall()
+    conn.close()
+    return items
+
+def timed(solver, items, calorie_limit, item_limit):
+    start = time.perf_counter()
+    selected_items = solver(items, calorie_limit, item_limit)
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(item[2] for item in selected_items)
+
+def main():
+    if not os.path.exists('fast_food.db'):
+        print("Error: Database file not found. Run create_database.py first.")
+        sys.exit(1)
+    
+    have_ilp = ilp_model.backend_available()
+    if not have_ilp:
+        print("Neither highspy nor PuLP is installed; reporting DP timings only.")
+    
+    items = load_items()
+    print(f"Benchmarking max-protein --items K over {len(items)} items\n")
+    print(f"{'Calories':>8} {'K':>3} {'DP (ms)':>10} {'DP protein':>11} {'ILP (ms)':>10} {'ILP protein':>12} {'Match':>6}")
+    print("-" * 66)
+    
+    for calorie_limit in CALORIE_LIMITS:
+        for item_limit in ITEM_LIMITS:
+            dp_time, dp_protein = timed(knapsack_max_protein, items, calorie_limit, item_limit)
+            if have_ilp:
+                ilp_time, ilp_protein = timed(ilp_max_protein, items, calorie_limit, item_limit)
+                match = 'yes' if abs(dp_protein - ilp_protein) < 1e-6 else 'NO'
+                print(f"{calorie_limit:>8} {item_limit:>3} {dp_time * 1000:>10.1f} {dp_protein:>11.1f} "
+                      f"{ilp_time * 1000:>10.1f} {ilp_protein:>12.1f} {match:>6}")
+            else:
+                print(f"{calorie_limit:>8} {item_limit:>3} {dp_time * 1000:>10.1f} {dp_protein:>11.1f} "
+                      f"{'-':>10} {'-':>12} {'-':>6}")
+
+if __name__ == "__main__":
+    main()
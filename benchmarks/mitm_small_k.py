@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Compare meet-in-the-middle against branch-and-bound for max-calories/fat/carbs with small --items K.
+
+For every K, each query is solved at a range of protein minimums; the rows report
+the worst and median time of each solver and check that both find the same total.
+
+Run from the repository root after create_database.py:
+    python3 benchmarks/mitm_small_k.py
+"""
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from item_store import ItemStore
+from knapsack import (knapsack_max_calories, knapsack_max_carbs, knapsack_max_fat, mitm_max_calories,
+                      mitm_max_carbs, mitm_max_fat)
+
+QUERIES = [
+    ('max-calories', 1, knapsack_max_calories, mitm_max_calories),
+    ('max-fat', 5, knapsack_max_fat, mitm_max_fat),
+    ('max-carbs', 6, knapsack_max_carbs, mitm_max_carbs),
+]
+ITEM_LIMITS = [2, 3, 4, 5]
+PROTEIN_MINIMUMS = [0, 25, 50, 100, 150, 200, 250, 300]
+
+def timed(solver, items, protein_min, item_limit):
+    start = time.perf_counter()
+    selected_items = solver(items, protein_min, item_limit)
+    return time.perf_counter() - start, selected_items
+
+def main():
+    if not os.path.exists('fast_food.db'):
+        print("Error: Database file not found. Run create_database.py first.")
+        sys.exit(1)
+    
+    store = ItemStore('fast_food.db')
+    print(f"{'Query':<13} {'K':>2} {'B&B worst':>10} {'B&B median':>11} {'MITM worst':>11} {'MITM median':>12} {'Same':>5}")
+    print("-" * 70)
+    
+    for command, index, bnb, mitm in QUERIES:
+        items = store.items(command)
+        for item_limit in ITEM_LIMITS:
+            bnb_times, mitm_times, same = [], [], True
+            for protein_min in PROTEIN_MINIMUMS:
+                bnb_time, bnb_items = timed(bnb, items, protein_min, item_limit)
+                mitm_time, mitm_items = timed(mitm, items, protein_min, item_limit)
+                bnb_times.append(bnb_time * 1000)
+                mitm_times.append(mitm_time * 1000)
+                same &= abs(sum(item[index] for item in bnb_items) - sum(item[index] for item in mitm_items)) < 1e-9
+            print(f"{command:<13} {item_limit:>2} {max(bnb_times):>10.2f} {statistics.median(bnb_times):>11.2f} "
+                  f"{max(mitm_times):>11.2f} {statistics.median(mitm_times):>12.2f} {'yes' if same else 'NO':>5}")
+
+if __name__ == "__main__":
+    main()
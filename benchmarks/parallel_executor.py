@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Measure the process-pool ParallelSolver against a serial batch on the same requests.
+
+Run from the repository root after create_database.py:
+    python3 benchmarks/parallel_executor.py --workers 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch import solve_batch
+from item_store import ItemStore
+from parallel import ParallelSolver
+
+def per_company_requests(store):
+    """max-protein for every chain at several calorie limits, with and without an item cap."""
+    return [{'command': 'max-protein', 'limit': limit, 'items': items, 'company': company}
+            for company in store.company_names
+            for limit in [500, 1000, 1500, 2000, 3000]
+            for items in [None, 5]]
+
+def protein_sweep_requests(store):
+    """max-calories over a sweep of protein minimums, for all items and per chain."""
+    return [{'command': 'max-calories', 'limit': protein, 'items': items, 'company': company}
+            for company in [None] + store.company_names
+            for protein in range(10, 101, 10)
+            for items in [3, 5]]
+
+def results(pairs):
+    # Timings and cache hits differ between runs; the answers must not
+    return [(index, response.get('items'), response.get('error')) for index, response in pairs]
+
+def main():
+    parser = argparse.ArgumentParser(description='Serial vs process-pool batch solving')
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, os.cpu_count() or 1],
+                        help='Worker counts to measure (default: 2 and the CPU count)')
+    args = parser.parse_args()
+    
+    if not os.path.exists('fast_food.db'):
+        print("Error: Database file not found. Run create_database.py first.")
+        sys.exit(1)
+    
+    store = ItemStore('fast_food.db')
+    print(f"{len(store)} items, {len(store.company_names)} companies, {os.cpu_count()} CPUs\n")
+    print(f"{'Workload':<16} {'Requests':>8} {'Workers':>8} {'Time (s)':>9} {'Speedup':>8} {'Same':>5}")
+    print("-" * 59)
+    
+    for name, build in [('per-company', per_company_requests), ('protein sweep', protein_sweep_requests)]:
+        requests = build(store)
+        start = time.perf_counter()
+        serial = results(solve_batch(store, requests))
+        serial_time = time.perf_counter() - start
+        print(f"{name:<16} {len(requests):>8} {'serial':>8} {serial_time:>9.2f} {1:>8.2f} {'-':>5}")
+    
+        for workers in args.workers:
+            # Pool start-up and the shared-memory copy are part of the measured time
+            start = time.perf_counter()
+            with ParallelSolver(store, workers) as solver:
+                parallel = results(solver.solve(requests))
+            elapsed = time.perf_counter() - start
+            same = 'yes' if parallel == serial else 'NO'
+            print(f"{name:<16} {len(requests):>8} {workers:>8} {elapsed:>9.2f} "
+                  f"{serial_time / max(elapsed, 1e-9):>8.2f} {same:>5}")
+
+if __name__ == "__main__":
+    main()
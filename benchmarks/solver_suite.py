@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""Time every query solver in knapsack.py over a parameter grid and catalogs scaled up from the real one.
+
+Each case is one solver on one (scale, command, limit, item limit, company)
+combination. It records the best wall time of --repeat runs, the peak memory
+of one traced run, and the objective value as a share of the proven optimum
+(the value every exact solver that finished agrees on). Results go to a JSON
+file; with a baseline file present, cases that got slower, used more memory,
+lost quality or stopped finishing are reported and the exit status is 1.
+
+Scaled catalogs repeat every row of the database with each nutrient jittered
+by a few percent, so 100x of fast_food.db has about 115,000 items across the
+same companies. --db points the suite at another database, such as a
+synthetic_catalog.py build.
+Cases the planner's cost model expects to exceed --max-case-ms are skipped, and
+solvers that take a deadline are stopped at it.
+
+Run from the repository root after create_database.py:
+    python3 benchmarks/solver_suite.py --save-baseline
+    python3 benchmarks/solver_suite.py
+    python3 benchmarks/solver_suite.py --scales 1 10 100 1000 --baseline full_baseline.json --save-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ilp_model import MODELS, backend_available
+from item_store import INTEGER_COLUMNS, ItemStore
+from knapsack import (Deadline, fptas_max_calories, fptas_max_carbs, fptas_max_fat, fptas_max_protein,
+                      greedy_max_protein, ilp_max_calorie_protein, ilp_max_calories, ilp_max_carbs, ilp_max_fat,
+                      ilp_max_protein, knapsack_max_calorie_protein, knapsack_max_calories, knapsack_max_carbs,
+                      knapsack_max_fat, knapsack_max_protein, mitm_max_calories, mitm_max_carbs, mitm_max_fat,
+                      most_items, MITM_MAX_ITEMS)
+from optimizer import NUTRIENT_COLUMNS
+from planner import DP_MEMORY_LIMIT, cost_model, dp_cells, fptas_cells
+from queries import OBJECTIVES
+
+RESULTS_PATH = 'benchmark_results.json'
+BASELINE_PATH = 'benchmark_baseline.json'
+
+# Limits are calorie limits for max-protein and protein minimums for the others;
+# max-calorie-protein has no limit
+GRID = {
+    'max-protein': {'limits': [500, 1500, 3000], 'item_limits': [None, 3, 10]},
+    'max-calories': {'limits': [30, 100], 'item_limits': [None, 3, 10]},
+    'max-fat': {'limits': [30, 100], 'item_limits': [None, 3, 10]},
+    'max-carbs': {'limits': [30, 100], 'item_limits': [None, 3, 10]},
+    'max-calorie-protein': {'limits': [None], 'item_limits': [3, 10]},
+}
+COMPANIES = [None, 'KFC']
+
+# name: (command, solve(items, limit, item_limit, deadline), exact, cost method or None).
+# The cost method names the planner estimate used to skip oversized cases;
+# solvers without one are cheap enough to always run
+SOLVERS = {
+    'knapsack_max_protein': ('max-protein', knapsack_max_protein, True, 'dp'),
+    'greedy_max_protein': ('max-protein', lambda items, limit, item_limit, deadline:
+                           greedy_max_protein(items, limit, item_limit), False, None),
+    'fptas_max_protein': ('max-protein', lambda items, limit, item_limit, deadline:
+                          fptas_max_protein(items, limit, item_limit, deadline=deadline), False, 'fptas'),
+    'ilp_max_protein': ('max-protein', ilp_max_protein, True, 'ilp_packing'),
+    'knapsack_max_calories': ('max-calories', knapsack_max_calories, True, 'bnb'),
+    'mitm_max_calories': ('max-calories', mitm_max_calories, True, None),
+    'fptas_max_calories': ('max-calories', lambda items, limit, item_limit, deadline:
+                           fptas_max_calories(items, limit, item_limit, deadline=deadline), False, 'fptas'),
+    'ilp_max_calories': ('max-calories', ilp_max_calories, True, 'ilp_covering'),
+    'knapsack_max_fat': ('max-fat', knapsack_max_fat, True, 'bnb'),
+    'mitm_max_fat': ('max-fat', mitm_max_fat, True, None),
+    'fptas_max_fat': ('max-fat', lambda items, limit, item_limit, deadline:
+                      fptas_max_fat(items, limit, item_limit, deadline=deadline), False, 'fptas'),
+    'ilp_max_fat': ('max-fat', ilp_max_fat, True, 'ilp_covering'),
+    'knapsack_max_carbs': ('max-carbs', knapsack_max_carbs, True, 'bnb'),
+    'mitm_max_carbs': ('max-carbs', mitm_max_carbs, True, None),
+    'fptas_max_carbs': ('max-carbs', lambda items, limit, item_limit, deadline:
+                        fptas_max_carbs(items, limit, item_limit, deadline=deadline), False, 'fptas'),
+    'ilp_max_carbs': ('max-carbs', ilp_max_carbs, True, 'ilp_covering'),
+    'knapsack_max_calorie_protein': ('max-calorie-protein', lambda items, limit, item_limit, deadline:
+                                     knapsack_max_calorie_protein(items, item_limit), True, None),
+    'ilp_max_calorie_protein': ('max-calorie-protein', lambda items, limit, item_limit, deadline:
+                                ilp_max_calorie_protein(items, item_limit, deadline), True, 'ilp_packing'),
+}
+
+def scaled_store(store, factor, seed=0):
+    """An ItemStore with every row of store repeated factor times, nutrients jittered by about 5%."""
+    if factor == 1:
+        return store
+    rng = np.random.default_rng(seed)
+    matrix = np.tile(store.matrix, factor)
+    matrix[0] = np.arange(1, matrix.shape[1] + 1)
+    # Copies keep their company; NaN (NULL) stays NaN
+    matrix[2:] *= rng.lognormal(0.0, 0.05, size=matrix[2:].shape)
+    for offset, column in enumerate(NUTRIENT_COLUMNS):
+        if column in INTEGER_COLUMNS:
+            matrix[2 + offset] = np.round(matrix[2 + offset])
+    return ItemStore.from_matrix(matrix, store.names * factor, store.company_names)
+
+def applies(name, item_limit):
+    if name.startswith('mitm_'):
+        return item_limit is not None and item_limit <= MITM_MAX_ITEMS
+    if name.startswith('ilp_'):
+        return backend_available()
+    return True
+
+def estimated_ms(method, command, items, limit, item_limit):
+    """The planner's estimate for a case, or None if the solver has no cost model."""
+    if method is None:
+        return None
+    n = len(items)
+    if method == 'dp':
+        if dp_cells(n, limit, item_limit) / 8 > DP_MEMORY_LIMIT:
+            return float('inf')
+        return cost_model().estimate('dp', dp_cells(n, limit, item_limit)) * 1000
+    if method == 'fptas':
+        # A covering query's meal is bounded only by its item limit
+        most = most_items([item[1] for item in items], limit) if command == 'max-protein' else n
+        return cost_model().estimate('fptas', fptas_cells(n, most, item_limit)) * 1000
+    return cost_model().estimate(method, n) * 1000
+
+def run_case(solve, items, limit, item_limit, max_case_ms, repeat):
+    """(best time in ms, peak traced memory in KiB, selected items, whether the deadline was hit)."""
+    times = []
+    for _ in range(repeat):
+        # A fresh ILP model per run, so every run includes building it
+        MODELS.clear()
+        deadline = Deadline(max_case_ms)
+        start = time.perf_counter()
+        selected_items = solve(items, limit, item_limit, deadline)
+        times.append((time.perf_counter() - start) * 1000)
+        if deadline.hit:
+            return min(times), None, selected_items, True
+    
+    MODELS.clear()
+    tracemalloc.start()
+    solve(items, limit, item_limit, Deadline(max_case_ms * 10))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times), peak / 1024, selected_items, False
+
+def run_suite(store, scales, max_case_ms, repeat, solvers=None):
+    """Benchmark every case, yielding one result dict per case as it finishes."""
+    for scale in scales:
+        scaled = scaled_store(store, scale)
+        for command, grid in GRID.items():
+            objective = OBJECTIVES[command]
+            names = [name for name, spec in SOLVERS.items() if spec[0] == command and (not solvers or name in solvers)]
+            for company in COMPANIES:
+                items = scaled.items(command, company)
+                for limit in grid['limits']:
+                    for item_limit in grid['item_limits']:
+                        results = []
+                        for name in names:
+                            _, solve, exact, method = SOLVERS[name]
+                            result = {'solver': name, 'scale': scale, 'command': command, 'limit': limit,
+                                      'item_limit': item_limit, 'company': company, 'n': len(items),
+                                      'exact': exact, 'status': 'ok', 'time_ms': None, 'peak_kib': None,
+                                      'value': None}
+                            estimate = estimated_ms(method, command, items, limit, item_limit)
+                            if not applies(name, item_limit):
+                                result['status'] = 'not applicable'
+                            elif estimate is not None and estimate > max_case_ms:
+                                result['status'] = 'skipped'
+                            else:
+                                elapsed, peak, selected_items, hit = run_case(solve, items, limit, item_limit,
+                                                                              max_case_ms, repeat)
+                                result.update(time_ms=elapsed, peak_kib=peak,
+                                              value=sum(objective(item) for item in selected_items),
+                                              status='timed out' if hit else 'ok')
+                            results.append(result)
+    
+                        # Every exact solver that finished must agree; that value is the proven optimum
+                        proven = [r['value'] for r in results if r['exact'] and r['status'] == 'ok']
+                        optimum = max(proven) if proven else None
+                        for result in results:
+                            result['optimum'] = optimum
+                            result['ratio'] = None
+                            if optimum is not None and result['value'] is not None:
+                                result['ratio'] = result['value'] / optimum if optimum else 1.0
+                                if result['exact'] and result['status'] == 'ok' and result['ratio'] < 1 - 1e-9:
+                                    result['status'] = 'wrong'
+                            yield result
+
+def case_key(result):
+    return (f"{result['solver']}|{result['scale']}|{result['command']}|{result['limit']}|"
+            f"{result['item_limit']}|{result['company']}")
+
+def compare(results, baseline, tolerance, min_ms):
+    """Messages for every case that regressed against the baseline results."""
+    previous = {case_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(case_key(result))
+        if before is None:
+            continue
+        key = case_key(result)
+        if before['status'] == 'ok' and result['status'] != 'ok':
+            regressions.append(f"{key}: {result['status']} (was ok)")
+            continue
+        if result['status'] != 'ok' or before['status'] != 'ok':
+            continue
+        if (result['time_ms'] > before['time_ms'] * (1 + tolerance)
+                and result['time_ms'] - before['time_ms'] > min_ms):
+            regressions.append(f"{key}: {result['time_ms']:.2f} ms (was {before['time_ms']:.2f} ms)")
+        if (before['peak_kib'] is not None and result['peak_kib'] is not None
+                and result['peak_kib'] > before['peak_kib'] * (1 + tolerance)
+                and result['peak_kib'] - before['peak_kib'] > 64):
+            regressions.append(f"{key}: peak {result['peak_kib']:.0f} KiB (was {before['peak_kib']:.0f} KiB)")
+        if (before['ratio'] is not None and result['ratio'] is not None
+                and result['ratio'] < before['ratio'] - 1e-9):
+            regressions.append(f"{key}: {result['ratio']:.2%} of optimal (was {before['ratio']:.2%})")
+    return regressions
+
+def format_cell(value, width, spec=''):
+    return f"{'-' if value is None else format(value, spec):>{width}}"
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every knapsack.py query solver with regression tracking')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10],
+                        help='Catalog sizes as multiples of the real one (default: 1 10)')
+    parser.add_argument('--db', default='fast_food.db',
+                        help='Database to benchmark, such as one from synthetic_catalog.py (default: fast_food.db)')
+    parser.add_argument('--solvers', nargs='+', choices=sorted(SOLVERS), help='Only benchmark these solvers')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per case; the best is kept (default: 3)')
+    parser.add_argument('--max-case-ms', type=float, default=2000,
+                        help='Skip cases estimated past this and stop solvers at it (default: 2000)')
+    parser.add_argument('--output', default=RESULTS_PATH, help=f'Results file (default: {RESULTS_PATH})')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help=f'Baseline to compare against (default: {BASELINE_PATH})')
+    parser.add_argument('--save-baseline', action='store_true', help='Also write the results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Relative slowdown or memory growth reported as a regression (default: 0.25)')
+    parser.add_argument('--min-ms', type=float, default=1.0,
+                        help='Ignore slowdowns smaller than this many milliseconds (default: 1)')
+    args = parser.parse_args()
+    
+    if not os.path.exists(args.db):
+        print("Error: Database file not found. Run create_database.py first.")
+        sys.exit(1)
+    
+    store = ItemStore(args.db)
+    print(f"{'Solver':<29} {'Scale':>5} {'Query':<20} {'Limit':>5} {'K':>3} {'Company':<7} "
+          f"{'Time (ms)':>10} {'Peak KiB':>9} {'Optimal':>8} Status")
+    print("-" * 114)
+    results = []
+    for result in run_suite(store, args.scales, args.max_case_ms, args.repeat, args.solvers):
+        results.append(result)
+        if result['status'] == 'not applicable':
+            continue
+        print(f"{result['solver']:<29} {result['scale']:>5} {result['command']:<20} "
+              f"{format_cell(result['limit'], 5)} {format_cell(result['item_limit'], 3)} "
+              f"{result['company'] or '-':<7} {format_cell(result['time_ms'], 10, '.2f')} "
+              f"{format_cell(result['peak_kib'], 9, '.0f')} {format_cell(result['ratio'], 8, '.2%')} "
+              f"{result['status']}")
+    
+    report = {
+        'created_at': time.time(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    print(f"\nWrote {len(results)} cases to {args.output}")
+    
+    wrong = [case_key(result) for result in results if result['status'] == 'wrong']
+    for key in wrong:
+        print(f"Exact solver below the proven optimum: {key}")
+    
+    regressions = []
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as file:
+            regressions = compare(results, json.load(file)['results'], args.tolerance, args.min_ms)
+        print(f"Compared against {args.baseline}: {len(regressions)} regressions")
+        for message in regressions:
+            print(f"  {message}")
+    else:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+    
+    if wrong or regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
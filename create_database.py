@@ -1,18 +1,241 @@
 #!/usr/bin/env python3
+import argparse
 import csv
+import functools
+import glob
+import hashlib
+import itertools
+import operator
+import pickle
+import re
 import sqlite3
 import os
+import tempfile
+import time
+import uuid
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
 
-def create_database():
-    # Remove existing database if it exists
-    if os.path.exists('fast_food.db'):
-        os.remove('fast_food.db')
+import numpy as np
+
+from profiling import span
+from item_store import load_item_store
+from search import add_companies, create_company_table, drop_unused_companies, has_table
+from snapshot import snapshot_path, write_snapshot
+
+# Every versioned menu export; later versions win for items they both list
+CSV_SOURCE = 'nutrition/FastFoodNutritionMenuV*.csv'
+DB_PATH = 'fast_food.db'
+
+# Rows handed to executemany at a time; large enough to amortize the call, small
+# enough that a million-row menu never sits in memory at once
+BATCH_SIZE = 10_000
+
+COLUMNS = [
+    'company', 'item', 'calories', 'calories_from_fat', 'total_fat', 'saturated_fat',
+    'trans_fat', 'cholesterol', 'sodium', 'carbs', 'fiber', 'sugars', 'protein', 'weight_watchers_points',
+]
+
+# Normalized CSV headers that don't simply become their column name with spaces
+# turned into underscores (units in parentheses are dropped first)
+HEADER_ALIASES = {
+    'restaurant': 'company',
+    'chain': 'company',
+    'name': 'item',
+    'carbohydrates': 'carbs',
+    'sugar': 'sugars',
+    'weight watchers pnts': 'weight_watchers_points',
+    'weight watchers points': 'weight_watchers_points',
+}
+
+# Group hashes are sums of 128-bit row digests, modulo 2^128. Rows are serialized
+# with a fixed pickle protocol, which is cheaper than repr and stable across Python versions
+HASH_MASK = (1 << 128) - 1
+HASH_PROTOCOL = 4
+
+INSERT_SQL = '''
+INSERT INTO fast_food_items (
+    company, item, calories, calories_from_fat, total_fat, saturated_fat,
+    trans_fat, cholesterol, sodium, carbs, fiber, sugars, protein, weight_watchers_points
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# A refresh's delete of one changed (company, item) group; IS rather than = so rows
+# without a company or item name match too
+DELETE_GROUP_SQL = 'DELETE FROM fast_food_items WHERE company IS ? AND item IS ?'
+
+# Anything but digits, '.' and '-' is dropped from numeric cells (like '<' in '<5')
+NON_NUMERIC = re.compile(r'[^0-9.\-]')
+
+# Menus repeat the same few hundred numeric strings, so each is parsed once; the
+# bound keeps a catalog of mostly distinct values from growing the cache without limit
+@functools.lru_cache(maxsize=65536)
+def parse_number(value):
+    """Clean a numeric cell, returning a float or None when nothing numeric is left."""
+    cleaned_value = NON_NUMERIC.sub('', value)
+    try:
+        return float(cleaned_value) if cleaned_value else None
+    except ValueError:
+        return None
+
+def normalize_header(name):
+    """Map a CSV header such as 'Calories from\nFat' or 'Total Fat\n(g)' to its column name."""
+    name = re.sub(r'\([^)]*\)', ' ', name)
+    name = ' '.join(name.replace('_', ' ').lower().split())
+    return HEADER_ALIASES.get(name, name.replace(' ', '_'))
+
+def menu_files(source):
+    """Expand a CSV file, a directory of CSVs or a glob into paths in version order."""
+    if os.path.isdir(source):
+        paths = glob.glob(os.path.join(source, '*.csv'))
+    else:
+        paths = glob.glob(source)
+    # Natural order, so ...V10.csv sorts after ...V9.csv
+    return sorted(paths, key=lambda path: [int(part) if part.isdigit() else part
+                                           for part in re.split(r'(\d+)', path)])
+
+def parse_rows(csv_path, numbers=True):
+    """Stream cleaned rows, in COLUMNS order, from one menu CSV; just company and item without numbers."""
+    with open(csv_path, 'r', encoding='utf-8') as file:
+        csv_reader = csv.reader(file)
+        header = [normalize_header(name) for name in next(csv_reader)]
+        if 'company' not in header or 'item' not in header:
+            raise ValueError(f"{csv_path}: no Company and Item columns in the header")
     
-    # Connect to database
-    conn = sqlite3.connect('fast_food.db')
+        # Columns the file lacks read the empty cell appended to every row
+        width = len(header)
+        positions = [header.index(column) if column in header else width for column in COLUMNS]
+        select = operator.itemgetter(*positions)
+    
+        for row in csv_reader:
+            # Ensure we have at least the essential columns; at most the last may be missing
+            if len(row) < width - 1:
+                continue
+            row += [''] * (width + 1 - len(row))
+            cells = select(row)
+            company, item = cells[0], cells[1]
+            cleaned_row = [company if company.strip() else None, item if item.strip() else None]
+            if numbers:
+                # Blank cells clean to '' and so parse to None as well
+                cleaned_row += map(parse_number, cells[2:])
+            yield cleaned_row
+
+def parse_file(csv_path):
+    return list(parse_rows(csv_path))
+
+def parse_keys(csv_path):
+    return {(row[0], row[1]) for row in parse_rows(csv_path, numbers=False)}
+
+def ordered_map(pool, function, items, ahead):
+    """pool.map that yields in order but keeps at most ahead results waiting, so a slow consumer bounds memory."""
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(function, item))
+        if len(pending) > ahead:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def load_rows(source=CSV_SOURCE):
+    """Stream the merged rows of every menu CSV in source.
+    
+    Each (company, item) keeps the rows of the last file, in version order, that
+    lists it. A first pass reads only the keys of every file to find that file;
+    the second parses the files in order, holding at most one per worker in
+    memory. With several files and CPUs, files are parsed in worker processes.
+    """
+    paths = menu_files(source)
+    if not paths:
+        raise FileNotFoundError(f"No menu CSV files match {source}")
+    if len(paths) == 1:
+        yield from parse_rows(paths[0])
+        return
+    
+    workers = min(len(paths), os.cpu_count() or 1)
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        def parsed(function):
+            if pool is None:
+                return map(function, paths)
+            return ordered_map(pool, function, paths, workers)
+    
+        owner = {}
+        for index, keys in enumerate(parsed(parse_keys)):
+            for key in keys:
+                owner[key] = index
+        for index, rows in enumerate(parsed(parse_file)):
+            for row in rows:
+                if owner[row[0], row[1]] == index:
+                    yield row
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+def bulk_insert(conn, rows, batch_size=BATCH_SIZE, collect=None):
+    """Insert rows with executemany in batches, returning how many were inserted.
+    
+    collect, if given, is called with every batch as it is inserted.
+    """
     cursor = conn.cursor()
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            cursor.executemany(INSERT_SQL, batch)
+            if collect is not None:
+                collect(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        cursor.executemany(INSERT_SQL, batch)
+        if collect is not None:
+            collect(batch)
+        count += len(batch)
+    return count
+
+class SnapshotColumns:
+    """The item snapshot's arrays, collected from the batches a build inserts into its empty table.
+    
+    An empty table numbers its rows 1 up in insert order, so the build can write
+    the snapshot (see snapshot.write_snapshot) without reading a row back from
+    SQLite. Numbers are kept as one float64 array per batch, NULL as NaN.
+    """
+    
+    def __init__(self):
+        self.numbers = []
+        self.codes = []
+        self.names = []
+        # Codes by first appearance, handed out from C; None, no company, gets one too
+        self.company_code = defaultdict(itertools.count().__next__)
+    
+    def add(self, batch):
+        table = np.array(batch, dtype=object)
+        # The nutrient columns follow company and item in COLUMNS, in NUTRIENT_COLUMNS
+        # order; None becomes NaN in one pass over the object array
+        numbers = table[:, 2:]
+        numbers[np.equal(numbers, None)] = np.nan
+        self.numbers.append(numbers.astype(np.float64))
+        self.codes.append(np.fromiter(map(self.company_code.__getitem__, table[:, 0]), dtype=np.int64,
+                                      count=len(batch)))
+        self.names.extend(table[:, 1].tolist())
+    
+    def write(self, path, version):
+        n = len(self.names)
+        width = len(COLUMNS) - 2
+        company_names = sorted(name for name in self.company_code if name is not None)
+        # The store numbers companies by name, and no company as -1
+        renumber = np.full(len(self.company_code), -1, dtype=np.int64)
+        for code, name in enumerate(company_names):
+            renumber[self.company_code[name]] = code
     
-    # Create table
+        matrix = np.empty((2 + width, n), dtype=np.float64)
+        matrix[0] = np.arange(1, n + 1)
+        matrix[1] = renumber[np.concatenate(self.codes)] if n else []
+        matrix[2:] = np.concatenate(self.numbers).T if n else np.empty((width, 0))
+        write_snapshot(path, matrix, self.names, company_names, version)
+
+def create_schema(cursor):
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS fast_food_items (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -29,54 +252,268 @@ def create_database():
         fiber REAL,
         sugars REAL,
         protein REAL,
-        weight_watchers_points REAL
+        weight_watchers_points REAL,
+        -- Derived ratios for ad-hoc SQL, computed by SQLite on read so loads and refreshes never store them
+        protein_per_calorie REAL GENERATED ALWAYS AS (CASE WHEN calories > 0 THEN protein / calories END) VIRTUAL,
+        fat_calorie_share REAL GENERATED ALWAYS AS (CASE WHEN calories > 0 THEN 1.0 * calories_from_fat / calories END) VIRTUAL
     )
     ''')
     
-    # Read CSV and insert data
-    with open('nutrition/FastFoodNutritionMenuV3.csv', 'r', encoding='utf-8') as file:
-        csv_reader = csv.reader(file)
-        header = next(csv_reader)  # Skip header row
-        
-        for row in csv_reader:
-            # Clean and convert data
-            cleaned_row = []
-            for i, value in enumerate(row):
-                # Skip empty cells or convert to appropriate type
-                if value.strip() == '':
-                    cleaned_row.append(None)
-                elif i >= 2:  # Numeric columns
-                    # Remove any non-numeric characters (like '<' in '<5')
-                    cleaned_value = ''.join(c for c in value if c.isdigit() or c == '.' or c == '-')
-                    if cleaned_value == '':
-                        cleaned_row.append(None)
-                    else:
-                        try:
-                            cleaned_row.append(float(cleaned_value))
-                        except ValueError:
-                            cleaned_row.append(None)
-                else:  # Text columns
-                    cleaned_row.append(value)
-            
-            # Insert data
-            if len(cleaned_row) >= 13:  # Ensure we have at least the essential columns
-                cursor.execute('''
-                INSERT INTO fast_food_items (
-                    company, item, calories, calories_from_fat, total_fat, saturated_fat,
-                    trans_fat, cholesterol, sodium, carbs, fiber, sugars, protein, weight_watchers_points
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', cleaned_row[:14])  # Limit to expected columns
-    
-    # Create indices for faster searching
-    cursor.execute('CREATE INDEX idx_company ON fast_food_items(company)')
-    cursor.execute('CREATE INDEX idx_calories ON fast_food_items(calories)')
-    cursor.execute('CREATE INDEX idx_protein ON fast_food_items(protein)')
-    
-    # Commit changes and close connection
-    conn.commit()
+    # Content hash of every (company, item) group of rows, for incremental refreshes
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS row_hashes (
+        company TEXT,
+        item TEXT,
+        hash TEXT
+    )
+    ''')
+    
+    cursor.execute('CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT)')
+
+def create_item_index(cursor):
+    """Index every SQL lookup by company left once solvers read the item store.
+    
+    Keyed on (company, item), it serves company filters, the refresh's deletes of
+    one (company, item) group and the items listing's ORDER BY company, item;
+    with calories and protein it also covers that listing, so it never reads the
+    table. nutrition_cli.py explain checks each of these plans.
+    """
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_company_item ON fast_food_items(company, item, calories, protein)')
+
+def create_hash_index(cursor):
+    # UNIQUE like the constraint tables built before had; one sort after the load
+    # is cheaper than keeping the index up to date through a million inserts
+    cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_row_hashes ON row_hashes(company, item)')
+
+def stamp_data_version(cursor):
+    """Stamp this build so cached solver results and snapshots from older data are ignored; returns the stamp."""
+    version = uuid.uuid4().hex
+    cursor.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES ('data_version', ?)", [version])
+    return version
+
+def hash_rows(rows, hashes):
+    """Pass rows through while folding each into the hash of its (company, item) group.
+    
+    Each row is hashed on its own and added into its group's 128-bit total, so a
+    group costs one integer however many rows it has, and the hash does not
+    depend on row order. Use group_hash for the stored form.
+    """
+    for row in rows:
+        key = (row[0], row[1])
+        digest = int.from_bytes(hashlib.blake2b(pickle.dumps(row, HASH_PROTOCOL), digest_size=16).digest(), 'little')
+        hashes[key] = (hashes.get(key, 0) + digest) & HASH_MASK
+        yield row
+
+def group_hash(total):
+    return f'{total:032x}'
+
+def reserve_build(db_path):
+    """Create an empty, uniquely named build file next to db_path and return its path.
+    
+    Each build or refresh gets its own file, so concurrent ones never write into
+    each other's before swap_in. It takes the mode a new database would get, not
+    mkstemp's owner-only one, since it becomes db_path.
+    """
+    fd, build_path = tempfile.mkstemp(prefix=os.path.basename(db_path) + '.', suffix='.build',
+                                      dir=os.path.dirname(db_path) or '.')
+    os.close(fd)
+    umask = os.umask(0)
+    os.umask(umask)
+    os.chmod(build_path, 0o666 & ~umask)
+    return build_path
+
+def open_build(build_path, source=None):
+    """Connect to a fresh build file, copied from the source connection's database when given.
+    
+    A failed build is thrown away, so the load needs no rollback journal or fsyncs;
+    swap_in restores the defaults.
+    """
+    conn = sqlite3.connect(build_path)
+    if source is not None:
+        # The backup API copies one consistent state, even while others write
+        source.backup(conn)
+    cursor = conn.cursor()
+    cursor.execute('PRAGMA journal_mode = OFF')
+    cursor.execute('PRAGMA synchronous = OFF')
+    cursor.execute('PRAGMA cache_size = -65536')
+    return conn
+
+def swap_in(conn, build_path, db_path):
+    """Close a finished build and atomically replace db_path with it.
+    
+    Readers keep the old file open until they reconnect, so they never see a
+    missing or half-written database, and never wait on the build's writes.
+    """
+    conn.execute('PRAGMA journal_mode = DELETE')
     conn.close()
+    os.replace(build_path, db_path)
+
+def create_database(source=CSV_SOURCE, db_path=DB_PATH):
+    """Build the database from the menu CSVs in source (see build_database)."""
+    build_database(load_rows(source), db_path)
+
+def build_database(rows, db_path=DB_PATH):
+    """Build the database from scratch in a temporary file and swap it in atomically.
+    
+    rows are cleaned rows in COLUMNS order, streamed into the bulk insert. Readers
+    keep the old file open until they reconnect, so they never see a missing or
+    half-built database. The item snapshot is then written from the inserted
+    batches and swapped in the same way.
+    """
+    start = time.perf_counter()
+    
+    # Connect to database
+    build_path = reserve_build(db_path)
+    conn = None
+    try:
+        conn = open_build(build_path)
+        cursor = conn.cursor()
+    
+        create_schema(cursor)
+    
+        # Read CSV and insert data in a single transaction
+        hashes = {}
+        columns = SnapshotColumns()
+        with span('insert'):
+            cursor.execute('BEGIN')
+            row_count = bulk_insert(conn, hash_rows(rows, hashes), collect=columns.add)
+            cursor.executemany('INSERT INTO row_hashes (company, item, hash) VALUES (?, ?, ?)',
+                               ((company, item, group_hash(total)) for (company, item), total in hashes.items()))
+            conn.commit()
     
+        # Solvers read the item store, so only company lookups (list, dump and the deletes
+        # of a refresh) and the hash keys need an index
+        with span('indexes'):
+            create_item_index(cursor)
+            create_hash_index(cursor)
+    
+        # Canonical company names behind --company; the item_search index behind --search
+        # is built by its first search (see search.item_predicate)
+        with span('companies'):
+            create_company_table(cursor)
+    
+        version = stamp_data_version(cursor)
+    
+        # Commit changes and close connection
+        conn.commit()
+        swap_in(conn, build_path, db_path)
+    finally:
+        # Only a failed build is still there
+        if os.path.exists(build_path):
+            if conn is not None:
+                conn.close()
+            os.remove(build_path)
+    
+    # Until it is replaced, the old snapshot's data version no longer matches, so
+    # loads in between read SQLite instead
+    with span('snapshot'):
+        try:
+            columns.write(snapshot_path(db_path), version)
+        except OSError:
+            # A read-only directory leaves the snapshot to the first load
+            pass
+    
+    elapsed = time.perf_counter() - start
     print("Database created successfully!")
+    print(f"Loaded {row_count} rows in {elapsed:.2f} s ({row_count / elapsed:,.0f} rows/s)")
+
+def refresh_database(source=CSV_SOURCE, db_path=DB_PATH):
+    """Apply only the (company, item) groups whose content changed since the last load.
+    
+    A first pass over the CSVs only hashes the groups, so the diff is computed
+    without holding any rows. The changes are then applied to a copy of the
+    database, streaming the changed groups' rows in a second pass, and the copy
+    is swapped in as build_database does: readers are never blocked and see
+    either the old or the new menu. The item snapshot is rewritten to match.
+    Falls back to a full build when there is nothing to diff against.
+    
+    Only the CSV parsing and the SQL writes scale with the change. Copying the
+    database and reloading the whole item store for the snapshot still scale
+    with the catalog; that is the price of never blocking readers.
+    """
+    if not os.path.exists(db_path):
+        create_database(source, db_path)
+        return
+    
+    start = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    
+    if not has_table(conn, 'row_hashes') or not has_table(conn, 'companies'):
+        # Built before content hashes and search tables were recorded
+        conn.close()
+        create_database(source, db_path)
+        return
+    
+    cursor.execute('SELECT company, item, hash FROM row_hashes')
+    old_hashes = {(company, item): row_hash for company, item, row_hash in cursor.fetchall()}
+    
+    hashes = {}
+    with span('hash'):
+        deque(hash_rows(load_rows(source), hashes), maxlen=0)
+    new_hashes = {key: group_hash(total) for key, total in hashes.items()}
+    
+    changed = [key for key, row_hash in new_hashes.items() if old_hashes.get(key) != row_hash]
+    removed = [key for key in old_hashes if key not in new_hashes]
+    
+    if changed or removed:
+        build_path = reserve_build(db_path)
+        build = None
+        try:
+            build = open_build(build_path, source=conn)
+            conn.close()
+            cursor = build.cursor()
+            with span('apply'):
+                cursor.execute('BEGIN')
+                cursor.executemany(DELETE_GROUP_SQL, changed + removed)
+                cursor.executemany('DELETE FROM row_hashes WHERE company IS ? AND item IS ?', changed + removed)
+                changed_keys = set(changed)
+                bulk_insert(build, (row for row in load_rows(source) if (row[0], row[1]) in changed_keys))
+                cursor.executemany('INSERT INTO row_hashes (company, item, hash) VALUES (?, ?, ?)',
+                                   ((company, item, new_hashes[(company, item)]) for company, item in changed))
+                add_companies(cursor, {company for company, _ in changed})
+                drop_unused_companies(cursor, {company for company, _ in removed})
+                if has_table(build, 'result_cache'):
+                    # Results for the old data can never be hit again; drop them here so
+                    # a ResultCache opened on the new data only has to read
+                    cursor.execute('DELETE FROM result_cache')
+                stamp_data_version(cursor)
+                build.commit()
+            swap_in(build, build_path, db_path)
+        finally:
+            if os.path.exists(build_path):
+                conn.close()
+                if build is not None:
+                    build.close()
+                os.remove(build_path)
+    
+        # Ids of the rows kept are unchanged, but rows come and go anywhere in the
+        # table, so the snapshot is written from a load of the new database
+        with span('snapshot'):
+            load_item_store(db_path)
+    else:
+        conn.close()
+    
+    elapsed = time.perf_counter() - start
+    print("Database refreshed successfully!")
+    print(f"{len(changed)} items added or changed, {len(removed)} removed in {elapsed:.2f} s")
+
+def main():
+    parser = argparse.ArgumentParser(description='Build fast_food.db from the nutrition menu CSV')
+    parser.add_argument('--csv', default=CSV_SOURCE,
+                        help=f'Menu CSV, directory of CSVs or glob to load (default: {CSV_SOURCE})')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Update only the items that changed instead of rebuilding the database')
+    args = parser.parse_args()
+    
+    if not menu_files(args.csv):
+        print(f"Error: No menu CSV files match {args.csv}")
+        exit(1)
+    
+    if args.refresh:
+        refresh_database(args.csv)
+    else:
+        create_database(args.csv)
 
 if __name__ == "__main__":
-    create_database() 
\ No newline at end of file
+    main()
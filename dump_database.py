@@ -1,35 +1,249 @@
 #!/usr/bin/env python3
+import argparse
+import bz2
 import csv
-import sqlite3
+import gzip
+import json
+import lzma
 import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import zipfile
 
-def dump_database(output_file='nutrition/fast_food_dump.csv'):
-    # Connect to database
-    conn = sqlite3.connect('fast_food.db')
-    cursor = conn.cursor()
+import numpy as np
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+from create_database import BATCH_SIZE
+from search import company_predicate, resolve_companies
+
+FORMATS = ['csv', 'jsonl', 'npz', 'arrow']
+
+# File openers for text and Arrow output; npz compresses its zip entries instead
+OPENERS = {None: open, 'gzip': gzip.open, 'bz2': bz2.open, 'xz': lzma.open}
+SUFFIXES = {'gzip': '.gz', 'bz2': '.bz2', 'xz': '.xz'}
+ZIP_COMPRESSION = {None: zipfile.ZIP_STORED, 'gzip': zipfile.ZIP_DEFLATED, 'bz2': zipfile.ZIP_BZIP2,
+                   'xz': zipfile.ZIP_LZMA}
+
+ARROW_MISSING = "pyarrow is required for Arrow output. Install with: pip install pyarrow"
+
+def table_columns(conn):
+    """{column: declared type} of fast_food_items, in schema order.
     
-    # Get column names
+    table_info leaves out the generated protein_per_calorie and fat_calorie_share
+    columns, which SELECT * would include; they are derived from the columns dumped.
+    """
+    cursor = conn.cursor()
     cursor.execute('PRAGMA table_info(fast_food_items)')
-    columns = [info[1] for info in cursor.fetchall()]
-    columns.pop(0)  # Remove the ID column
+    return {info[1]: info[2].upper() for info in cursor.fetchall()}
+
+def infer_format(output_file):
+    """(format, compression) from a name like menu.jsonl.gz; CSV and no compression if unrecognized."""
+    name = output_file
+    compression = None
+    for method, suffix in SUFFIXES.items():
+        if name.endswith(suffix):
+            compression = method
+            name = name[:-len(suffix)]
+    extension = os.path.splitext(name)[1].lstrip('.').lower()
+    if extension in ('feather', 'ipc'):
+        extension = 'arrow'
+    return (extension if extension in FORMATS else 'csv'), compression
+
+def fetch_batches(cursor, batch_size):
+    """Yield the cursor's rows in fetchmany batches, so only one batch is ever held."""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+def write_csv(file, columns, batches):
+    writer = csv.writer(file)
+    writer.writerow(columns)
+    for rows in batches:
+        writer.writerows(rows)
+
+def write_jsonl(file, columns, batches):
+    for rows in batches:
+        file.writelines(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n' for row in rows)
+
+def column_dtypes(conn, columns, types, where, params):
+    """NumPy dtype per column: int64 ids, float64 numbers (NaN for NULL) and UTF-8 bytes as wide as the longest value."""
+    dtypes = {}
+    text = [column for column in columns if types[column] == 'TEXT']
+    widths = [1] * len(text)
+    if text:
+        cursor = conn.cursor()
+        cursor.execute(f'SELECT {", ".join(f"max(length(CAST({column} AS BLOB)))" for column in text)} '
+                       f'FROM fast_food_items{where}', params)
+        widths = [width or 1 for width in cursor.fetchone()]
+    width_of = dict(zip(text, widths))
+    for column in columns:
+        if column == 'id':
+            dtypes[column] = np.dtype(np.int64)
+        elif column in width_of:
+            dtypes[column] = np.dtype(f'S{width_of[column]}')
+        else:
+            dtypes[column] = np.dtype(np.float64)
+    return dtypes
+
+def write_npz(output_file, columns, batches, dtypes, compression):
+    """Write one .npy array per column into an npz archive, as np.savez would.
+    
+    Each batch is appended to a spool file per column, so memory holds one batch;
+    the spools are then copied into the archive behind .npy headers, since zip
+    entries must be written one after another.
+    """
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output_file))) as spool_dir:
+        spools = [open(os.path.join(spool_dir, f'{offset}.bin'), 'wb') for offset in range(len(columns))]
+        count = 0
+        try:
+            for rows in batches:
+                for offset, values in enumerate(zip(*rows)):
+                    dtype = dtypes[columns[offset]]
+                    if dtype.kind == 'S':
+                        values = [b'' if value is None else value.encode('utf-8') for value in values]
+                    elif dtype.kind == 'f':
+                        values = [np.nan if value is None else value for value in values]
+                    spools[offset].write(np.asarray(values, dtype=dtype).tobytes())
+                count += len(rows)
+        finally:
+            for spool in spools:
+                spool.close()
+    
+        with zipfile.ZipFile(output_file, 'w', compression=ZIP_COMPRESSION[compression], allowZip64=True) as archive:
+            for offset, column in enumerate(columns):
+                with archive.open(f'{column}.npy', 'w', force_zip64=True) as entry, \
+                        open(os.path.join(spool_dir, f'{offset}.bin'), 'rb') as spool:
+                    np.lib.format.write_array_header_1_0(entry, {'descr': np.lib.format.dtype_to_descr(dtypes[column]),
+                                                                 'fortran_order': False, 'shape': (count,)})
+                    shutil.copyfileobj(spool, entry)
+
+def write_arrow(file, columns, batches, types):
+    """Write an Arrow IPC file with one record batch per fetched batch."""
+    arrow_types = {'INTEGER': pa.int64(), 'REAL': pa.float64(), 'TEXT': pa.string()}
+    schema = pa.schema([(column, arrow_types.get(types[column], pa.float64())) for column in columns])
+    with pa.ipc.new_file(file, schema) as writer:
+        for rows in batches:
+            arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+
+def dump_query(conn, columns, company=None):
+    """(sql, where, params) of the SELECT a dump streams, restricted to the companies company resolves to."""
+    where = ''
+    params = []
+    if company:
+        companies = resolve_companies(conn, company)
+        predicate, params = company_predicate(companies) if companies else ('0', [])
+        where = f' WHERE {predicate}'
+    return f'SELECT {", ".join(columns)} FROM fast_food_items{where} ORDER BY id', where, params
+
+def dump_database(output_file='nutrition/fast_food_dump.csv', fmt=None, compression=None, columns=None,
+                  company=None, batch_size=BATCH_SIZE, db_path='fast_food.db'):
+    """Stream fast_food_items to output_file as CSV, JSONL, npz or Arrow.
     
-    # Get all data
-    cursor.execute('SELECT * FROM fast_food_items')
-    rows = cursor.fetchall()
+    fmt and compression ('gzip', 'bz2' or 'xz') default to what the file name
+    implies; npz compresses the columns inside its archive, so its file name
+    must not carry a compression suffix (ValueError). columns defaults to every stored column but id; company filters to
+    the companies it resolves to. Rows are read in fetchmany batches of
+    batch_size, so memory stays flat however large the table is. Returns the
+    number of rows written.
+    """
+    start = time.perf_counter()
+    inferred_fmt, inferred_compression = infer_format(output_file)
+    fmt = fmt or inferred_fmt
+    if fmt == 'npz' and inferred_compression:
+        # The archive itself is never wrapped, so a .xz name would promise a stream it is not
+        raise ValueError(f"npz output is a zip archive, not a {SUFFIXES[inferred_compression]} stream. "
+                         f"Name it .npz and pass --compression {inferred_compression} to compress its columns")
+    compression = compression or inferred_compression
+    if fmt == 'arrow' and pa is None:
+        raise ValueError(ARROW_MISSING)
+    
+    # Connect to database
+    conn = sqlite3.connect(db_path)
+    types = table_columns(conn)
+    if columns is None:
+        columns = [column for column in types if column != 'id']
+    unknown = [column for column in columns if column not in types]
+    if unknown:
+        conn.close()
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}. Choose from {', '.join(types)}")
+    
+    query, where, params = dump_query(conn, columns, company)
+    cursor = conn.cursor()
+    cursor.execute(query, params)
     
     # Ensure directory exists
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    if os.path.dirname(output_file):
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    
+    rows_written = 0
+    
+    def counted(batches):
+        nonlocal rows_written
+        for rows in batches:
+            rows_written += len(rows)
+            yield rows
     
-    # Write to CSV
-    with open(output_file, 'w', newline='', encoding='utf-8') as file:
-        csv_writer = csv.writer(file)
-        csv_writer.writerow(columns)  # Write header
-        
-        for row in rows:
-            csv_writer.writerow(row[1:])  # Skip the ID column
+    batches = counted(fetch_batches(cursor, batch_size))
+    try:
+        if fmt == 'npz':
+            write_npz(output_file, columns, batches, column_dtypes(conn, columns, types, where, params), compression)
+        elif fmt == 'arrow':
+            with OPENERS[compression](output_file, 'wb') as file:
+                write_arrow(file, columns, batches, types)
+        else:
+            opener = OPENERS[compression]
+            with opener(output_file, 'wt', newline='', encoding='utf-8') as file:
+                if fmt == 'jsonl':
+                    write_jsonl(file, columns, batches)
+                else:
+                    write_csv(file, columns, batches)
+    finally:
+        conn.close()
     
-    conn.close()
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(output_file)
     print(f"Database dumped to {output_file} successfully!")
+    print(f"Wrote {rows_written} rows ({size / 2**20:.1f} MiB) in {elapsed:.2f} s "
+          f"({rows_written / elapsed:,.0f} rows/s, {size / 2**20 / elapsed:.1f} MiB/s)")
+    return rows_written
+
+def main():
+    parser = argparse.ArgumentParser(description='Export fast_food.db as CSV, JSONL, npz or Arrow')
+    parser.add_argument('output', nargs='?', default='nutrition/fast_food_dump.csv',
+                        help='Output file; its extension picks the format and compression '
+                             '(default: nutrition/fast_food_dump.csv)')
+    parser.add_argument('--format', choices=FORMATS, help='Output format (default: from the file name, else csv)')
+    parser.add_argument('--compression', choices=list(SUFFIXES),
+                        help='Compress the output (default: from a .gz, .bz2 or .xz file name); '
+                             'npz compresses each column inside the archive')
+    parser.add_argument('--columns', help='Comma-separated columns to export (default: all but id)')
+    parser.add_argument('--company', help='Only export these companies (prefix, partial or fuzzy match)')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help=f'Rows fetched per batch (default: {BATCH_SIZE})')
+    args = parser.parse_args()
+    
+    if not os.path.exists('fast_food.db'):
+        print("Error: Database file not found. Run create_database.py first.")
+        exit(1)
+    if args.batch_size < 1:
+        print("Error: --batch-size must be at least 1.")
+        exit(1)
+    
+    columns = [column.strip() for column in args.columns.split(',')] if args.columns else None
+    try:
+        dump_database(args.output, args.format, args.compression, columns, args.company, args.batch_size)
+    except ValueError as e:
+        print(f"Error: {e}")
+        exit(1)
 
 if __name__ == "__main__":
-    dump_database() 
\ No newline at end of file
+    main()
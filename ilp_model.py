@@ -0,0 +1,258 @@
+import importlib
+import importlib.util
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from profiling import count, span
+
+# Models kept per process; each holds one solver instance with a variable per item
+MAX_MODELS = 32
+
+# The solver modules, imported by load_backends when a model is first built:
+# PuLP alone takes longer to import than most solves, and most commands never
+# build a model. Each becomes None if it is not installed
+NOT_LOADED = object()
+highspy = NOT_LOADED
+pulp = NOT_LOADED
+
+def import_optional(name):
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+def load_backends():
+    """(highspy, pulp), importing them on first use; None for one that is not installed."""
+    global highspy, pulp
+    if highspy is NOT_LOADED:
+        highspy = import_optional('highspy')
+    if pulp is NOT_LOADED:
+        pulp = import_optional('pulp')
+    return highspy, pulp
+
+def installed(module, name):
+    # Until it is imported, a module is only looked up, which runs none of its code
+    if module is NOT_LOADED:
+        return importlib.util.find_spec(name) is not None
+    return module is not None
+
+def backend_available():
+    return installed(highspy, 'highspy') or installed(pulp, 'pulp')
+
+def choose_backend(packing=False):
+    """'highs' (in process) or 'cbc' (PuLP subprocess) for a model, None if neither is installed.
+    
+    HiGHS avoids CBC's file-and-subprocess round trip and is several times faster
+    on covering models (minimum bounds), but CBC's knapsack cover cuts prove
+    packing models (maximum bounds) optimal sooner, by more than the round trip
+    costs; see benchmarks/ilp_models.py.
+    """
+    highs, cbc = load_backends()
+    if highs is not None and (not packing or cbc is None):
+        return 'highs'
+    return 'cbc' if cbc is not None else None
+
+class SelectionModel:
+    """A pick-or-skip ILP over a fixed item set, built once and re-solved with new parameters.
+    
+    Maximizes objective . x over binary x subject to one row per named weight vector
+    and a 'count' row (the number of items picked). Only row bounds and the
+    objective change between solves, and each solve starts from the previous
+    solution or a given one. packing marks models that will have maximum bounds,
+    which picks the backend (see choose_backend), importing the solver modules
+    on first use. weights keeps each named row's coefficients, for building a
+    start selection.
+    """
+    
+    def __init__(self, objective, rows, items=None, packing=False):
+        self.items = items
+        self.backend = choose_backend(packing)
+        self.n = len(objective)
+        self.row_names = list(rows) + ['count']
+        self.solves = 0
+        self.lock = threading.Lock()
+        self._objective = list(objective)
+        self._previous = None
+        self.weights = {name: list(weights) for name, weights in rows.items()}
+        rows = dict(rows, count=[1] * self.n)
+        count('ilp models built')
+        count('ilp variables', self.n)
+        count('ilp rows', len(self.row_names))
+        with span('ilp build'):
+            if self.backend == 'highs':
+                self._build_highs(rows)
+            else:
+                self._build_pulp(rows)
+    
+    def _build_highs(self, rows):
+        n = self.n
+        h = highspy.Highs()
+        h.setOptionValue('output_flag', False)
+        h.setOptionValue('mip_rel_gap', 0.0)
+        # These models are small and re-solved many times; presolve, restarts and the
+        # sub-MIP heuristics cost more per solve than they save, and the warm start
+        # already supplies an incumbent
+        for option in ['mip_heuristic_run_rins', 'mip_heuristic_run_rens', 'mip_heuristic_run_feasibility_jump',
+                       'mip_heuristic_run_root_reduced_cost', 'mip_detect_symmetry', 'mip_allow_restart']:
+            h.setOptionValue(option, False)
+        h.setOptionValue('presolve', 'off')
+        indexes = np.arange(n, dtype=np.int32)
+        h.addVars(n, np.zeros(n), np.ones(n))
+        h.changeColsIntegrality(n, indexes, np.full(n, highspy.HighsVarType.kInteger))
+        h.changeObjectiveSense(highspy.ObjSense.kMaximize)
+        h.changeColsCost(n, indexes, np.asarray(self._objective, dtype=np.float64))
+        for name in self.row_names:
+            weights = np.asarray(rows[name], dtype=np.float64)
+            nonzero = np.flatnonzero(weights).astype(np.int32)
+            h.addRow(-highspy.kHighsInf, highspy.kHighsInf, len(nonzero), nonzero, weights[nonzero])
+        self._highs = h
+    
+    def _build_pulp(self, rows):
+        # Posed as minimizing the negated objective: CBC 2.10 with -max and a MIP start
+        # applies the start's cutoff the wrong way and reports the start as optimal
+        self._problem = pulp.LpProblem("Selection", pulp.LpMinimize)
+        self._x = [pulp.LpVariable(f"x_{i}", cat=pulp.LpBinary) for i in range(self.n)]
+        self._problem.setObjective(pulp.lpDot([-value for value in self._objective], self._x))
+        # Each row gets a >= and a <= constraint whose constants are updated in place;
+        # an open side is set just past the row's reachable range, so it never binds
+        self._constraints = {}
+        self._ranges = {}
+        for row, name in enumerate(self.row_names):
+            expression = pulp.lpDot(rows[name], self._x)
+            lower = pulp.LpConstraint(expression, pulp.LpConstraintGE, rhs=0)
+            upper = pulp.LpConstraint(expression, pulp.LpConstraintLE, rhs=0)
+            self._problem.addConstraint(lower, f"r{row}_min")
+            self._problem.addConstraint(upper, f"r{row}_max")
+            self._constraints[name] = (lower, upper)
+            self._ranges[name] = (sum(min(weight, 0) for weight in rows[name]) - 1,
+                                  sum(max(weight, 0) for weight in rows[name]) + 1)
+    
+    @property
+    def objective(self):
+        return self._objective
+    
+    def solve(self, bounds=None, item_limit=None, objective=None, deadline=None, start=None):
+        """Indexes of the chosen items, or None if no selection satisfies the bounds.
+    
+        bounds maps row names to (lower, upper) totals, None meaning open; rows
+        without a bound are unconstrained. objective, if given, replaces the
+        current objective for this and later solves. start, the indexes of a
+        feasible selection, is the first incumbent instead of the previous
+        solution. With a deadline the solver stops at the time limit with its
+        incumbent (None if it has none yet), marking the deadline hit and
+        recording the solver's dual bound if known.
+        """
+        bounds = dict(bounds or {})
+        bounds['count'] = (None, item_limit)
+        if start is not None:
+            initial = [0.0] * self.n
+            for i in start:
+                initial[i] = 1.0
+        else:
+            initial = self._previous
+        count('ilp solves')
+        with self.lock, span(f'ilp solve ({self.backend})'):
+            self.solves += 1
+            if self.backend == 'highs':
+                return self._solve_highs(bounds, objective, deadline, initial)
+            return self._solve_pulp(bounds, objective, deadline, initial)
+    
+    def _solve_highs(self, bounds, objective, deadline, initial):
+        h = self._highs
+        for row, name in enumerate(self.row_names):
+            lower, upper = bounds.get(name, (None, None))
+            h.changeRowBounds(row, -highspy.kHighsInf if lower is None else lower,
+                              highspy.kHighsInf if upper is None else upper)
+        if objective is not None:
+            self._objective = list(objective)
+            h.changeColsCost(self.n, np.arange(self.n, dtype=np.int32), np.asarray(objective, dtype=np.float64))
+        if initial is not None:
+            # A start that breaks the new bounds is discarded by HiGHS
+            solution = highspy.HighsSolution()
+            solution.col_value = initial
+            h.setSolution(solution)
+    
+        h.setOptionValue('time_limit', deadline.remaining() if deadline is not None else highspy.kHighsInf)
+        h.run()
+        status = h.getModelStatus()
+        if status == highspy.HighsModelStatus.kTimeLimit:
+            deadline.hit = True
+            info = h.getInfo()
+            deadline.record_bound(info.mip_dual_bound if abs(info.mip_dual_bound) < highspy.kHighsInf else None)
+            if info.primal_solution_status != 2:
+                return None
+        elif status != highspy.HighsModelStatus.kOptimal:
+            return None
+        values = list(h.getSolution().col_value)
+        self._previous = values
+        return [i for i, value in enumerate(values) if value > 0.5]
+    
+    def _solve_pulp(self, bounds, objective, deadline, initial):
+        problem = self._problem
+        for name in self.row_names:
+            lower, upper = bounds.get(name, (None, None))
+            low, high = self._ranges[name]
+            self._constraints[name][0].constant = -(low if lower is None else lower)
+            self._constraints[name][1].constant = -(high if upper is None else upper)
+        if objective is not None:
+            self._objective = list(objective)
+            problem.setObjective(pulp.lpDot([-value for value in self._objective], self._x))
+        if initial is not None:
+            for variable, value in zip(self._x, initial):
+                variable.setInitialValue(value)
+    
+        time_limit = deadline.remaining() if deadline is not None else None
+        problem.solve(pulp.PULP_CBC_CMD(msg=False, warmStart=initial is not None, timeLimit=time_limit))
+        if deadline is not None and problem.sol_status == pulp.LpSolutionIntegerFeasible:
+            # CBC stopped at the time limit with an incumbent; PuLP does not report its bound
+            deadline.hit = True
+        elif pulp.LpStatus[problem.status] != 'Optimal':
+            if deadline is not None and deadline.expired():
+                deadline.hit = True
+            return None
+        values = [round(pulp.value(variable) or 0) for variable in self._x]
+        self._previous = values
+        return [i for i, value in enumerate(values) if value > 0.5]
+
+class ModelManager:
+    """Least recently used SelectionModels, one per (name, item list).
+    
+    The solvers receive the same sequence object for repeated queries over one
+    item set (the ItemStore hands out cached row tuples), so a model is keyed by
+    that object's identity. Each model keeps a reference to its owner, so the
+    identity cannot be reused by another object while the model is cached. A
+    list can still be changed in place, so for anything but a tuple the model
+    also keeps a copy of the contents it was built from, and a hit whose list
+    no longer matches it builds a new model.
+    """
+    
+    def __init__(self, max_models=MAX_MODELS):
+        self.max_models = max_models
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def model(self, name, owner, build):
+        """The cached model for (name, owner), calling build() to create it on a miss."""
+        key = (name, id(owner))
+        contents = owner if isinstance(owner, tuple) else tuple(owner)
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None and entry[0] is owner and (entry[1] is contents or entry[1] == contents):
+                self._models.move_to_end(key)
+                return entry[2]
+    
+        model = build()
+        with self._lock:
+            self._models[key] = (owner, contents, model)
+            self._models.move_to_end(key)
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+        return model
+    
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+MODELS = ModelManager()
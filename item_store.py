@@ -0,0 +1,244 @@
+import os
+import sqlite3
+import sys
+import threading
+
+import numpy as np
+
+from optimizer import NUTRIENT_COLUMNS
+from queries import QUERIES
+from result_cache import data_version
+from search import CompanyIndex
+from snapshot import read_snapshot, snapshot_path, write_snapshot
+
+INTEGER_COLUMNS = {'calories', 'calories_from_fat'}
+
+# Every row in id order, the rowid order a plain table read already returns
+LOAD_SQL = f'SELECT id, item, company, {", ".join(NUTRIENT_COLUMNS)} FROM fast_food_items ORDER BY id'
+
+class ItemView:
+    """A subset of an ItemStore's rows, as ascending row indexes into its arrays."""
+    
+    def __init__(self, store, indexes):
+        self.store = store
+        self.indexes = indexes
+    
+    def __len__(self):
+        return len(self.indexes)
+    
+    def column(self, column):
+        """One nutrient for the rows of this view as a float64 array (NaN for NULL)."""
+        return self.store.columns[column][self.indexes]
+    
+    def rows(self, columns):
+        """Tuples of the given columns, in the layout an SQL SELECT would return."""
+        return list(zip(*(self.store.values(column, self.indexes) for column in columns)))
+
+class ItemStore:
+    """fast_food_items loaded once into typed column arrays.
+    
+    Every nutrient is one float64 row of a single matrix, with NaN for NULL;
+    company and item names are interned and companies are also held as integer
+    codes. A boolean row mask per built-in query's validity predicate and a
+    stable sort of the company codes, in which each company's rows are one
+    slice, are built on first use and kept. Selecting the rows of a query is
+    then a mask lookup over the company's rows rather than a table scan, and
+    the row tuples the solvers take are built once per (query, company filter).
+    Nothing is derived from the rows when the store is made, so a store mapped
+    from a snapshot opens without reading the matrix.
+    """
+    
+    def __init__(self, db_path='fast_food.db'):
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        cursor.execute(LOAD_SQL)
+        rows = cursor.fetchall()
+        version = data_version(conn)
+        conn.close()
+    
+        company_names = sorted({row[2] for row in rows if row[2] is not None})
+        company_code = {company: code for code, company in enumerate(company_names)}
+    
+        # Row 0 holds ids, row 1 company codes (-1 for none) and the rest one nutrient
+        # each, with NULL as NaN
+        matrix = np.empty((2 + len(NUTRIENT_COLUMNS), len(rows)), dtype=np.float64)
+        matrix[0] = [row[0] for row in rows]
+        matrix[1] = [company_code.get(row[2], -1) for row in rows]
+        for offset, column in enumerate(NUTRIENT_COLUMNS):
+            values = [row[3 + offset] for row in rows]
+            matrix[2 + offset] = [np.nan if v is None else v for v in values]
+    
+        names = [sys.intern(row[1]) if row[1] is not None else None for row in rows]
+        self._build(matrix, names, company_names, version)
+    
+    @classmethod
+    def from_matrix(cls, matrix, names, company_names, data_version=None):
+        """Wrap an existing numeric matrix, such as one in shared memory, without copying it."""
+        store = cls.__new__(cls)
+        store._build(matrix, names, company_names, data_version)
+        return store
+    
+    @classmethod
+    def from_snapshot(cls, path):
+        """Map a binary snapshot written by create_database.py; the matrix stays in the page cache."""
+        matrix, names, company_names, version = read_snapshot(path)
+        return cls.from_matrix(matrix, names, company_names, version)
+    
+    def _build(self, matrix, names, company_names, data_version):
+        # Only views of the matrix are made here, so mapping a snapshot reads none of
+        # its pages; everything derived from the rows is built on first use
+        self.matrix = matrix
+        self.data_version = data_version
+        self.names = names
+    
+        self.company_names = company_names
+        self.company_code = {company: code for code, company in enumerate(company_names)}
+        self.company_codes = matrix[1]
+    
+        self.columns = {column: matrix[2 + offset] for offset, column in enumerate(NUTRIENT_COLUMNS)}
+    
+        self._derived = {}
+        self._rows = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return self.matrix.shape[1]
+    
+    def values(self, column, indexes):
+        """One column at the given rows as a list of the values SQLite would return, None for NULL."""
+        if column == 'id':
+            return self.matrix[0][indexes].astype(np.int64).tolist()
+        if column == 'item':
+            if isinstance(self.names, list):
+                return [self.names[index] for index in indexes.tolist()]
+            return self.names.take(indexes)
+        if column == 'company':
+            names = self.company_names + [None]
+            return [names[code] for code in self.company_codes[indexes].astype(np.int64).tolist()]
+    
+        column_values = self.columns[column][indexes]
+        missing = np.isnan(column_values)
+        if column in INTEGER_COLUMNS:
+            values = np.where(missing, 0, column_values).astype(np.int64).tolist()
+        else:
+            values = column_values.tolist()
+        for index in np.flatnonzero(missing).tolist():
+            values[index] = None
+        return values
+    
+    def _cached(self, cache, key, build):
+        with self._lock:
+            value = cache.get(key)
+        if value is None:
+            value = build()
+            with self._lock:
+                value = cache.setdefault(key, value)
+        return value
+    
+    @property
+    def company_index(self):
+        return self._cached(self._derived, 'company index', lambda: CompanyIndex.from_names(self.company_names))
+    
+    def company_order(self):
+        """(order, starts): row indexes sorted by company code, stably, and where each code's rows start.
+    
+        Rows of company code c are order[starts[c]:starts[c + 1]], in ascending
+        order; rows without a company sort first and belong to no slice.
+        """
+        def build():
+            order = np.argsort(self.company_codes, kind='stable')
+            starts = np.searchsorted(self.company_codes[order], np.arange(len(self.company_names) + 1))
+            return order, starts
+    
+        return self._cached(self._derived, 'company order', build)
+    
+    def present(self, columns):
+        """Mask of the rows where every one of columns is present."""
+        mask = np.ones(len(self), dtype=bool)
+        for column in columns:
+            mask &= ~np.isnan(self.columns[column])
+        return mask
+    
+    def query_mask(self, command):
+        """Mask of the rows passing a built-in query's validity predicate."""
+        def build():
+            spec = QUERIES[command]
+            mask = self.present(spec['not_null'])
+            for column in spec['positive']:
+                mask &= self.columns[column] > 0
+            return mask
+    
+        return self._cached(self._derived, ('query mask', command), build)
+    
+    def company_rows(self, company):
+        """Ascending row indexes of every company the filter resolves to through the company index."""
+        order, starts = self.company_order()
+        codes = [self.company_code[name] for name in self.company_index.resolve(company)]
+        if not codes:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate([order[starts[code]:starts[code + 1]] for code in codes]))
+    
+    def view(self, mask, company=None):
+        if company:
+            indexes = self.company_rows(company)
+            return ItemView(self, indexes[mask[indexes]])
+        return ItemView(self, np.flatnonzero(mask))
+    
+    def query_view(self, command, company=None):
+        """Rows passing a built-in query's validity predicate, in id order."""
+        return self.view(self.query_mask(command), company)
+    
+    def company_key(self, company):
+        """The canonical companies a filter resolves to, as a cache key; None without a filter.
+    
+        Caching by resolved names rather than by the filter text keeps the caches
+        bounded by the companies in the store, however many spellings clients
+        send, and lets every spelling of one chain share its rows.
+        """
+        return tuple(self.company_index.resolve(company)) if company else None
+    
+    def items(self, command, company=None):
+        """Solver-ready tuples for a built-in query, laid out as QUERIES[command]['columns'].
+    
+        The rows come back as a tuple, shared by every caller: it cannot be changed
+        in place, so the ILP models kept for it stay valid.
+        """
+        key = (command, self.company_key(company))
+        return self._cached(self._rows, key,
+                            lambda: tuple(self.query_view(command, company).rows(QUERIES[command]['columns'])))
+    
+    def rows(self, columns, company=None):
+        """(id, item, company, *columns) tuples, for optimize, of the rows where every column is present, as a tuple."""
+        def build():
+            return tuple(self.view(self.present(columns), company).rows(['id', 'item', 'company'] + list(columns)))
+    
+        key = (tuple(columns), self.company_key(company))
+        return self._cached(self._rows, key, build)
+
+def load_item_store(db_path='fast_food.db'):
+    """The ItemStore for db_path, mapped from its snapshot when that matches the database's data version.
+    
+    create_database.py writes the snapshot with every build. A missing, stale or
+    unreadable one falls back to loading from SQLite, and the loaded arrays are
+    then written as the new snapshot for later loads.
+    """
+    path = snapshot_path(db_path)
+    if os.path.exists(path):
+        conn = sqlite3.connect(db_path)
+        version = data_version(conn)
+        conn.close()
+        try:
+            store = ItemStore.from_snapshot(path)
+        except (OSError, ValueError):
+            store = None
+        if store is not None and version is not None and store.data_version == version:
+            return store
+    
+    store = ItemStore(db_path)
+    if store.data_version is not None:
+        try:
+            write_snapshot(path, store.matrix, store.names, store.company_names, store.data_version)
+        except OSError:
+            # A read-only directory only costs later loads their fast path
+            pass
+    return store
@@ -1,35 +1,247 @@
 # sat solver , integer linear programming
 
-def knapsack_max_protein(items, calorie_limit, item_limit=None):
-    n = len(items)
-    
-    dp = [[0 for _ in range(calorie_limit + 1)] for _ in range(n + 1)]
-    
-    for i in range(1, n + 1):
-        item_id, calories, protein, _, _ = items[i-1]
-        calories = int(calories)
-        
-        for w in range(1, calorie_limit + 1):
-            if calories <= w:
-                dp[i][w] = max(dp[i-1][w], dp[i-1][w-calories] + protein)
-            else:
-                dp[i][w] = dp[i-1][w]
-    
-    w = calorie_limit
-    selected_items = []
+import bisect
+import heapq
+import math
+import sys
+import time
+from itertools import combinations
+
+import numpy as np
+
+from ilp_model import MODELS, SelectionModel, backend_available
+from profiling import count, span
+
+ILP_MISSING = "PuLP or highspy is required for ILP optimization. Install with: pip install highspy (or pulp)"
+
+# Default relative error of the value-scaled DP (FPTAS) solvers
+DEFAULT_EPSILON = 0.01
+
+# Largest item limit the meet-in-the-middle solver takes, and the most half-selections
+# it enumerates before leaving the problem to branch-and-bound
+MITM_MAX_ITEMS = 6
+MITM_MAX_SUBSETS = 500000
+
+class Deadline:
+    """A wall-clock time limit for the anytime solvers.
+    
+    Solvers poll expired() as they work. One that stops early returns its best
+    selection so far and, when it has one, sets bound to an upper bound on the
+    optimal value; hit tells the caller the answer may not be optimal.
+    """
+    
+    def __init__(self, time_limit_ms):
+        self.time_limit_ms = time_limit_ms
+        self.end = time.perf_counter() + time_limit_ms / 1000
+        self.hit = False
+        self.bound = None
+    
+    def remaining(self):
+        return max(self.end - time.perf_counter(), 0.0)
+    
+    def expired(self):
+        if not self.hit and time.perf_counter() >= self.end:
+            self.hit = True
+        return self.hit
+    
+    def record_bound(self, bound):
+        """Keep the tightest upper bound reported so far."""
+        if bound is not None and (self.bound is None or bound < self.bound):
+            self.bound = bound
+
+def top_values_bound(values, item_limit=None):
+    """Upper bound on the total of any selection: its item_limit largest positive values."""
+    return sum(sorted((value for value in values if value is not None and value > 0), reverse=True)[:item_limit])
+
+def fractional_bound(values, weights, limit, item_limit=None):
+    """An upper bound on sum(values) over selections with sum(weights) <= limit.
+    
+    The smaller of the fractional knapsack bound (items by value per weight, the
+    last one taken in part) and the item_limit largest values. Weights must be
+    non-negative; weightless items are taken whole, and items that cannot fit or
+    add no value are ignored.
+    """
+    fitting = [(value, weight) for value, weight in zip(values, weights) if weight <= limit and value > 0]
+    fractional = sum(value for value, weight in fitting if weight <= 0)
+    remaining = limit
+    for value, weight in sorted((pair for pair in fitting if pair[1] > 0), key=lambda pair: pair[0] / pair[1],
+                                reverse=True):
+        if weight >= remaining:
+            fractional += value * remaining / weight
+            break
+        fractional += value
+        remaining -= weight
+    if item_limit is None:
+        return fractional
+    return min(fractional, top_values_bound([value for value, _ in fitting], item_limit))
+
+def max_protein_upper_bound(items, calorie_limit, item_limit=None):
+    """An upper bound on the protein any selection within the limits can reach (see fractional_bound)."""
+    return fractional_bound([item[2] for item in items], [item[1] for item in items], calorie_limit, item_limit)
+
+def knapsack_dp_table(weights, values, capacity, deadline=None):
+    """Fill the 0/1 knapsack DP over integer weights.
+    
+    Returns (row, keep): row[w] is the best value within weight w, and keep is the
+    bit-packed n x (capacity + 1) matrix of take decisions used by knapsack_dp_backtrack.
+    If the deadline expires the fill stops, and the table is exact for the items
+    processed so far; the rest are never taken.
+    """
+    n = len(weights)
+    weights = np.asarray(weights, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    
+    count('dp cells', n * (capacity + 1))
+    # Single rolling DP row; keep[i] records, bit-packed, which budgets took item i
+    row = np.zeros(capacity + 1, dtype=np.float64)
+    keep = np.zeros((n, (capacity + 8) // 8), dtype=np.uint8)
     
-    for i in range(n, 0, -1):
-        item_id, calories, protein, _, _ = items[i-1]
-        calories = int(calories)
-        
-        if w >= calories and dp[i][w] != dp[i-1][w]:
-            selected_items.append(items[i-1])
-            w -= calories
-            
-            if item_limit is not None and len(selected_items) >= item_limit:
-                break
+    for i in range(n):
+        if deadline is not None and deadline.expired():
+            break
+        weight = weights[i]
+        start = max(weight, 1)
+        if start > capacity:
+            continue
+    
+        # Shifted-max update: row[w] = max(row[w], row[w - weight] + value)
+        candidate = row[start - weight:capacity + 1 - weight] + values[i]
+        take = candidate > row[start:]
+        if take.any():
+            np.copyto(row[start:], candidate, where=take)
+            taken = np.zeros(capacity + 1, dtype=bool)
+            taken[start:] = take
+            keep[i] = np.packbits(taken)
+    
+    return row, keep
+
+def knapsack_dp_backtrack(weights, keep, capacity):
+    """Recover the chosen indices, last item first, for any budget up to the table's capacity."""
+    w = capacity
+    selected = []
     
-    return selected_items
+    for i in range(len(weights) - 1, -1, -1):
+        if keep[i, w >> 3] & (0x80 >> (w & 7)):
+            selected.append(i)
+            w -= int(weights[i])
+    
+    return selected
+
+def knapsack_dp_backtrack_many(weights, keep, budgets):
+    """knapsack_dp_backtrack for every budget at once, in one pass over the items.
+    
+    Each step tests the take bit of every budget still being walked with one
+    vectorized lookup, so the cost is n steps over len(budgets) entries in NumPy
+    rather than one Python loop over the items per budget.
+    """
+    weights = np.asarray(weights, dtype=np.int64)
+    w = np.array(budgets, dtype=np.int64)
+    selected = [[] for _ in range(len(w))]
+    if not len(w):
+        return selected
+    
+    # Items no budget ever took can be skipped outright
+    for i in reversed(np.flatnonzero(keep.any(axis=1)).tolist()):
+        took = np.flatnonzero(keep[i, w >> 3] & (0x80 >> (w & 7)))
+        if len(took):
+            w[took] -= weights[i]
+            for k in took.tolist():
+                selected[k].append(i)
+    
+    return selected
+
+def knapsack_dp(weights, values, capacity, deadline=None):
+    """0/1 knapsack over integer weights; returns the chosen indices, last item first."""
+    if len(weights) == 0 or capacity < 0:
+        return []
+    
+    with span('dp fill'):
+        _, keep = knapsack_dp_table(weights, values, capacity, deadline)
+    with span('reconstruct'):
+        return knapsack_dp_backtrack(weights, keep, capacity)
+
+def knapsack_dp_limited_table(weights, values, capacity, item_limit, deadline=None):
+    """Fill the knapsack DP with an item-count dimension.
+    
+    Returns (layers, keep): layers[k][w] is the best value using at most k items within
+    weight w, and keep is the bit-packed n x (item_limit + 1) x (capacity + 1) matrix
+    of take decisions used by knapsack_dp_limited_backtrack. A deadline stops the
+    fill as in knapsack_dp_table.
+    """
+    n = len(weights)
+    weights = np.asarray(weights, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    
+    count('dp cells', n * (item_limit + 1) * (capacity + 1))
+    layers = np.zeros((item_limit + 1, capacity + 1), dtype=np.float64)
+    # keep is bit-packed along the weight axis: n * K * (C + 1) / 8 bytes in total
+    keep = np.zeros((n, item_limit + 1, (capacity + 8) // 8), dtype=np.uint8)
+    
+    for i in range(n):
+        if deadline is not None and deadline.expired():
+            break
+        weight = weights[i]
+        start = max(weight, 1)
+        if start > capacity:
+            continue
+    
+        # Every layer k >= 1 may extend layer k - 1 by this item
+        candidate = layers[:-1, start - weight:capacity + 1 - weight] + values[i]
+        take = candidate > layers[1:, start:]
+        if take.any():
+            np.copyto(layers[1:, start:], candidate, where=take)
+            taken = np.zeros((item_limit + 1, capacity + 1), dtype=bool)
+            taken[1:, start:] = take
+            keep[i] = np.packbits(taken, axis=1)
+    
+    return layers, keep
+
+def knapsack_dp_limited_backtrack(weights, keep, capacity, item_limit):
+    """Recover the chosen indices, last item first, for any budget and item limit the table covers."""
+    w = capacity
+    k = item_limit
+    selected = []
+    
+    for i in range(len(weights) - 1, -1, -1):
+        if k == 0:
+            break
+        if keep[i, k, w >> 3] & (0x80 >> (w & 7)):
+            selected.append(i)
+            w -= int(weights[i])
+            k -= 1
+    
+    return selected
+
+def knapsack_dp_limited(weights, values, capacity, item_limit, deadline=None):
+    """0/1 knapsack with at most item_limit items; returns the chosen indices, last item first."""
+    if len(weights) == 0 or capacity < 0 or item_limit <= 0:
+        return []
+    
+    with span('dp fill'):
+        _, keep = knapsack_dp_limited_table(weights, values, capacity, item_limit, deadline)
+    with span('reconstruct'):
+        return knapsack_dp_limited_backtrack(weights, keep, capacity, item_limit)
+
+def knapsack_max_protein(items, calorie_limit, item_limit=None, deadline=None):
+    """Optimal max-protein selection by DP.
+    
+    If the deadline cuts the DP short, the answer is the better of the DP over the
+    items it reached and the greedy selection, with the fractional bound recorded.
+    """
+    weights = [int(item[1]) for item in items]
+    values = [item[2] for item in items]
+    
+    if item_limit is not None and item_limit < len(items):
+        selected = [items[i] for i in knapsack_dp_limited(weights, values, calorie_limit, item_limit, deadline)]
+    else:
+        selected = [items[i] for i in knapsack_dp(weights, values, calorie_limit, deadline)]
+    
+    if deadline is not None and deadline.hit:
+        deadline.record_bound(max_protein_upper_bound(items, calorie_limit, item_limit))
+        greedy = greedy_max_protein(items, calorie_limit, item_limit)
+        if sum(item[2] for item in greedy) > sum(item[2] for item in selected):
+            return greedy
+    return selected
 
 def greedy_max_protein(items, calorie_limit, item_limit=None):
     items_with_ratio = []
@@ -49,318 +261,659 @@ def greedy_max_protein(items, calorie_limit, item_limit=None):
         if total_calories + calories <= calorie_limit:
             selected_items.append((item_id, calories, protein, item_name, company))
             total_calories += calories
-            
+    
             if item_limit is not None and len(selected_items) >= item_limit:
                 break
     
     return selected_items
 
-def ilp_max_protein(items, calorie_limit, item_limit=None):
-    try:
-        import pulp
-    except ImportError:
-        print("PuLP is required for ILP optimization. Install with: pip install pulp")
-        return []
-    
-    n = len(items)
-    
-    # Create the model
-    model = pulp.LpProblem("MaxProtein", pulp.LpMaximize)
-    
-    # Create binary variables for each item
-    x = [pulp.LpVariable(f"x_{i}", cat=pulp.LpBinary) for i in range(n)]
-    
-    # Objective: maximize protein
-    model += pulp.lpSum([items[i][2] * x[i] for i in range(n)])
-    
-    # Constraint: stay within calorie limit
-    model += pulp.lpSum([items[i][1] * x[i] for i in range(n)]) <= calorie_limit
-    
-    # Constraint: limit number of items if specified
-    if item_limit is not None:
-        model += pulp.lpSum([x[i] for i in range(n)]) <= item_limit
-    
-    # Solve the model
-    model.solve(pulp.PULP_CBC_CMD(msg=False))
-    
-    # Get the selected items
-    selected_items = []
+def most_items(weights, limit):
+    """The most items any selection with sum(weights) <= limit can hold."""
+    return int(np.searchsorted(np.cumsum(np.sort(np.asarray(weights, dtype=np.float64))), limit, side='right'))
+
+def value_scaled_table(scaled, weights, top, item_limit=None, covering=False, deadline=None):
+    """Fill the value-indexed DP over integer scaled values up to top.
+    
+    Returns (layers, keep): layers[k][v] is the least (packing) or greatest
+    (covering) total weight of at most k items whose scaled values sum to exactly v,
+    with a single layer when there is no item limit. Selections worth more than top
+    are dropped, so top must be at least the scaled value of any feasible one. keep
+    is bit-packed along the value axis like knapsack_dp_limited_table's. A deadline
+    stops the fill as in knapsack_dp_table.
+    """
+    n = len(scaled)
+    layer_count = 1 if item_limit is None else item_limit + 1
+    
+    unreachable = -np.inf if covering else np.inf
+    layers = np.full((layer_count, top + 1), unreachable)
+    layers[:, 0] = 0.0
+    keep = np.zeros((n, layer_count, (top + 8) // 8), dtype=np.uint8)
+    
+    # With an item limit, layer k extends layer k - 1; without one, the single layer extends itself
+    source = layers if item_limit is None else layers[:-1]
+    target = layers if item_limit is None else layers[1:]
     for i in range(n):
-        if pulp.value(x[i]) == 1:
-            selected_items.append(items[i])
-    
-    return selected_items
+        if deadline is not None and deadline.expired():
+            break
+        value = scaled[i]
+        if value > top:
+            continue
+        candidate = source[:, :top + 1 - value] + weights[i]
+        take = candidate > target[:, value:] if covering else candidate < target[:, value:]
+        if take.any():
+            np.copyto(target[:, value:], candidate, where=take)
+            taken = np.zeros((layer_count, top + 1), dtype=bool)
+            taken[layer_count - len(take):, value:] = take
+            keep[i] = np.packbits(taken, axis=1)
+    
+    return layers, keep
 
-def knapsack_max_calories(items, protein_min, item_limit=None):
-    valid_items = [item for item in items if item[1] is not None and item[2] is not None 
-                  and item[1] > 0 and item[2] > 0]
-    
-    n = len(valid_items)
-    if n == 0:
-        return []
-    
-    min_protein_combinations = []
-    
-    valid_items.sort(key=lambda item: item[1]/item[2], reverse=True)
-    
-    max_item_count = item_limit if item_limit else n
-    
-    def find_combinations(start_idx, current_items, current_protein, current_calories):
-        if current_protein >= protein_min:
-            min_protein_combinations.append((current_items[:], current_calories))
-            return
-        
-        if len(current_items) >= max_item_count:
-            return
-            
-        for i in range(start_idx, n):
-            item = valid_items[i]
-            protein = item[2]
-            calories = item[1]
-            
-            current_items.append(item)
-            find_combinations(i + 1, current_items, current_protein + protein, current_calories + calories)
-            current_items.pop()
-    
-    if n <= 15 and max_item_count <= 4:
-        find_combinations(0, [], 0, 0)
-        
-        if min_protein_combinations:
-            min_protein_combinations.sort(key=lambda x: x[1], reverse=True)
-            return min_protein_combinations[0][0]
-        return []
+def value_scaled_pass(values, weights, limit, item_limit, covering, step, upper, deadline):
+    """One value-scaled DP with values rounded down to multiples of step; None if nothing is feasible.
+    
+    upper bounds the value of any feasible selection, which caps the table's value axis.
+    """
+    scaled = np.floor(values / step).astype(np.int64)
+    # One extra cell absorbs rounding in upper / step
+    top = int(min(scaled.sum(), upper / step + 1))
+    count('fptas passes')
+    count('fptas cells', len(scaled) * (1 if item_limit is None else item_limit + 1) * (top + 1))
+    with span('fptas fill'):
+        layers, keep = value_scaled_table(scaled, weights, top, item_limit, covering, deadline)
+    
+    feasible = np.flatnonzero(layers[-1] >= limit if covering else layers[-1] <= limit)
+    if len(feasible) == 0:
+        return None
+    v = feasible[-1]
+    k = len(layers) - 1
+    selected = []
+    with span('reconstruct'):
+        for i in range(len(scaled) - 1, -1, -1):
+            if keep[i, k, v >> 3] & (0x80 >> (v & 7)):
+                selected.append(i)
+                v -= scaled[i]
+                if item_limit is not None:
+                    k -= 1
+    
+    return selected
+
+def value_scaled_dp(values, weights, limit, item_limit=None, epsilon=DEFAULT_EPSILON, covering=False,
+                    deadline=None):
+    """Indexes of a selection worth at least (1 - epsilon) of the optimum, by a value-scaled DP (FPTAS).
+    
+    Maximizes sum(values) subject to sum(weights) <= limit, or >= limit when
+    covering, and at most item_limit items; returns None if no selection is
+    feasible. Values and weights must be non-negative; weights may be fractional.
+    
+    Each value is rounded down to a multiple of step = epsilon * target / m, where
+    m is the most items a selection can hold and target a lower bound on the
+    optimum, so rounding loses at most epsilon * target. The DP is indexed by
+    scaled value rather than weight: its size is n x layers x m * upper / (epsilon
+    * target), whatever the size of the limit. target starts at an upper bound on
+    the optimum and halves until a pass finds a selection worth at least target,
+    which then proves the guarantee.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    if covering:
+        # Any item may be needed to meet the limit, even one adding no value
+        usable = np.flatnonzero(values >= 0)
     else:
-        selected_items = []
-        total_protein = 0
-        
-        for item in valid_items:
-            if total_protein < protein_min and len(selected_items) < max_item_count:
-                selected_items.append(item)
-                total_protein += item[2]
-                
-        return selected_items
-
-def ilp_max_calories(items, protein_min, item_limit=None):
-    try:
-        import pulp
-    except ImportError:
-        print("PuLP is required for ILP optimization. Install with: pip install pulp")
+        usable = np.flatnonzero((values > 0) & (weights <= limit))
+    values = values[usable]
+    weights = weights[usable]
+    
+    positive = values > 0
+    if covering:
+        most = positive.sum()
+        upper = top_values_bound(values.tolist(), item_limit)
+    else:
+        most = most_items(weights, limit)
+        upper = fractional_bound(values.tolist(), weights.tolist(), limit, item_limit)
+    if item_limit is not None:
+        most = min(most, item_limit)
+        if item_limit >= len(values):
+            item_limit = None
+    
+    if most == 0 or upper <= 0:
+        # Nothing of value can be picked; any feasible selection is optimal
+        selected = value_scaled_pass(values, weights, limit, item_limit, covering, 1.0, 0.0, deadline)
+        return None if selected is None else [int(usable[i]) for i in selected]
+    
+    smallest = values[positive].min()
+    target = upper
+    proven = False
+    best = None
+    while True:
+        selected = value_scaled_pass(values, weights, limit, item_limit, covering, epsilon * target / most, upper,
+                                     deadline)
+        if selected is None:
+            return None
+        found = values[selected].sum()
+        if best is None or found > values[best].sum():
+            best = selected
+        # A pass within epsilon * target of the optimum is final once the optimum is
+        # known to be at least target: a selection reaching it, a feasible value used
+        # as target, or a target below every positive value
+        if proven or found >= target or (deadline is not None and deadline.hit):
+            break
+        target = max(found, target / 2, smallest)
+        proven = target == found or target == smallest
+    
+    if deadline is not None and deadline.hit:
+        deadline.record_bound(upper)
+    return [int(usable[i]) for i in best]
+
+def fptas_max_protein(items, calorie_limit, item_limit=None, epsilon=DEFAULT_EPSILON, deadline=None):
+    """Max-protein within (1 - epsilon) of optimal, in time and memory independent of the calorie limit."""
+    selected = value_scaled_dp([item[2] for item in items], [item[1] for item in items], calorie_limit,
+                               item_limit, epsilon, deadline=deadline)
+    return [items[i] for i in sorted(selected or [])]
+
+def fptas_max_nutrient(items, nutrient_index, protein_min, item_limit=None, epsilon=DEFAULT_EPSILON, deadline=None):
+    """Maximize items[nutrient_index] within (1 - epsilon) of optimal subject to protein >= protein_min."""
+    selected = value_scaled_dp([item[nutrient_index] for item in items], [item[2] for item in items], protein_min,
+                               item_limit, epsilon, covering=True, deadline=deadline)
+    return [items[i] for i in sorted(selected or [])]
+
+def require_ilp():
+    """Raise ValueError(ILP_MISSING) without an ILP backend, so the caller reports it rather than stdout."""
+    if not backend_available():
+        raise ValueError(ILP_MISSING)
+
+def ilp_item_model(name, items, keep, objective, rows, packing=False):
+    """The persistent ILP model for a query's item list, over the items passing keep.
+    
+    objective and every rows[name] map an item to its coefficient. The model is
+    built on the first call for this item list; later calls only change bounds.
+    """
+    def build():
+        valid_items = [item for item in items if keep(item)]
+        return SelectionModel([objective(item) for item in valid_items],
+                              {row: [weight(item) for item in valid_items] for row, weight in rows.items()},
+                              valid_items, packing)
+    
+    return MODELS.model(name, items, build)
+
+def ilp_incumbent(model, bounds, item_limit=None, objective=None):
+    """A greedy selection meeting a model's bounds (see greedy_selection), or None if it finds none."""
+    minimums = [(model.weights[name], lower) for name, (lower, _) in bounds.items() if lower is not None]
+    maximums = [(model.weights[name], upper) for name, (_, upper) in bounds.items() if upper is not None]
+    return greedy_selection(model.objective if objective is None else objective, item_limit, minimums, maximums)
+
+def ilp_deadline_solve(model, bounds, item_limit, deadline, objective=None):
+    """Solve a model under a deadline, starting from a greedy incumbent it returns if the solver has nothing better.
+    
+    A solver stopped before finding a selection of its own would otherwise answer
+    with none, though the bounds are easy to meet.
+    """
+    start = ilp_incumbent(model, bounds, item_limit, objective)
+    selected = model.solve(bounds, item_limit, objective, deadline, start)
+    if deadline.hit and start is not None:
+        values = model.objective
+        if selected is None or sum(values[i] for i in selected) < sum(values[i] for i in start):
+            selected = start
+    return selected
+
+def ilp_selected_items(model, bounds, item_limit=None, deadline=None):
+    if not model.items:
         return []
+    if deadline is None:
+        selected = model.solve(bounds, item_limit)
+    else:
+        selected = ilp_deadline_solve(model, bounds, item_limit, deadline)
+    return [model.items[i] for i in selected or []]
+
+def ilp_max_protein(items, calorie_limit, item_limit=None, deadline=None):
+    require_ilp()
     
-    valid_items = [item for item in items if item[1] is not None and item[2] is not None 
-                  and item[1] > 0 and item[2] > 0]
-    
-    n = len(valid_items)
+    # Maximize protein subject to the calorie limit (and item limit if given)
+    model = ilp_item_model('max-protein', items, lambda item: True,
+                           lambda item: item[2], {'calories': lambda item: item[1]}, packing=True)
+    return ilp_selected_items(model, {'calories': (None, calorie_limit)}, item_limit, deadline)
+
+def suffix_top_sums(scores, max_count):
+    """Return table[j][r]: the largest total of at most r non-negative scores from scores[j:]."""
+    n = len(scores)
+    table = [[0.0] * (max_count + 1) for _ in range(n + 1)]
+    top = []  # ascending, at most max_count entries
+    
+    for j in range(n - 1, -1, -1):
+        if scores[j] > 0:
+            bisect.insort(top, scores[j])
+            if len(top) > max_count:
+                top.pop(0)
+        row = table[j]
+        total = 0.0
+        for r, score in enumerate(reversed(top), 1):
+            total += score
+            row[r] = total
+        for r in range(len(top) + 1, max_count + 1):
+            row[r] = total
+    
+    return table
+
+def lagrangian_multipliers(values, constraints, max_count):
+    """Fit one multiplier per (weights, bound) constraint sum(weights) >= bound.
+    
+    The Lagrangian bound, the best max_count items scored by
+    values + sum(multiplier * weights) minus sum(multiplier * bound), is convex
+    and piecewise linear, so it is minimized one coordinate at a time.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    weights = [np.asarray(w, dtype=np.float64) for w, _ in constraints]
+    bounds = [bound for _, bound in constraints]
+    k = min(max_count, len(values))
+    multipliers = [0.0] * len(constraints)
+    
+    def lagrangian_bound(candidate):
+        scores = values.copy()
+        for multiplier, w in zip(candidate, weights):
+            scores += multiplier * w
+        np.maximum(scores, 0.0, out=scores)
+        top = np.partition(scores, len(scores) - k)[len(scores) - k:].sum()
+        return top - sum(multiplier * bound for multiplier, bound in zip(candidate, bounds))
+    
+    scale = max(np.abs(values).max(), 1.0)
+    sweeps = 1 if len(constraints) == 1 else 4
+    for _ in range(sweeps):
+        for c, w in enumerate(weights):
+            nonzero = np.abs(w[w != 0])
+            low = 0.0
+            high = scale / max(nonzero.min(initial=1.0), 1e-9)
+    
+            def along(multiplier):
+                return lagrangian_bound(multipliers[:c] + [multiplier] + multipliers[c + 1:])
+    
+            for _ in range(40):
+                left = low + (high - low) / 3
+                right = high - (high - low) / 3
+                if along(left) <= along(right):
+                    high = right
+                else:
+                    low = left
+    
+            if along(low) < along(multipliers[c]):
+                multipliers[c] = low
+    
+    return multipliers
+
+class SearchTimeout(Exception):
+    pass
+
+def greedy_selection(values, item_limit=None, minimums=(), maximums=()):
+    """Indexes of a selection meeting every bound, built greedily, or None if the greedy passes find none.
+    
+    Takes the bounds as branch_and_bound_max does. Items of positive value are
+    added best value per share of the maximum bounds first, while every maximum
+    still holds; then, while a minimum is short, the item covering most of the
+    shortfall per unit of cost is added, among those covering at least an even
+    share of it per remaining pick when any do. An item's cost is its value lost,
+    relative to the largest among the candidates, plus its share of the room left
+    under each maximum. If that leaves a minimum short, for instance because the
+    valuable items took every pick, a second pass covers the minimums before
+    adding value, and a last one covers them by room used alone.
+    """
+    n = len(values)
+    limit = n if item_limit is None else min(item_limit, n)
+    values = np.asarray(values, dtype=np.float64)
+    max_weights = [np.asarray(weights, dtype=np.float64) for weights, _ in maximums]
+    max_bounds = np.array([bound for _, bound in maximums], dtype=np.float64)
+    min_weights = [np.asarray(weights, dtype=np.float64) for weights, _ in minimums]
+    min_bounds = np.array([bound for _, bound in minimums], dtype=np.float64)
+    
+    use = np.zeros(n)
+    for weights, bound in zip(max_weights, max_bounds):
+        use += np.maximum(weights, 0.0) / max(bound, 1e-9)
+    order = np.argsort(-(values / np.maximum(use, 1e-12)), kind='stable')
+    
+    def build(cover_first, weigh_value=True):
+        max_totals = np.zeros(len(maximums))
+        min_totals = np.zeros(len(minimums))
+        chosen = np.zeros(n, dtype=bool)
+        selected = []
+    
+        def take(i):
+            chosen[i] = True
+            selected.append(int(i))
+            for j, weights in enumerate(max_weights):
+                max_totals[j] += weights[i]
+            for j, weights in enumerate(min_weights):
+                min_totals[j] += weights[i]
+    
+        def add_value():
+            for i in order:
+                if len(selected) == limit or values[i] <= 0:
+                    break
+                if not chosen[i] and all(total + weights[i] <= bound
+                                         for weights, total, bound in zip(max_weights, max_totals, max_bounds)):
+                    take(i)
+    
+        def cover():
+            while len(selected) < limit and (min_totals < min_bounds).any():
+                mask = ~chosen
+                for weights, total, bound in zip(max_weights, max_totals, max_bounds):
+                    mask &= total + weights <= bound
+                coverage = np.zeros(n)
+                for weights, total, bound in zip(min_weights, min_totals, min_bounds):
+                    if total < bound:
+                        coverage += np.minimum(np.maximum(weights, 0.0), bound - total) / (bound - total)
+                candidates = mask & (coverage > 0)
+                # Each short minimum adds at most 1 to coverage
+                on_pace = candidates & (coverage >= (min_totals < min_bounds).sum() / (limit - len(selected)))
+                if on_pace.any():
+                    candidates = on_pace
+                if not candidates.any():
+                    break
+                cost = np.zeros(n)
+                if weigh_value:
+                    lost = np.maximum(-values, 0.0)
+                    cost += lost / max(lost[candidates].max(), 1e-9)
+                for weights, total, bound in zip(max_weights, max_totals, max_bounds):
+                    cost += np.maximum(weights, 0.0) / max(bound - total, 1e-9)
+                score = np.where(candidates, coverage / (cost + 1e-9), -np.inf)
+                i = int(np.argmax(score))
+                if score[i] == -np.inf:
+                    break
+                take(i)
+    
+        for phase in ((cover, add_value) if cover_first else (add_value, cover)):
+            phase()
+        if (min_totals < min_bounds).any():
+            return None
+        return selected
+    
+    selected = build(cover_first=False)
+    if selected is None and minimums:
+        selected = build(cover_first=True)
+    if selected is None and minimums and maximums:
+        selected = build(cover_first=True, weigh_value=False)
+    return selected
+
+def branch_and_bound_max(values, item_limit=None, minimums=(), maximums=(), deadline=None, incumbent=None):
+    """Maximize the summed values of a subset; returns the chosen indices.
+    
+    minimums and maximums are sequences of (weights, bound) pairs requiring
+    sum(weights) >= bound and sum(weights) <= bound over the chosen subset. If the
+    deadline expires the search stops with the best subset found so far, and the
+    root relaxation bound is recorded on the deadline. incumbent, a feasible
+    selection such as greedy_selection's, is the answer to beat from the start.
+    """
+    n = len(values)
     if n == 0:
         return []
     
-    # Create the model
-    model = pulp.LpProblem("MaxCalories", pulp.LpMaximize)
-    
-    # Create binary variables for each item
-    x = [pulp.LpVariable(f"x_{i}", cat=pulp.LpBinary) for i in range(n)]
-    
-    # Objective: maximize calories
-    model += pulp.lpSum([valid_items[i][1] * x[i] for i in range(n)])
-    
-    # Constraint: meet minimum protein requirement
-    model += pulp.lpSum([valid_items[i][2] * x[i] for i in range(n)]) >= protein_min
-    
-    # Constraint: limit number of items if specified
-    if item_limit is not None:
-        model += pulp.lpSum([x[i] for i in range(n)]) <= item_limit
-    
-    # Solve the model
-    model.solve(pulp.PULP_CBC_CMD(msg=False))
-    
-    # Get the selected items
-    selected_items = []
-    for i in range(n):
-        if pulp.value(x[i]) == 1:
-            selected_items.append(valid_items[i])
-    
-    return selected_items
-
-def knapsack_max_fat(items, protein_min, item_limit=None):
-    valid_items = [item for item in items if item[2] > 0 and item[5] is not None]
+    max_item_count = min(item_limit, n) if item_limit else n
     
-    n = len(valid_items)
-    if n == 0:
+    if (max_item_count == n and not maximums and all(value >= 0 for value in values)
+            and all(weight >= 0 for weights, _ in minimums for weight in weights)):
+        # Without an effective count limit every item helps both the objective and the minimums
+        if all(sum(weights) >= bound for weights, bound in minimums):
+            return list(range(n))
         return []
     
-    scale_factor = 1
-    max_fat = max(item[5] for item in valid_items)
-    if max_fat > 100:
-        scale_factor = 2
+    # Explore items by descending objective so the plain relaxation bound is a prefix sum;
+    # a maximum sum(w) <= B is handled as the minimum sum(-w) >= -B
+    order = sorted(range(n), key=lambda i: values[i], reverse=True)
+    values = [float(values[i]) for i in order]
+    constraints = [([float(weights[i]) for i in order], bound) for weights, bound in minimums]
+    constraints += [([-float(weights[i]) for i in order], -bound) for weights, bound in maximums]
+    bounds = [bound for _, bound in constraints]
+    
+    value_prefix = [0.0]
+    for value in values:
+        value_prefix.append(value_prefix[-1] + max(value, 0.0))
+    
+    # Fractional relaxation bounds over the remaining items order[j:] with r picks left:
+    # the most each constraint total can still gain, and the Lagrangian bound that
+    # couples every constraint into the objective
+    most_gained = [suffix_top_sums(weights, max_item_count) for weights, _ in constraints]
+    multipliers = lagrangian_multipliers(values, constraints, max_item_count)
+    combined_scores = values
+    for multiplier, (weights, _) in zip(multipliers, constraints):
+        combined_scores = [score + multiplier * w for score, w in zip(combined_scores, weights)]
+    best_combined = suffix_top_sums(combined_scores, max_item_count)
+    
+    best_value = float('-inf')
+    best_selection = None
+    if incumbent is not None:
+        position = {i: j for j, i in enumerate(order)}
+        best_selection = sorted(position[i] for i in incumbent)
+        best_value = sum(values[j] for j in best_selection)
+    selection = []
+    nodes = 0
+    
+    def search(start, current_value, totals):
+        nonlocal best_value, best_selection, nodes
+    
+        nodes += 1
+        if deadline is not None and nodes % 1024 == 0 and deadline.expired():
+            raise SearchTimeout
+        if current_value > best_value and all(total >= bound for total, bound in zip(totals, bounds)):
+            best_value = current_value
+            best_selection = selection[:]
+    
+        remaining = max_item_count - len(selection)
+        if remaining == 0:
+            return
     
-    min_protein_combinations = []
+        shortfall = sum(multiplier * (total - bound)
+                        for multiplier, total, bound in zip(multipliers, totals, bounds))
     
-    valid_items.sort(key=lambda item: item[5]/item[2], reverse=True)
+        for j in range(start, n):
+            # Every bound only shrinks as j grows, so the rest of this level can be cut
+            if current_value + value_prefix[min(j + remaining, n)] - value_prefix[j] <= best_value:
+                break
+            if any(total + gain[j][remaining] < bound
+                   for total, gain, bound in zip(totals, most_gained, bounds)):
+                break
+            if current_value + shortfall + best_combined[j][remaining] <= best_value:
+                break
     
-    max_item_count = item_limit if item_limit else n
+            selection.append(j)
+            search(j + 1, current_value + values[j],
+                   [total + weights[j] for total, (weights, _) in zip(totals, constraints)])
+            selection.pop()
     
-    def find_combinations(start_idx, current_items, current_protein, current_fat):
-        if current_protein >= protein_min:
-            min_protein_combinations.append((current_items[:], current_fat))
-            return
-        
-        if len(current_items) >= max_item_count:
-            return
-            
-        for i in range(start_idx, n):
-            item = valid_items[i]
-            protein = item[2]
-            fat = item[5]
-            
-            current_items.append(item)
-            find_combinations(i + 1, current_items, current_protein + protein, current_fat + fat)
-            current_items.pop()
-    
-    if n <= 15 and max_item_count <= 4:
-        find_combinations(0, [], 0, 0)
-        
-        if min_protein_combinations:
-            min_protein_combinations.sort(key=lambda x: x[1], reverse=True)
-            return min_protein_combinations[0][0]
-        return []
-    else:
-        selected_items = []
-        total_protein = 0
-        
-        for item in valid_items:
-            if total_protein < protein_min and len(selected_items) < max_item_count:
-                selected_items.append(item)
-                total_protein += item[2]
-                
-        return selected_items
-
-def ilp_max_fat(items, protein_min, item_limit=None):
+    # Recursion depth follows the number of picked items
+    if sys.getrecursionlimit() < max_item_count + 100:
+        sys.setrecursionlimit(max_item_count + 100)
     try:
-        import pulp
-    except ImportError:
-        print("PuLP is required for ILP optimization. Install with: pip install pulp")
-        return []
-    
-    valid_items = [item for item in items if item[2] > 0 and item[5] is not None]
+        search(0, 0.0, [0.0] * len(constraints))
+    except SearchTimeout:
+        root_shortfall = sum(multiplier * -bound for multiplier, bound in zip(multipliers, bounds))
+        deadline.record_bound(min(value_prefix[max_item_count], root_shortfall + best_combined[0][max_item_count]))
+    count('bnb nodes', nodes)
     
-    n = len(valid_items)
-    if n == 0:
+    if best_selection is None:
         return []
+    return [order[j] for j in best_selection]
+
+def k_skyline(values, weights, k):
+    """Indexes of the items dominated, in both value and weight, by fewer than k others.
+    
+    A selection of at most k items holding an item dominated k times misses one of
+    its dominators, and swapping that one in loses neither value nor weight, so
+    some optimal selection uses only these items.
+    """
+    # By value, then weight, so every earlier item has at least the value of a later one
+    order = sorted(range(len(values)), key=lambda i: (-values[i], -weights[i]))
+    heaviest = []  # min-heap of the k largest weights among earlier items
+    kept = []
+    for i in order:
+        if len(heaviest) == k and heaviest[0] >= weights[i]:
+            continue
+        kept.append(i)
+        if len(heaviest) < k:
+            heapq.heappush(heaviest, weights[i])
+        else:
+            heapq.heappushpop(heaviest, weights[i])
+    return sorted(kept)
+
+def combination_matrix(n, r):
+    """Every r-subset of range(n) as a row of ascending indexes."""
+    if r == 0:
+        return np.zeros((1, 0), dtype=np.int64)
+    return np.array(list(combinations(range(n), r)), dtype=np.int64)
+
+def meet_in_the_middle_max(values, weights, minimum, item_limit, deadline=None):
+    """Indexes of at most item_limit items maximizing sum(values) with sum(weights) >= minimum.
+    
+    Values and weights must be non-negative, so a best selection of exactly
+    item_limit items exists. Returns None if no selection meets the minimum,
+    and the selection highest value first otherwise.
+    
+    Only the k-skyline of the items can be needed (see k_skyline). Each
+    selection i1 < ... < ik of those splits once into a low half of its first
+    k // 2 items and a high half of the rest. The high halves are sorted by
+    weight, so the ones meeting a low half's remaining need are a suffix, and a
+    suffix maximum of their values scores every low half ending at item t at
+    once, counting only high halves starting after t. Problems whose halves
+    exceed MITM_MAX_SUBSETS are left to branch_and_bound_max.
+    """
+    with span('skyline'):
+        kept = np.asarray(k_skyline(values, weights, item_limit), dtype=np.int64)
+    count('mitm skyline items', len(kept))
+    k = min(item_limit, len(kept))
+    if k == 0:
+        return [] if minimum <= 0 else None
+    values = np.asarray(values, dtype=np.float64)[kept]
+    weights = np.asarray(weights, dtype=np.float64)[kept]
+    n = len(kept)
+    
+    first = k // 2
+    second = k - first
+    if math.comb(n, second) > MITM_MAX_SUBSETS:
+        selected = branch_and_bound_max(values.tolist(), k, minimums=[(weights.tolist(), minimum)],
+                                        deadline=deadline)
+        return [int(kept[i]) for i in selected] if selected else None
+    
+    low = combination_matrix(n, first)
+    high = combination_matrix(n, second)
+    count('mitm half selections', len(low) + len(high))
+    low_value = values[low].sum(axis=1)
+    low_weight = weights[low].sum(axis=1)
+    low_last = low[:, -1] if first else np.full(len(low), -1)
+    
+    high = high[np.argsort(weights[high].sum(axis=1), kind='stable')]
+    high_value = values[high].sum(axis=1)
+    high_weight = weights[high].sum(axis=1)
+    
+    # The greedy selection is the incumbent until a scored split beats it, so a
+    # deadline that expires before the first one still leaves an answer
+    seed = greedy_selection(values, k, minimums=[(weights, minimum)])
+    best_total = values[seed].sum() if seed is not None else -np.inf
+    best = None
+    for t in np.unique(low_last):
+        if deadline is not None and deadline.expired():
+            break
+        rows = np.flatnonzero(low_last == t)
+        eligible = np.where(high[:, 0] > t, high_value, -np.inf)
+        # suffix_best[j] is the best eligible high half at or past position j (-inf past the end)
+        suffix_best = np.append(np.maximum.accumulate(eligible[::-1])[::-1], -np.inf)
+        starts = np.searchsorted(high_weight, minimum - low_weight[rows], side='left')
+        totals = low_value[rows] + suffix_best[starts]
+        j = int(np.argmax(totals))
+        if totals[j] > best_total:
+            best_total = totals[j]
+            best = (rows[j], starts[j] + int(np.argmax(eligible[starts[j]:])))
+    
+    if deadline is not None and deadline.hit:
+        deadline.record_bound(top_values_bound(values.tolist(), k))
+    if best is None and seed is None:
+        return None
+    selected = list(seed) if best is None else list(low[best[0]]) + list(high[best[1]])
+    # Highest value first, like branch_and_bound_max
+    selected = sorted(selected, key=lambda i: (-values[i], i))
+    return [int(kept[i]) for i in selected]
+
+def branch_and_bound_max_nutrient(items, nutrient_index, protein_min, item_limit=None, deadline=None):
+    """Maximize items[nutrient_index] subject to protein >= protein_min and count <= item_limit."""
+    values = [item[nutrient_index] for item in items]
+    proteins = [item[2] for item in items]
     
-    # Create the model
-    model = pulp.LpProblem("MaxFat", pulp.LpMaximize)
+    selected = branch_and_bound_max(values, item_limit, minimums=[(proteins, protein_min)], deadline=deadline)
+    return [items[i] for i in selected]
+
+def mitm_max_nutrient(items, nutrient_index, protein_min, item_limit, deadline=None):
+    """Maximize items[nutrient_index] with at most item_limit items and protein >= protein_min, exactly."""
+    selected = meet_in_the_middle_max([item[nutrient_index] for item in items], [item[2] for item in items],
+                                      protein_min, item_limit, deadline)
+    return [items[i] for i in selected or []]
+
+def knapsack_max_calories(items, protein_min, item_limit=None, deadline=None):
+    valid_items = [item for item in items if item[1] is not None and item[2] is not None 
+                  and item[1] > 0 and item[2] > 0]
     
-    # Create binary variables for each item
-    x = [pulp.LpVariable(f"x_{i}", cat=pulp.LpBinary) for i in range(n)]
+    return branch_and_bound_max_nutrient(valid_items, 1, protein_min, item_limit, deadline)
+
+def mitm_max_calories(items, protein_min, item_limit, deadline=None):
+    valid_items = [item for item in items if item[1] is not None and item[2] is not None 
+                  and item[1] > 0 and item[2] > 0]
     
-    # Objective: maximize fat
-    model += pulp.lpSum([valid_items[i][5] * x[i] for i in range(n)])
+    return mitm_max_nutrient(valid_items, 1, protein_min, item_limit, deadline)
+
+def fptas_max_calories(items, protein_min, item_limit=None, epsilon=DEFAULT_EPSILON, deadline=None):
+    valid_items = [item for item in items if item[1] is not None and item[2] is not None 
+                  and item[1] > 0 and item[2] > 0]
     
-    # Constraint: meet minimum protein requirement
-    model += pulp.lpSum([valid_items[i][2] * x[i] for i in range(n)]) >= protein_min
+    return fptas_max_nutrient(valid_items, 1, protein_min, item_limit, epsilon, deadline)
+
+def ilp_max_calories(items, protein_min, item_limit=None, deadline=None):
+    require_ilp()
+    
+    # Maximize calories subject to the protein minimum (and item limit if given)
+    model = ilp_item_model('max-calories', items,
+                           lambda item: (item[1] is not None and item[2] is not None
+                                         and item[1] > 0 and item[2] > 0),
+                           lambda item: item[1], {'protein': lambda item: item[2]})
+    return ilp_selected_items(model, {'protein': (protein_min, None)}, item_limit, deadline)
+
+def knapsack_max_fat(items, protein_min, item_limit=None, deadline=None):
+    valid_items = [item for item in items if item[2] > 0 and item[5] is not None]
     
-    # Constraint: limit number of items if specified
-    if item_limit is not None:
-        model += pulp.lpSum([x[i] for i in range(n)]) <= item_limit
+    return branch_and_bound_max_nutrient(valid_items, 5, protein_min, item_limit, deadline)
+
+def mitm_max_fat(items, protein_min, item_limit, deadline=None):
+    valid_items = [item for item in items if item[2] > 0 and item[5] is not None]
     
-    # Solve the model
-    model.solve(pulp.PULP_CBC_CMD(msg=False))
+    return mitm_max_nutrient(valid_items, 5, protein_min, item_limit, deadline)
+
+def fptas_max_fat(items, protein_min, item_limit=None, epsilon=DEFAULT_EPSILON, deadline=None):
+    valid_items = [item for item in items if item[2] > 0 and item[5] is not None]
     
-    # Get the selected items
-    selected_items = []
-    for i in range(n):
-        if pulp.value(x[i]) == 1:
-            selected_items.append(valid_items[i])
+    return fptas_max_nutrient(valid_items, 5, protein_min, item_limit, epsilon, deadline)
+
+def ilp_max_fat(items, protein_min, item_limit=None, deadline=None):
+    require_ilp()
     
-    return selected_items
+    # Maximize fat subject to the protein minimum (and item limit if given)
+    model = ilp_item_model('max-fat', items, lambda item: item[2] > 0 and item[5] is not None,
+                           lambda item: item[5], {'protein': lambda item: item[2]})
+    return ilp_selected_items(model, {'protein': (protein_min, None)}, item_limit, deadline)
 
-def knapsack_max_carbs(items, protein_min, item_limit=None):
+def knapsack_max_carbs(items, protein_min, item_limit=None, deadline=None):
     valid_items = [item for item in items if item[2] > 0 and item[6] is not None]
     
-    n = len(valid_items)
-    if n == 0:
-        return []
-    
-    min_protein_combinations = []
-    
-    valid_items.sort(key=lambda item: item[6]/item[2], reverse=True)
-    
-    max_item_count = item_limit if item_limit else n
-    
-    def find_combinations(start_idx, current_items, current_protein, current_carbs):
-        if current_protein >= protein_min:
-            min_protein_combinations.append((current_items[:], current_carbs))
-            return
-        
-        if len(current_items) >= max_item_count:
-            return
-            
-        for i in range(start_idx, n):
-            item = valid_items[i]
-            protein = item[2]
-            carbs = item[6]
-            
-            current_items.append(item)
-            find_combinations(i + 1, current_items, current_protein + protein, current_carbs + carbs)
-            current_items.pop()
-    
-    if n <= 15 and max_item_count <= 4:
-        find_combinations(0, [], 0, 0)
-        
-        if min_protein_combinations:
-            min_protein_combinations.sort(key=lambda x: x[1], reverse=True)
-            return min_protein_combinations[0][0]
-        return []
-    else:
-        selected_items = []
-        total_protein = 0
-        
-        for item in valid_items:
-            if total_protein < protein_min and len(selected_items) < max_item_count:
-                selected_items.append(item)
-                total_protein += item[2]
-                
-        return selected_items
-
-def ilp_max_carbs(items, protein_min, item_limit=None):
-    try:
-        import pulp
-    except ImportError:
-        print("PuLP is required for ILP optimization. Install with: pip install pulp")
-        return []
-    
+    return branch_and_bound_max_nutrient(valid_items, 6, protein_min, item_limit, deadline)
+
+def mitm_max_carbs(items, protein_min, item_limit, deadline=None):
     valid_items = [item for item in items if item[2] > 0 and item[6] is not None]
     
-    n = len(valid_items)
-    if n == 0:
-        return []
-    
-    # Create the model
-    model = pulp.LpProblem("MaxCarbs", pulp.LpMaximize)
-    
-    # Create binary variables for each item
-    x = [pulp.LpVariable(f"x_{i}", cat=pulp.LpBinary) for i in range(n)]
-    
-    # Objective: maximize carbs
-    model += pulp.lpSum([valid_items[i][6] * x[i] for i in range(n)])
-    
-    # Constraint: meet minimum protein requirement
-    model += pulp.lpSum([valid_items[i][2] * x[i] for i in range(n)]) >= protein_min
-    
-    # Constraint: limit number of items if specified
-    if item_limit is not None:
-        model += pulp.lpSum([x[i] for i in range(n)]) <= item_limit
-    
-    # Solve the model
-    model.solve(pulp.PULP_CBC_CMD(msg=False))
+    return mitm_max_nutrient(valid_items, 6, protein_min, item_limit, deadline)
+
+def fptas_max_carbs(items, protein_min, item_limit=None, epsilon=DEFAULT_EPSILON, deadline=None):
+    valid_items = [item for item in items if item[2] > 0 and item[6] is not None]
     
-    # Get the selected items
-    selected_items = []
-    for i in range(n):
-        if pulp.value(x[i]) == 1:
-            selected_items.append(valid_items[i])
+    return fptas_max_nutrient(valid_items, 6, protein_min, item_limit, epsilon, deadline)
+
+def ilp_max_carbs(items, protein_min, item_limit=None, deadline=None):
+    require_ilp()
     
-    return selected_items
+    # Maximize carbs subject to the protein minimum (and item limit if given)
+    model = ilp_item_model('max-carbs', items, lambda item: item[2] > 0 and item[6] is not None,
+                           lambda item: item[6], {'protein': lambda item: item[2]})
+    return ilp_selected_items(model, {'protein': (protein_min, None)}, item_limit, deadline)
 
 def knapsack_max_calorie_protein(items, item_limit):
     valid_items = [item for item in items if item[1] is not None and item[2] is not None 
@@ -384,41 +937,12 @@ def knapsack_max_calorie_protein(items, item_limit):
     
     return selected_items
 
-def ilp_max_calorie_protein(items, item_limit):
-    try:
-        import pulp
-    except ImportError:
-        print("PuLP is required for ILP optimization. Install with: pip install pulp")
-        return []
-    
-    valid_items = [item for item in items if item[1] is not None and item[2] is not None 
-                  and item[1] > 0 and item[2] > 0]
-    
-    n = len(valid_items)
-    if n == 0:
-        return []
-    
-    # Create the model
-    model = pulp.LpProblem("MaxCalorieProtein", pulp.LpMaximize)
-    
-    # Create binary variables for each item
-    x = [pulp.LpVariable(f"x_{i}", cat=pulp.LpBinary) for i in range(n)]
-    
-    # Objective: maximize weighted sum of calories and protein
-    # Give protein a higher weight to make it equally important to calories
-    model += pulp.lpSum([valid_items[i][1] * x[i] for i in range(n)]) + \
-             pulp.lpSum([valid_items[i][2] * 20 * x[i] for i in range(n)])
-    
-    # Constraint: limit number of items
-    model += pulp.lpSum([x[i] for i in range(n)]) <= item_limit
-    
-    # Solve the model
-    model.solve(pulp.PULP_CBC_CMD(msg=False))
-    
-    # Get the selected items
-    selected_items = []
-    for i in range(n):
-        if pulp.value(x[i]) == 1:
-            selected_items.append(valid_items[i])
-    
-    return selected_items
\ No newline at end of file
+def ilp_max_calorie_protein(items, item_limit, deadline=None):
+    require_ilp()
+    
+    # Maximize calories plus protein weighted by 20, so both count about equally
+    model = ilp_item_model('max-calorie-protein', items,
+                           lambda item: (item[1] is not None and item[2] is not None
+                                         and item[1] > 0 and item[2] > 0),
+                           lambda item: item[1] + item[2] * 20, {})
+    return ilp_selected_items(model, {}, item_limit, deadline)
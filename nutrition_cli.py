@@ -1,51 +1,90 @@
 #!/usr/bin/env python3
 import argparse
+import cProfile
+import json
 import sqlite3
-from knapsack import (knapsack_max_protein, greedy_max_protein, ilp_max_protein,
-                     knapsack_max_calories, ilp_max_calories,
-                     knapsack_max_fat, ilp_max_fat,
-                     knapsack_max_carbs, ilp_max_carbs,
-                     knapsack_max_calorie_protein, ilp_max_calorie_protein)
+import sys
+from queries import ALGORITHMS, QUERIES, fptas_name, select_solver, solution_quality
+from knapsack import DEFAULT_EPSILON, MITM_MAX_ITEMS, Deadline
+from solver_server import request_solve
+from result_cache import ResultCache
+from item_store import LOAD_SQL, load_item_store
+from batch import read_requests, solve_batch
+from parallel import ParallelSolver
+from search import UNUSED_COMPANY_SQL, company_predicate, item_predicate, load_company_index
+from optimizer import NUTRIENT_COLUMNS, parse_bounds, optimize, selection_quality
+from pareto import MAX_OBJECTIVES, pareto_frontier, best_within
+from planner import DEFAULT_BUDGET_MS, CALIBRATION_PATH, calibrate
+from profiling import enable, span
 import os
+import time
 
 def get_db_connection():
     """Connect to the database and return the connection object."""
     if not os.path.exists('fast_food.db'):
         print("Error: Database file not found. Run create_database.py first.")
         exit(1)
-        
+    
     return sqlite3.connect('fast_food.db')
 
+def get_item_store():
+    """Load the database into an ItemStore, mapped from its snapshot when that is current."""
+    if not os.path.exists('fast_food.db'):
+        print("Error: Database file not found. Run create_database.py first.")
+        exit(1)
+    
+    with span('fetch'):
+        return load_item_store('fast_food.db')
+
 def list_companies(args):
-    """List all companies in the database."""
+    """List all companies in the database, or those a search resolves to."""
     conn = get_db_connection()
-    cursor = conn.cursor()
+    index = load_company_index(conn)
+    conn.close()
     
-    cursor.execute('SELECT DISTINCT company FROM fast_food_items ORDER BY company')
-    companies = cursor.fetchall()
+    companies = index.resolve(args.query) if args.query else index.names
     
-    print("Available companies:")
-    for company in companies:
-        print(f"- {company[0]}")
+    if not companies:
+        print(f"No companies match '{args.query}'.")
+        return
     
-    conn.close()
+    print("Available companies:" if not args.query else f"Companies matching '{args.query}':")
+    for company in sorted(companies):
+        print(f"- {company}")
 
-def list_items(args):
-    """List items with optional filtering by company."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
+def items_query(conn, company=None, search=None):
+    """(sql, params) of the items listing, filtered by company and item name."""
     query = 'SELECT company, item, calories, protein FROM fast_food_items'
+    predicates = []
     params = []
     
-    if args.company:
-        query += ' WHERE company LIKE ?'
-        params.append(f'%{args.company}%')
+    if company:
+        companies = load_company_index(conn).resolve(company)
+        predicate, company_params = company_predicate(companies)
+        predicates.append(predicate)
+        params += company_params
     
+    if search:
+        predicate, item_params = item_predicate(conn, search)
+        predicates.append(predicate)
+        params += item_params
+    
+    if predicates:
+        query += ' WHERE ' + ' AND '.join(predicates)
+    
+    # Read straight from idx_company_item, which holds every column in this order
     query += ' ORDER BY company, item'
+    return query, params
+
+def list_items(args):
+    """List items with optional filtering by company and item name."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    query, params = items_query(conn, args.company, args.search)
     
-    cursor.execute(query, params)
-    items = cursor.fetchall()
+    with span('fetch'):
+        cursor.execute(query, params)
+        items = cursor.fetchall()
     
     if items:
         print(f"{'Company':<20} {'Item':<50} {'Calories':<10} {'Protein (g)':<10}")
@@ -57,392 +96,695 @@ def list_items(args):
     
     conn.close()
 
+def check_epsilon(epsilon):
+    if epsilon is not None and not 0 < epsilon < 1:
+        print("Error: --epsilon must be between 0 and 1.")
+        exit(1)
+
+def solve_query(args, command, limit, item_limit):
+    """Solve a built-in query locally, or on the solver server when --server is given.
+    
+    Returns (items_found, selected_items, algorithm_name, note, quality), where
+    quality is (gap, bound, timed_out): the relative optimality gap (0.0 from exact
+    solvers), an upper bound on the optimum and whether --time-limit-ms cut the
+    solve short.
+    """
+    budget_ms = getattr(args, 'budget_ms', None)
+    time_limit_ms = getattr(args, 'time_limit_ms', None)
+    epsilon = getattr(args, 'epsilon', None)
+    check_epsilon(epsilon)
+    if args.server:
+        payload = {'command': command, 'limit': limit, 'items': item_limit, 'company': args.company,
+                   'algorithm': args.algorithm, 'budget_ms': budget_ms, 'time_limit_ms': time_limit_ms,
+                   'epsilon': epsilon}
+        try:
+            with span('server request'):
+                response = request_solve(args.server, payload)
+        except OSError as e:
+            print(f"Error: could not reach the solver server at {args.server}: {e}")
+            exit(1)
+        if 'error' in response:
+            print(f"Error: {response['error']}")
+            exit(1)
+        selected_items = [tuple(item) for item in response['items']]
+        quality = response.get('gap'), response.get('bound'), response.get('timed_out', False)
+        return response['found'], selected_items, response['algorithm'], response['note'], quality
+    
+    store = get_item_store()
+    with span('filter'):
+        items = store.items(command, args.company)
+    
+    if not items:
+        return 0, [], None, None, (None, None, False)
+    
+    # Started before solving, so the limit covers the whole solve
+    deadline = Deadline(time_limit_ms) if time_limit_ms else None
+    with span('solve'):
+        if args.cache:
+            cache = ResultCache(db_path='fast_food.db')
+            algorithm_name, selected_items, note, _ = cache.solve(command, args.algorithm, items, limit, item_limit,
+                                                                  args.company, store.data_version, budget_ms,
+                                                                  deadline, epsilon)
+        else:
+            algorithm_name, solver, note = select_solver(command, args.algorithm, items, limit, item_limit,
+                                                         budget_ms, deadline, epsilon)
+            selected_items = solver(items, limit, item_limit)
+    with span('quality bound'):
+        gap, bound = solution_quality(command, algorithm_name, items, limit, item_limit, selected_items, deadline,
+                                      epsilon)
+    return len(items), selected_items, algorithm_name, note, (gap, bound, deadline is not None and deadline.hit)
+
+def print_quality(quality, unit='', minimize=False):
+    """Report how far a non-optimal answer may be from the best possible one.
+    
+    bound is an upper bound on the optimum when maximizing and a lower one when minimizing.
+    """
+    gap, bound, timed_out = quality
+    side, direction = ('lower', 'above') if minimize else ('upper', 'below')
+    if timed_out:
+        print(f"Time limit reached: best found is within {gap:.1%} of the {side} bound {bound:.2f}{unit}")
+    elif gap:
+        print(f"Optimality gap: at most {gap:.1%} {direction} the best possible ({bound:.2f}{unit})")
+
+def print_no_solution(quality, message):
+    if quality[2]:
+        print("No solution found before the time limit. Try a longer --time-limit-ms.")
+    else:
+        print(message)
+
 def max_protein(args):
     """Find items that maximize protein within a calorie limit."""
     calorie_limit = args.calories
     item_limit = args.items
-    algorithm = args.algorithm
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    query = '''
-    SELECT id, calories, protein, item, company 
-    FROM fast_food_items 
-    WHERE calories IS NOT NULL AND protein IS NOT NULL AND calories > 0
-    '''
     
-    if args.company:
-        query += ' AND company LIKE ?'
-        cursor.execute(query, [f'%{args.company}%'])
-    else:
-        cursor.execute(query)
-    
-    items = cursor.fetchall()
+    found, selected_items, algorithm_name, note, quality = solve_query(args, 'max-protein', calorie_limit, item_limit)
     
-    if not items:
+    if not found:
         print("No suitable items found.")
-        conn.close()
         return
     
     print(f"Finding max protein meals within {calorie_limit} calories...")
     if item_limit:
         print(f"Limited to a maximum of {item_limit} items.")
-    
-    # Choose algorithm based on user selection or problem size
-    if algorithm == 'ilp':
-        algorithm_name = "Integer Linear Programming (optimal solution)"
-        print(f"Using {algorithm_name}...")
-        try:
-            selected_items = ilp_max_protein(items, calorie_limit, item_limit)
-        except ImportError:
-            print("PuLP is not installed. Falling back to dynamic programming...")
-            selected_items = knapsack_max_protein(items, calorie_limit, item_limit)
-    elif algorithm == 'greedy':
-        algorithm_name = "Greedy heuristic (not knapsack - using protein-to-calorie ratio)"
-        print(f"Using {algorithm_name}...")
-        selected_items = greedy_max_protein(items, calorie_limit, item_limit)
-    else:  # 'dp' or auto
-        if len(items) > 100 and calorie_limit > 1000 and algorithm != 'dp':
-            algorithm_name = "Greedy heuristic (not knapsack - using protein-to-calorie ratio)"
-            print(f"Using {algorithm_name}...")
-            selected_items = greedy_max_protein(items, calorie_limit, item_limit)
-        else:
-            algorithm_name = "Optimal 0/1 knapsack with dynamic programming"
-            print(f"Using {algorithm_name}...")
-            selected_items = knapsack_max_protein(items, calorie_limit, item_limit)
+    if note:
+        print(note)
+    print(f"Using {algorithm_name}...")
     
     if selected_items:
         total_calories = sum(item[1] for item in selected_items)
         total_protein = sum(item[2] for item in selected_items)
-        
+    
         print("\nSelected items:")
         print(f"{'Company':<20} {'Item':<50} {'Calories':<10} {'Protein (g)':<10}")
         print("-" * 90)
-        
+    
         for _, calories, protein, item, company in selected_items:
             print(f"{company[:19]:<20} {item[:49]:<50} {calories:<10} {protein:<10}")
-        
+    
         print("\nSummary:")
         print(f"Total items: {len(selected_items)}")
         print(f"Total calories: {total_calories}")
         print(f"Total protein: {total_protein:.2f}g")
         print(f"Protein/calorie ratio: {total_protein/total_calories:.4f}g per calorie")
+        print_quality(quality, 'g')
     else:
-        print("No solution found. Try increasing the calorie limit.")
-    
-    conn.close()
+        print_no_solution(quality, "No solution found. Try increasing the calorie limit.")
 
 def max_calories(args):
     """Find items that maximize calories while meeting a minimum protein requirement."""
     protein_min = args.protein
     item_limit = args.items
-    algorithm = args.algorithm
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
     
-    query = '''
-    SELECT id, calories, protein, item, company 
-    FROM fast_food_items 
-    WHERE calories IS NOT NULL AND protein IS NOT NULL AND protein > 0
-    '''
+    found, selected_items, algorithm_name, note, quality = solve_query(args, 'max-calories', protein_min, item_limit)
     
-    if args.company:
-        query += ' AND company LIKE ?'
-        cursor.execute(query, [f'%{args.company}%'])
-    else:
-        cursor.execute(query)
-    
-    items = cursor.fetchall()
-    
-    if not items:
+    if not found:
         print("No suitable items found.")
-        conn.close()
         return
     
     print(f"Finding max calorie meals with at least {protein_min}g of protein...")
     if item_limit:
         print(f"Limited to a maximum of {item_limit} items.")
-    
-    if algorithm == 'ilp':
-        algorithm_name = "Integer Linear Programming (optimal solution)"
-        print(f"Using {algorithm_name}...")
-        try:
-            selected_items = ilp_max_calories(items, protein_min, item_limit)
-        except ImportError:
-            print("PuLP is not installed. Falling back to mixed approach...")
-            selected_items = knapsack_max_calories(items, protein_min, item_limit)
-    else:
-        algorithm_name = "Mixed approach: exhaustive search for small datasets, greedy for large"
-        print(f"Using {algorithm_name}...")
-        selected_items = knapsack_max_calories(items, protein_min, item_limit)
+    if note:
+        print(note)
+    print(f"Using {algorithm_name}...")
     
     if selected_items:
         total_calories = sum(item[1] for item in selected_items)
         total_protein = sum(item[2] for item in selected_items)
-        
+    
         print("\nSelected items:")
         print(f"{'Company':<20} {'Item':<50} {'Calories':<10} {'Protein (g)':<10}")
         print("-" * 90)
-        
+    
         for _, calories, protein, item, company in selected_items:
             print(f"{company[:19]:<20} {item[:49]:<50} {calories:<10} {protein:<10}")
-        
+    
         print("\nSummary:")
         print(f"Total items: {len(selected_items)}")
         print(f"Total calories: {total_calories}")
         print(f"Total protein: {total_protein:.2f}g")
         print(f"Calorie/protein ratio: {total_calories/total_protein:.2f} calories per gram of protein")
+        print_quality(quality, ' kcal')
     else:
-        print("No solution found. Try decreasing the protein requirement.")
-    
-    conn.close()
+        print_no_solution(quality, "No solution found. Try decreasing the protein requirement.")
 
 def max_fat(args):
     """Find items that maximize total fat while meeting a minimum protein requirement."""
     protein_min = args.protein
     item_limit = args.items
-    algorithm = args.algorithm
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    query = '''
-    SELECT id, calories, protein, item, company, total_fat
-    FROM fast_food_items 
-    WHERE protein IS NOT NULL AND protein > 0 AND total_fat IS NOT NULL
-    '''
-    
-    if args.company:
-        query += ' AND company LIKE ?'
-        cursor.execute(query, [f'%{args.company}%'])
-    else:
-        cursor.execute(query)
     
-    items = cursor.fetchall()
+    found, selected_items, algorithm_name, note, quality = solve_query(args, 'max-fat', protein_min, item_limit)
     
-    if not items:
+    if not found:
         print("No suitable items found.")
-        conn.close()
         return
     
     print(f"Finding max fat meals with at least {protein_min}g of protein...")
     if item_limit:
         print(f"Limited to a maximum of {item_limit} items.")
-        
-    if algorithm == 'ilp':
-        algorithm_name = "Integer Linear Programming (optimal solution)"
-        print(f"Using {algorithm_name}...")
-        try:
-            selected_items = ilp_max_fat(items, protein_min, item_limit)
-        except ImportError:
-            print("PuLP is not installed. Falling back to mixed approach...")
-            selected_items = knapsack_max_fat(items, protein_min, item_limit)
-    else:
-        algorithm_name = "Mixed approach: exhaustive search for small datasets, greedy for large"
-        print(f"Using {algorithm_name}...")
-        selected_items = knapsack_max_fat(items, protein_min, item_limit)
+    if note:
+        print(note)
+    print(f"Using {algorithm_name}...")
     
     if selected_items:
         total_calories = sum(item[1] for item in selected_items if item[1] is not None)
         total_protein = sum(item[2] for item in selected_items)
         total_fat = sum(item[5] for item in selected_items)
-        
+    
         print("\nSelected items:")
         print(f"{'Company':<20} {'Item':<50} {'Calories':<10} {'Fat (g)':<10} {'Protein (g)':<10}")
         print("-" * 110)
-        
+    
         for _, calories, protein, item, company, fat in selected_items:
             print(f"{company[:19]:<20} {item[:49]:<50} {calories:<10} {fat:<10} {protein:<10}")
-        
+    
         print("\nSummary:")
         print(f"Total items: {len(selected_items)}")
         print(f"Total calories: {total_calories}")
         print(f"Total fat: {total_fat:.2f}g")
         print(f"Total protein: {total_protein:.2f}g")
         print(f"Fat/protein ratio: {total_fat/total_protein:.2f}g of fat per gram of protein")
+        print_quality(quality, 'g')
     else:
-        print("No solution found. Try decreasing the protein requirement.")
-    
-    conn.close()
+        print_no_solution(quality, "No solution found. Try decreasing the protein requirement.")
 
 def max_carbs(args):
     """Find items that maximize carbs while meeting a minimum protein requirement."""
     protein_min = args.protein
     item_limit = args.items
-    algorithm = args.algorithm
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    found, selected_items, algorithm_name, note, quality = solve_query(args, 'max-carbs', protein_min, item_limit)
     
-    query = '''
-    SELECT id, calories, protein, item, company, total_fat, carbs
-    FROM fast_food_items 
-    WHERE protein IS NOT NULL AND protein > 0 AND carbs IS NOT NULL
-    '''
-    
-    if args.company:
-        query += ' AND company LIKE ?'
-        cursor.execute(query, [f'%{args.company}%'])
-    else:
-        cursor.execute(query)
-    
-    items = cursor.fetchall()
-    
-    if not items:
+    if not found:
         print("No suitable items found.")
-        conn.close()
         return
     
     print(f"Finding max carbs meals with at least {protein_min}g of protein...")
     if item_limit:
         print(f"Limited to a maximum of {item_limit} items.")
-        
-    if algorithm == 'ilp':
-        algorithm_name = "Integer Linear Programming (optimal solution)"
-        print(f"Using {algorithm_name}...")
-        try:
-            selected_items = ilp_max_carbs(items, protein_min, item_limit)
-        except ImportError:
-            print("PuLP is not installed. Falling back to mixed approach...")
-            selected_items = knapsack_max_carbs(items, protein_min, item_limit)
-    else:
-        algorithm_name = "Mixed approach: exhaustive search for small datasets, greedy for large"
-        print(f"Using {algorithm_name}...")
-        selected_items = knapsack_max_carbs(items, protein_min, item_limit)
+    if note:
+        print(note)
+    print(f"Using {algorithm_name}...")
     
     if selected_items:
         total_calories = sum(item[1] for item in selected_items if item[1] is not None)
         total_protein = sum(item[2] for item in selected_items)
         total_carbs = sum(item[6] for item in selected_items)
-        
+    
         print("\nSelected items:")
         print(f"{'Company':<20} {'Item':<50} {'Calories':<10} {'Carbs (g)':<10} {'Protein (g)':<10}")
         print("-" * 110)
-        
+    
         for _, calories, protein, item, company, _, carbs in selected_items:
             print(f"{company[:19]:<20} {item[:49]:<50} {calories:<10} {carbs:<10} {protein:<10}")
-        
+    
         print("\nSummary:")
         print(f"Total items: {len(selected_items)}")
         print(f"Total calories: {total_calories}")
         print(f"Total carbs: {total_carbs:.2f}g")
         print(f"Total protein: {total_protein:.2f}g")
         print(f"Carbs/protein ratio: {total_carbs/total_protein:.2f}g of carbs per gram of protein")
+        print_quality(quality, 'g')
     else:
-        print("No solution found. Try decreasing the protein requirement.")
-    
-    conn.close()
+        print_no_solution(quality, "No solution found. Try decreasing the protein requirement.")
 
 def max_calorie_protein(args):
     """Find items that maximize both calories and protein with a limit on items."""
     item_limit = args.items if args.items else 5  # Default to 5 items if not specified
-    algorithm = args.algorithm
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    query = '''
-    SELECT id, calories, protein, item, company 
-    FROM fast_food_items 
-    WHERE calories IS NOT NULL AND protein IS NOT NULL AND calories > 0 AND protein > 0
-    '''
-    
-    if args.company:
-        query += ' AND company LIKE ?'
-        cursor.execute(query, [f'%{args.company}%'])
-    else:
-        cursor.execute(query)
     
-    items = cursor.fetchall()
+    found, selected_items, algorithm_name, note, quality = solve_query(args, 'max-calorie-protein', None, item_limit)
     
-    if not items:
+    if not found:
         print("No suitable items found.")
-        conn.close()
         return
     
     print(f"Finding maximum calorie-protein combination with {item_limit} items...")
-    if algorithm == 'ilp':
-        print(f"Using {algorithm}...")
-        try:
-            selected_items = ilp_max_calorie_protein(items, item_limit)
-        except ImportError:
-            print("PuLP is not installed. Falling back to weighted scoring...")
-            selected_items = knapsack_max_calorie_protein(items, item_limit)
-    else:
-        print(f"Using top-K selection with weighted calorie-protein scoring")
-        selected_items = knapsack_max_calorie_protein(items, item_limit)
+    if note:
+        print(note)
+    print(f"Using {algorithm_name}...")
     
     if selected_items:
         total_calories = sum(item[1] for item in selected_items)
         total_protein = sum(item[2] for item in selected_items)
-        
+    
         print("\nSelected items:")
         print(f"{'Company':<20} {'Item':<50} {'Calories':<10} {'Protein (g)':<10}")
         print("-" * 90)
-        
+    
         for _, calories, protein, item, company in selected_items:
             print(f"{company[:19]:<20} {item[:49]:<50} {calories:<10} {protein:<10}")
-        
+    
         print("\nSummary:")
         print(f"Total items: {len(selected_items)}")
         print(f"Total calories: {total_calories}")
         print(f"Total protein: {total_protein:.2f}g")
         print(f"Calories/item: {total_calories/len(selected_items):.1f}")
         print(f"Protein/item: {total_protein/len(selected_items):.1f}g")
+        print_quality(quality)
     else:
-        print("No solution found.")
+        print_no_solution(quality, "No solution found.")
+
+def optimize_items(args):
+    """Optimize one nutrient column subject to min/max bounds on any other columns."""
+    try:
+        minimums = parse_bounds(args.min)
+        maximums = parse_bounds(args.max)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    
+    columns = [args.objective] + [column for column in list(minimums) + list(maximums)
+                                  if column != args.objective]
+    columns = list(dict.fromkeys(columns))
+    
+    store = get_item_store()
+    with span('filter'):
+        items = store.rows(columns, args.company)
+    
+    if not items:
+        print("No suitable items found.")
+        return
+    
+    goal = 'Minimizing' if args.minimize else 'Maximizing'
+    print(f"{goal} {args.objective} over {len(items)} items...")
+    for column, bound in minimums.items():
+        print(f"  {column} >= {bound:g}")
+    for column, bound in maximums.items():
+        print(f"  {column} <= {bound:g}")
+    if args.items:
+        print(f"Limited to a maximum of {args.items} items.")
+    
+    check_epsilon(args.epsilon)
+    deadline = Deadline(args.time_limit_ms) if args.time_limit_ms else None
+    try:
+        with span('solve'):
+            selected_items, algorithm, note, deadline = optimize(items, columns, args.objective, minimums, maximums,
+                                                                 args.items, args.minimize, args.algorithm, deadline,
+                                                                 args.epsilon)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    
+    algorithm_names = {
+        'dp': "Optimal 0/1 knapsack with dynamic programming",
+        'bnb': "Branch-and-bound with fractional relaxation bounds (optimal solution)",
+        'ilp': "Integer Linear Programming (optimal solution)",
+        'fptas': fptas_name(args.epsilon),
+    }
+    name = algorithm_names[algorithm]
+    if deadline is not None and deadline.hit:
+        name = name.replace('(optimal solution)', '(stopped at the time limit)')
+    if note:
+        print(note)
+    print(f"Using {name}...")
+    
+    if selected_items:
+        headers = ''.join(f" {column[:12]:>12}" for column in columns)
+        print("\nSelected items:")
+        print(f"{'Company':<20} {'Item':<50}{headers}")
+        print("-" * (71 + 13 * len(columns)))
     
+        for _, item, company, *values in selected_items:
+            cells = ''.join(f" {value:>12g}" for value in values)
+            print(f"{company[:19]:<20} {item[:49]:<50}{cells}")
+    
+        print("\nSummary:")
+        print(f"Total items: {len(selected_items)}")
+        for offset, column in enumerate(columns):
+            total = sum(row[3 + offset] for row in selected_items)
+            print(f"Total {column}: {total:.2f}")
+        gap, bound = selection_quality(items, columns, args.objective, selected_items, args.items, args.minimize,
+                                       deadline, args.epsilon if algorithm == 'fptas' else None)
+        print_quality((gap, bound, deadline is not None and deadline.hit), minimize=args.minimize)
+    else:
+        print_no_solution((None, None, deadline is not None and deadline.hit),
+                          "No solution found. Try relaxing the bounds.")
+
+def pareto(args):
+    """Compute the calories vs. objectives frontier of non-dominated meals."""
+    objectives = [(column, 'max') for column in args.maximize or []]
+    objectives += [(column, 'min') for column in args.minimize or []]
+    if not objectives:
+        objectives = [('protein', 'max')]
+    if len(objectives) > MAX_OBJECTIVES:
+        print(f"Error: at most {MAX_OBJECTIVES} objectives are supported.")
+        return
+    
+    try:
+        resolution = parse_bounds(args.resolution)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    
+    columns = list(dict.fromkeys(['calories'] + [column for column, _ in objectives]))
+    
+    store = get_item_store()
+    with span('filter'):
+        items = store.rows(columns, args.company)
+    
+    if not items:
+        print("No suitable items found.")
+        return
+    
+    described = ', '.join(f"{sense} {column}" for column, sense in objectives)
+    print(f"Computing the calories frontier for {described} within {args.calories} calories...")
+    
+    # Started before solving, so the limit covers the whole solve
+    deadline = Deadline(args.time_limit_ms) if args.time_limit_ms else None
+    try:
+        with span('solve'):
+            frontier = pareto_frontier(items, columns, args.calories, objectives, resolution, deadline)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    if deadline is not None and deadline.hit:
+        print("Time limit reached: the frontier covers only the items processed so far, and later items may "
+              "improve on it.")
+    
+    if args.budget is not None:
+        frontier = best_within(frontier, args.budget)
+        print(f"Frontier points within {args.budget} calories: {len(frontier)}")
+    
+    headers = ''.join(f" {column[:12]:>12}" for column, _ in objectives)
+    print(f"\n{'Calories':>10}{headers} {'Items':>6}")
+    print("-" * (18 + 13 * len(objectives)))
+    for calories, totals, selected in frontier:
+        cells = ''.join(f" {total:>12.1f}" for total in totals)
+        print(f"{calories:>10}{cells} {len(selected):>6}")
+    
+    if args.budget is not None and len(objectives) == 1 and frontier:
+        calories, totals, selected = frontier[-1]
+        print(f"\nBest meal within {args.budget} calories:")
+        print(f"{'Company':<20} {'Item':<50} {'Calories':<10} {objectives[0][0]:<10}")
+        print("-" * 90)
+        for _, item, company, *values in selected:
+            print(f"{company[:19]:<20} {item[:49]:<50} {values[0]:<10} {values[-1]:<10}")
+
+def solve_all(store, requests, workers):
+    """Yield (index, response) for requests, in worker processes when workers > 1."""
+    if workers > 1:
+        with ParallelSolver(store, workers) as solver:
+            yield from solver.solve(requests)
+    else:
+        yield from solve_batch(store, requests)
+
+def batch(args):
+    """Solve many optimizer requests from a JSONL or CSV file, streaming JSONL results."""
+    fmt = args.format or ('csv' if args.input.lower().endswith('.csv') else 'jsonl')
+    try:
+        if args.input == '-':
+            requests = read_requests(sys.stdin, fmt)
+        else:
+            with open(args.input, newline='', encoding='utf-8') as file:
+                requests = read_requests(file, fmt)
+    except (OSError, ValueError) as e:
+        print(f"Error: could not read requests from {args.input}: {e}")
+        exit(1)
+    
+    store = get_item_store()
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    
+    start = time.perf_counter()
+    errors = 0
+    cached = 0
+    for index, response in solve_all(store, requests, args.workers):
+        errors += 'error' in response
+        cached += bool(response.get('cached'))
+        output.write(json.dumps({'index': index, **response}) + '\n')
+        output.flush()
+    elapsed = time.perf_counter() - start
+    
+    if args.output:
+        output.close()
+    # The summary goes to stderr so stdout stays valid JSONL
+    print(f"Solved {len(requests)} requests in {elapsed:.2f} s ({len(requests) / max(elapsed, 1e-9):.1f} requests/s), "
+          f"{cached} from cached results, {errors} errors", file=sys.stderr)
+
+def sweep(args):
+    """Solve one command for every limit and every company (or one filter), as a table."""
+    store = get_item_store()
+    companies = store.company_names if args.per_company else [args.company]
+    requests = [{'command': args.command, 'limit': limit, 'items': args.items,
+                 'company': company, 'algorithm': args.algorithm, 'time_limit_ms': args.time_limit_ms}
+                for company in companies for limit in args.limits]
+    
+    start = time.perf_counter()
+    responses = [None] * len(requests)
+    for index, response in solve_all(store, requests, args.workers):
+        responses[index] = response
+    elapsed = time.perf_counter() - start
+    
+    print(f"{'Company':<30} {'Limit':<10} {'Items':<6} {'Calories':<10} {'Protein':<10} Algorithm")
+    print("-" * 90)
+    for request, response in zip(requests, responses):
+        company = (request['company'] or 'All')[:29]
+        if 'error' in response:
+            print(f"{company:<30} {request['limit']:<10} Error: {response['error']}")
+            continue
+        items = response['items']
+        calories = sum(item[1] for item in items)
+        protein = sum(item[2] for item in items)
+        timed_out = ' (time limit reached)' if response.get('timed_out') else ''
+        print(f"{company:<30} {request['limit']:<10} {len(items):<6} {calories:<10} {protein:<10.1f} "
+              f"{response['algorithm'] or '-'}{timed_out}")
+    print(f"\nSolved {len(requests)} problems in {elapsed:.2f} s", file=sys.stderr)
+
+def calibrate_planner(args):
+    """Time the solvers on this machine and save the planner's cost model."""
+    store = get_item_store()
+    print("Timing dynamic programming, ILP, branch-and-bound, meet-in-the-middle and the FPTAS on the catalog...")
+    start = time.perf_counter()
+    costs = calibrate(store.items('max-protein'), store.items('max-calories'))
+    costs.save(args.output)
+    
+    print(f"\n{'Method':<14} {'Overhead (ms)':>14} {'Per unit':>12}  Unit")
+    print("-" * 56)
+    units = {'dp': 'DP cell', 'ilp_packing': 'item', 'ilp_covering': 'item', 'bnb': 'item', 'mitm': 'item',
+             'fptas': 'FPTAS cell'}
+    for method, (overhead, rate) in costs.coefficients.items():
+        print(f"{method:<14} {overhead * 1000:>14.3f} {rate:>12.3g}  {units.get(method, '')}")
+    print(f"\nSaved to {args.output} in {time.perf_counter() - start:.1f} s")
+
+def explain(args):
+    """Print the query plan and timing of every SQL statement the commands run against fast_food_items."""
+    # Only this command needs them, and dump_database imports pyarrow when it is installed
+    from create_database import DELETE_GROUP_SQL
+    from dump_database import dump_query, table_columns
+    
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    if args.company:
+        companies = load_company_index(conn).resolve(args.company)
+        if not companies:
+            print(f"No companies match '{args.company}'.")
+            conn.close()
+            return
+        print(f"Company filter: {', '.join(companies)}")
+    
+    cursor.execute('SELECT company, item FROM fast_food_items ORDER BY id LIMIT 1')
+    sample = cursor.fetchone() or (None, None)
+    columns = [column for column in table_columns(conn) if column != 'id']
+    # (label, sql, params, whether it is filtered, whether to time it); the writes are only planned
+    statements = [
+        ('item store load', LOAD_SQL, [], False, True),
+        ('items', *items_query(conn, args.company), bool(args.company), True),
+        ('dump', *dump_query(conn, columns, args.company)[::2], bool(args.company), True),
+        ('refresh delete', DELETE_GROUP_SQL, list(sample), True, False),
+        ('refresh company cleanup', UNUSED_COMPANY_SQL, [sample[0], sample[0]], True, False),
+    ]
+    if args.search:
+        statements.insert(2, ('items --search', *items_query(conn, args.company, args.search), True, True))
+    
+    table_scans = 0
+    for label, query, params, filtered, timed in statements:
+        cursor.execute('EXPLAIN QUERY PLAN ' + query, params)
+        plan = [detail for _, _, _, detail in cursor.fetchall()]
+    
+        if timed:
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
+                timings.append((time.perf_counter() - start) * 1000)
+            print(f"\n{label}: {len(rows)} rows, best of {args.repeat}: {min(timings):.3f} ms")
+        else:
+            print(f"\n{label} (planned only, not run)")
+        for detail in plan:
+            # An unfiltered read returns the whole table, and reading it in rowid order
+            # is already the cheapest plan; a filtered one should never scan the table
+            scan = detail.startswith('SCAN fast_food_items') and 'INDEX' not in detail
+            if scan and not filtered:
+                detail += '  (full read in id order)'
+            elif scan:
+                detail += '  <-- table scan'
+                table_scans += 1
+            print(f"  {detail}")
+    
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_company_item'")
+    indexed = cursor.fetchone() is not None
     conn.close()
+    
+    if table_scans and not indexed:
+        print(f"\n{table_scans} filtered statements fall back to a table scan; "
+              "rebuild with create_database.py to add idx_company_item.")
+    elif table_scans:
+        print(f"\n{table_scans} filtered statements scan the table: the filter matches so much of it "
+              "that SQLite rates a scan cheaper than the index.")
+    else:
+        print("\nEvery filtered statement is served by an index.")
 
 def main():
     parser = argparse.ArgumentParser(description='Fast Food Nutrition Database CLI')
+    parser.add_argument('--server', metavar='HOST:PORT',
+                        help='Send optimizer queries to a running solver_server.py instead of solving locally')
+    parser.add_argument('--cache', action='store_true',
+                        help='Reuse optimizer results stored in the database by earlier runs on the same data')
+    parser.add_argument('--profile', action='store_true',
+                        help='Print where the time went (fetch, filter, solve, ...) and solver counters to stderr')
+    parser.add_argument('--profile-out', metavar='PATH',
+                        help='Write a Chrome/Perfetto trace of the spans if PATH ends in .json, '
+                             'otherwise cProfile stats (for pstats or snakeviz)')
     subparsers = parser.add_subparsers(dest='command', help='Command to run')
     
     # List companies command
     companies_parser = subparsers.add_parser('companies', help='List all companies')
+    companies_parser.add_argument('query', nargs='?', help='Only list companies matching this name (prefix or fuzzy match)')
     companies_parser.set_defaults(func=list_companies)
     
     # List items command
     items_parser = subparsers.add_parser('items', help='List food items')
-    items_parser.add_argument('--company', help='Filter by company name (partial match)')
+    items_parser.add_argument('--company', help='Filter by company name (prefix, partial or fuzzy match)')
+    items_parser.add_argument('--search', help='Filter by item name (partial match)')
     items_parser.set_defaults(func=list_items)
     
+    # Batch command
+    batch_parser = subparsers.add_parser('batch', help='Solve many optimizer requests from one file in one process')
+    batch_parser.add_argument('input', help="JSONL or CSV file of requests, or '-' for stdin")
+    batch_parser.add_argument('--format', choices=['jsonl', 'csv'],
+                              help='Input format (default: csv for .csv files, jsonl otherwise)')
+    batch_parser.add_argument('--output', help='Write JSONL results here instead of stdout')
+    batch_parser.add_argument('--workers', type=int, default=1,
+                              help='Solve in this many worker processes sharing the item data (default: 1)')
+    batch_parser.set_defaults(func=batch)
+    
+    # Sweep command
+    sweep_parser = subparsers.add_parser('sweep', help='Solve one command over many limits and/or every company')
+    sweep_parser.add_argument('command', choices=list(QUERIES), help='Optimizer command to run')
+    sweep_parser.add_argument('limits', type=int, nargs='+', help='Calorie limits or protein minimums to solve for')
+    sweep_parser.add_argument('--per-company', action='store_true', help='Solve separately for every company')
+    sweep_parser.add_argument('--company', help='Filter by company name (prefix, partial or fuzzy match)')
+    sweep_parser.add_argument('--items', type=int, help='Maximum number of items to include')
+    sweep_parser.add_argument('--algorithm', help='Algorithm for the command (default: its usual default)')
+    sweep_parser.add_argument('--time-limit-ms', type=float,
+                              help='Stop each solve after this many milliseconds with the best answer found so far')
+    sweep_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                              help='Worker processes (default: one per CPU)')
+    sweep_parser.set_defaults(func=sweep)
+    
+    # Calibrate command
+    calibrate_parser = subparsers.add_parser('calibrate', help='Measure solver speed here for the auto planner')
+    calibrate_parser.add_argument('--output', default=CALIBRATION_PATH,
+                                  help=f'Cost model file to write (default: {CALIBRATION_PATH})')
+    calibrate_parser.set_defaults(func=calibrate_planner)
+    
+    # Explain command
+    explain_parser = subparsers.add_parser('explain', help='Show the query plan and timing of every SQL statement')
+    explain_parser.add_argument('--company', help='Plan the statements with this company filter')
+    explain_parser.add_argument('--search', help='Also plan the items listing with this item name search')
+    explain_parser.add_argument('--repeat', type=int, default=5, help='Timed runs per statement (default: 5)')
+    explain_parser.set_defaults(func=explain)
+    
     # Max protein command
     max_protein_parser = subparsers.add_parser('max-protein', help='Find items that maximize protein within calorie limit')
     max_protein_parser.add_argument('calories', type=int, help='Maximum calorie limit')
-    max_protein_parser.add_argument('--company', help='Filter by company name (partial match)')
+    max_protein_parser.add_argument('--company', help='Filter by company name (prefix, partial or fuzzy match)')
     max_protein_parser.add_argument('--items', type=int, help='Maximum number of items to include')
-    max_protein_parser.add_argument('--algorithm', choices=['dp', 'greedy', 'ilp'], default='auto',
-                                   help='Algorithm to use: dp (dynamic programming), greedy, or ilp (integer linear programming)')
+    max_protein_parser.add_argument('--algorithm', choices=ALGORITHMS['max-protein'], default='auto',
+                                   help='Algorithm to use: auto (fastest exact method by estimated cost), '
+                                        'dp (dynamic programming), greedy, ilp (integer linear programming) '
+                                        'or fptas (within --epsilon of optimal)')
+    max_protein_parser.add_argument('--budget-ms', type=float,
+                                   help='Latency budget for auto without --time-limit-ms; past it fptas or the '
+                                        f'greedy heuristic is used (default: {DEFAULT_BUDGET_MS})')
+    max_protein_parser.add_argument('--time-limit-ms', type=float,
+                                    help='Stop after this many milliseconds with the best answer found so far')
+    max_protein_parser.add_argument('--epsilon', type=float, default=DEFAULT_EPSILON,
+                                    help=f'Relative error allowed to fptas (default: {DEFAULT_EPSILON})')
     max_protein_parser.set_defaults(func=max_protein)
     
     # Max calories command
     max_calories_parser = subparsers.add_parser('max-calories', help='Find items that maximize calories while meeting protein minimum')
     max_calories_parser.add_argument('protein', type=int, help='Minimum protein required (grams)')
-    max_calories_parser.add_argument('--company', help='Filter by company name (partial match)')
+    max_calories_parser.add_argument('--company', help='Filter by company name (prefix, partial or fuzzy match)')
     max_calories_parser.add_argument('--items', type=int, help='Maximum number of items to include')
-    max_calories_parser.add_argument('--algorithm', choices=['mixed', 'ilp'], default='mixed',
-                                    help='Algorithm to use: mixed (exhaustive/greedy) or ilp (integer linear programming)')
+    max_calories_parser.add_argument('--algorithm', choices=ALGORITHMS['max-calories'], default='auto',
+                                    help='Algorithm to use: auto (fastest method by estimated cost), bnb (branch-and-bound; '
+                                         'mixed is an alias), ilp (integer linear programming), fptas (within --epsilon of '
+                                         f'optimal) or mitm (exact meet-in-the-middle for --items {MITM_MAX_ITEMS} or fewer)')
+    max_calories_parser.add_argument('--budget-ms', type=float,
+                                     help='Latency budget for auto without --time-limit-ms; past it fptas is used if it '
+                                          f'fits (default: {DEFAULT_BUDGET_MS})')
+    max_calories_parser.add_argument('--time-limit-ms', type=float,
+                                     help='Stop after this many milliseconds with the best answer found so far')
+    max_calories_parser.add_argument('--epsilon', type=float, default=DEFAULT_EPSILON,
+                                     help=f'Relative error allowed to fptas (default: {DEFAULT_EPSILON})')
     max_calories_parser.set_defaults(func=max_calories)
     
     # Max fat command
     max_fat_parser = subparsers.add_parser('max-fat', help='Find items that maximize total fat while meeting protein minimum')
     max_fat_parser.add_argument('protein', type=int, help='Minimum protein required (grams)')
-    max_fat_parser.add_argument('--company', help='Filter by company name (partial match)')
+    max_fat_parser.add_argument('--company', help='Filter by company name (prefix, partial or fuzzy match)')
     max_fat_parser.add_argument('--items', type=int, help='Maximum number of items to include')
-    max_fat_parser.add_argument('--algorithm', choices=['mixed', 'ilp'], default='mixed',
-                               help='Algorithm to use: mixed (exhaustive/greedy) or ilp (integer linear programming)')
+    max_fat_parser.add_argument('--algorithm', choices=ALGORITHMS['max-fat'], default='auto',
+                               help='Algorithm to use: auto (fastest method by estimated cost), bnb (branch-and-bound; '
+                                    'mixed is an alias), ilp (integer linear programming), fptas (within --epsilon of '
+                                    f'optimal) or mitm (exact meet-in-the-middle for --items {MITM_MAX_ITEMS} or fewer)')
+    max_fat_parser.add_argument('--budget-ms', type=float,
+                                help='Latency budget for auto without --time-limit-ms; past it fptas is used if it '
+                                     f'fits (default: {DEFAULT_BUDGET_MS})')
+    max_fat_parser.add_argument('--time-limit-ms', type=float,
+                                help='Stop after this many milliseconds with the best answer found so far')
+    max_fat_parser.add_argument('--epsilon', type=float, default=DEFAULT_EPSILON,
+                                help=f'Relative error allowed to fptas (default: {DEFAULT_EPSILON})')
     max_fat_parser.set_defaults(func=max_fat)
     
     # Max carbs command
     max_carbs_parser = subparsers.add_parser('max-carbs', help='Find items that maximize carbs while meeting protein minimum')
     max_carbs_parser.add_argument('protein', type=int, help='Minimum protein required (grams)')
-    max_carbs_parser.add_argument('--company', help='Filter by company name (partial match)')
+    max_carbs_parser.add_argument('--company', help='Filter by company name (prefix, partial or fuzzy match)')
     max_carbs_parser.add_argument('--items', type=int, help='Maximum number of items to include')
-    max_carbs_parser.add_argument('--algorithm', choices=['mixed', 'ilp'], default='mixed',
-                                 help='Algorithm to use: mixed (exhaustive/greedy) or ilp (integer linear programming)')
+    max_carbs_parser.add_argument('--algorithm', choices=ALGORITHMS['max-carbs'], default='auto',
+                                 help='Algorithm to use: auto (fastest method by estimated cost), bnb (branch-and-bound; '
+                                      'mixed is an alias), ilp (integer linear programming), fptas (within --epsilon of '
+                                      f'optimal) or mitm (exact meet-in-the-middle for --items {MITM_MAX_ITEMS} or fewer)')
+    max_carbs_parser.add_argument('--budget-ms', type=float,
+                                  help='Latency budget for auto without --time-limit-ms; past it fptas is used if it '
+                                       f'fits (default: {DEFAULT_BUDGET_MS})')
+    max_carbs_parser.add_argument('--time-limit-ms', type=float,
+                                  help='Stop after this many milliseconds with the best answer found so far')
+    max_carbs_parser.add_argument('--epsilon', type=float, default=DEFAULT_EPSILON,
+                                  help=f'Relative error allowed to fptas (default: {DEFAULT_EPSILON})')
     max_carbs_parser.set_defaults(func=max_carbs)
     
     # Max calorie-protein command
@@ -450,17 +792,73 @@ def main():
                                                      help='Find items that maximize both calories and protein')
     max_calorie_protein_parser.add_argument('--items', type=int, default=5, 
                                           help='Maximum number of items to include (default: 5)')
-    max_calorie_protein_parser.add_argument('--company', help='Filter by company name (partial match)')
-    max_calorie_protein_parser.add_argument('--algorithm', choices=['weighted', 'ilp'], default='weighted',
+    max_calorie_protein_parser.add_argument('--company', help='Filter by company name (prefix, partial or fuzzy match)')
+    max_calorie_protein_parser.add_argument('--algorithm', choices=ALGORITHMS['max-calorie-protein'], default='weighted',
                                           help='Algorithm to use: weighted (scoring) or ilp (integer linear programming)')
+    max_calorie_protein_parser.add_argument('--time-limit-ms', type=float,
+                                            help='Stop after this many milliseconds with the best answer found so far')
     max_calorie_protein_parser.set_defaults(func=max_calorie_protein)
     
+    # Generic optimize command
+    optimize_parser = subparsers.add_parser('optimize',
+                                            help='Optimize one nutrient subject to bounds on any others')
+    optimize_parser.add_argument('objective', choices=NUTRIENT_COLUMNS, help='Nutrient column to optimize')
+    optimize_parser.add_argument('--min', action='append', metavar='COLUMN=VALUE',
+                                 help='Lower bound on a column total (repeatable)')
+    optimize_parser.add_argument('--max', action='append', metavar='COLUMN=VALUE',
+                                 help='Upper bound on a column total (repeatable)')
+    optimize_parser.add_argument('--minimize', action='store_true',
+                                 help='Minimize the objective instead of maximizing it')
+    optimize_parser.add_argument('--company', help='Filter by company name (prefix, partial or fuzzy match)')
+    optimize_parser.add_argument('--items', type=int, help='Maximum number of items to include')
+    optimize_parser.add_argument('--algorithm', choices=['auto', 'dp', 'bnb', 'ilp', 'fptas'], default='auto',
+                                 help='Algorithm to use: auto (fastest by estimated cost), dp, bnb, ilp or fptas '
+                                      '(one bound, within --epsilon of optimal)')
+    optimize_parser.add_argument('--time-limit-ms', type=float,
+                                 help='Stop after this many milliseconds with the best answer found so far')
+    optimize_parser.add_argument('--epsilon', type=float, default=DEFAULT_EPSILON,
+                                 help=f'Relative error allowed to fptas (default: {DEFAULT_EPSILON})')
+    optimize_parser.set_defaults(func=optimize_items)
+    
+    # Pareto frontier command
+    pareto_parser = subparsers.add_parser('pareto', help='Compute the frontier of non-dominated meals by calories')
+    pareto_parser.add_argument('calories', type=int, help='Largest calorie total on the frontier')
+    pareto_parser.add_argument('--maximize', action='append', choices=NUTRIENT_COLUMNS, metavar='COLUMN',
+                               help='Objective column to maximize (repeatable; default: protein)')
+    pareto_parser.add_argument('--minimize', action='append', choices=NUTRIENT_COLUMNS, metavar='COLUMN',
+                               help='Objective column to minimize (repeatable)')
+    pareto_parser.add_argument('--budget', type=int,
+                               help='Only show frontier points within this many calories')
+    pareto_parser.add_argument('--resolution', action='append', metavar='COLUMN=STEP',
+                               help='Dominance grid step for a column with several objectives (repeatable)')
+    pareto_parser.add_argument('--company', help='Filter by company name (prefix, partial or fuzzy match)')
+    pareto_parser.add_argument('--time-limit-ms', type=float,
+                               help='Stop after this many milliseconds with the frontier of the items processed so far')
+    pareto_parser.set_defaults(func=pareto)
+    
     args = parser.parse_args()
     
-    if hasattr(args, 'func'):
-        args.func(args)
-    else:
+    if not hasattr(args, 'func'):
         parser.print_help()
+        return
+    
+    profile = enable() if args.profile or args.profile_out else None
+    trace = args.profile_out is not None and args.profile_out.endswith('.json')
+    profiler = cProfile.Profile() if args.profile_out and not trace else None
+    try:
+        if profiler:
+            profiler.enable()
+        # The command's own time, outside its fetch and solve spans, is mostly rendering
+        with span(args.command):
+            args.func(args)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile_out)
+        if profile and trace:
+            profile.write_trace(args.profile_out)
+        if profile and args.profile:
+            profile.report(sys.stderr)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
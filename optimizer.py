@@ -0,0 +1,168 @@
+from ilp_model import MODELS, SelectionModel, backend_available
+from knapsack import (DEFAULT_EPSILON, Deadline, knapsack_dp, knapsack_dp_limited, branch_and_bound_max,
+                      greedy_selection, ilp_deadline_solve, require_ilp, top_values_bound, value_scaled_dp)
+from planner import FALLBACK_TIME_LIMIT_MS, integer_bound, optimality_gap, plan_optimize
+
+# Numeric columns of fast_food_items, in schema order (see create_database.py)
+NUTRIENT_COLUMNS = [
+    'calories', 'calories_from_fat', 'total_fat', 'saturated_fat', 'trans_fat',
+    'cholesterol', 'sodium', 'carbs', 'fiber', 'sugars', 'protein', 'weight_watchers_points'
+]
+
+# Relative slack allowed on bound totals, for ILP solvers' floating-point feasibility tolerance
+BOUND_TOLERANCE = 1e-6
+
+def parse_bounds(specs):
+    """Parse ['calories=1200', 'sodium=1500'] into {'calories': 1200.0, 'sodium': 1500.0}."""
+    bounds = {}
+    for spec in specs or []:
+        column, sep, value = spec.partition('=')
+        column = column.strip()
+        if not sep or column not in NUTRIENT_COLUMNS:
+            raise ValueError(f"Invalid bound '{spec}': expected COLUMN=VALUE with COLUMN one of "
+                             f"{', '.join(NUTRIENT_COLUMNS)}")
+        bounds[column] = float(value)
+    return bounds
+
+def ilp_available():
+    return backend_available()
+
+def check_bounds(selected_rows, columns, minimums, maximums, item_limit, algorithm):
+    """Raise ValueError if a non-empty selection breaks any bound, by more than solver tolerance.
+    
+    The totals are taken over the original column values, so a solver that
+    rounded or scaled them cannot certify a selection outside the bounds.
+    """
+    if not selected_rows:
+        return
+    if item_limit is not None and len(selected_rows) > item_limit:
+        raise ValueError(f"The {algorithm} solver picked {len(selected_rows)} items, over the limit of {item_limit}")
+    for column, bound, sense in ([(column, bound, '>=') for column, bound in minimums.items()]
+                                 + [(column, bound, '<=') for column, bound in maximums.items()]):
+        total = sum(row[3 + columns.index(column)] for row in selected_rows)
+        tolerance = BOUND_TOLERANCE * max(1.0, abs(bound))
+        if (total < bound - tolerance) if sense == '>=' else (total > bound + tolerance):
+            raise ValueError(f"The {algorithm} solver returned a selection breaking {column} {sense} {bound:g} "
+                             f"(total {total:g})")
+
+def choose_algorithm(values, minimums, maximums, item_limit):
+    """Pick dp, bnb or ilp by the planner's estimated cost for the problem's shape, returning (method, note)."""
+    return plan_optimize(values, minimums, maximums, item_limit)
+
+def ilp_solve(values, item_limit, minimums, maximums, owner=None, key=None, deadline=None):
+    """Indexes maximizing values under the bounds, or [] if none satisfy them.
+    
+    With an owner (the row list the values came from) and a key naming the
+    constraint columns, the model is kept and a later call with new bound values
+    or a new objective re-solves it rather than rebuilding it. Raises ValueError
+    if no ILP backend is installed.
+    """
+    require_ilp()
+    
+    bounds = {('min', j): (bound, None) for j, (_, bound) in enumerate(minimums)}
+    bounds.update({('max', j): (None, bound) for j, (_, bound) in enumerate(maximums)})
+    
+    def build():
+        rows = {('min', j): weights for j, (weights, _) in enumerate(minimums)}
+        rows.update({('max', j): weights for j, (weights, _) in enumerate(maximums)})
+        return SelectionModel(values, rows, packing=bool(maximums))
+    
+    model = build() if owner is None else MODELS.model(('optimize', key), owner, build)
+    if deadline is not None:
+        return ilp_deadline_solve(model, bounds, item_limit, deadline, values) or []
+    return model.solve(bounds, item_limit, objective=values) or []
+
+def optimize(rows, columns, objective, minimums=None, maximums=None, item_limit=None,
+             minimize=False, algorithm='auto', deadline=None, epsilon=DEFAULT_EPSILON):
+    """Choose rows maximizing (or minimizing) one column subject to per-column bounds.
+    
+    rows are (id, item, company, *columns) tuples as returned by ItemStore.rows, and
+    minimums/maximums map column names to bounds on the column totals. With a
+    deadline the solver returns its best rows when time runs out (see Deadline).
+    fptas answers within epsilon of the optimum. Branch-and-bound, whether asked
+    for or the only method auto can fall back to, runs under a
+    FALLBACK_TIME_LIMIT_MS deadline if none is given, since packing bounds can
+    keep it searching for minutes; if that cap stops it, the note says so.
+    Returns (selected_rows,
+    algorithm_used, note, deadline), where note explains any fallback and deadline
+    is the one the solve ran under, for selection_quality.
+    """
+    minimums = minimums or {}
+    maximums = maximums or {}
+    
+    def column_values(column):
+        index = 3 + columns.index(column)
+        return [row[index] for row in rows]
+    
+    values = column_values(objective)
+    if minimize:
+        values = [-value for value in values]
+    min_constraints = [(column_values(column), bound) for column, bound in minimums.items()]
+    max_constraints = [(column_values(column), bound) for column, bound in maximums.items()]
+    
+    if not rows:
+        return [], algorithm, None, deadline
+    
+    note = None
+    if algorithm == 'auto':
+        algorithm, note = choose_algorithm(values, min_constraints, max_constraints, item_limit)
+    capped = algorithm == 'bnb' and deadline is None
+    if capped:
+        deadline = Deadline(FALLBACK_TIME_LIMIT_MS)
+    
+    if algorithm == 'dp':
+        if len(max_constraints) != 1 or min_constraints or not integer_bound(*max_constraints[0]):
+            raise ValueError("dp supports exactly one maximum bound, on a column of non-negative whole "
+                             "numbers with a whole-number limit, and no minimum bounds")
+        weights, bound = max_constraints[0]
+        weights = [int(weight) for weight in weights]
+        if item_limit is not None and item_limit < len(rows):
+            selected = knapsack_dp_limited(weights, values, int(bound), item_limit, deadline)
+        else:
+            selected = knapsack_dp(weights, values, int(bound), deadline)
+    elif algorithm == 'fptas':
+        constraints = min_constraints + max_constraints
+        if (len(constraints) != 1 or any(value < 0 for value in values)
+                or any(weight < 0 for weight in constraints[0][0])):
+            raise ValueError("fptas supports exactly one bound, non-negative columns and maximizing only")
+        weights, bound = constraints[0]
+        selected = value_scaled_dp(values, weights, bound, item_limit, epsilon, bool(min_constraints), deadline) or []
+    elif algorithm == 'ilp':
+        key = (tuple(columns), tuple(minimums), tuple(maximums))
+        selected = ilp_solve(values, item_limit, min_constraints, max_constraints, owner=rows, key=key,
+                             deadline=deadline)
+    else:
+        # Under a deadline a greedy incumbent gives the search an answer before its first leaf
+        incumbent = greedy_selection(values, item_limit, min_constraints, max_constraints) if deadline else None
+        selected = branch_and_bound_max(values, item_limit, min_constraints, max_constraints, deadline, incumbent)
+    
+    if capped and deadline.hit and note is None:
+        # The caller set no time limit, so the answer must not pass for a proven optimum
+        note = (f"Branch-and-bound stopped at its {FALLBACK_TIME_LIMIT_MS / 1000:g} s cap before proving its "
+                f"answer optimal. Pass --time-limit-ms to search longer"
+                + (", or --algorithm ilp to solve it exactly." if backend_available() else "."))
+    
+    selected_rows = [rows[i] for i in sorted(selected)]
+    check_bounds(selected_rows, columns, minimums, maximums, item_limit, algorithm)
+    return selected_rows, algorithm, note, deadline
+
+def selection_quality(rows, columns, objective, selected_rows, item_limit=None, minimize=False, deadline=None,
+                      epsilon=None):
+    """(gap, bound) of an optimize answer, as queries.solution_quality gives for built-in queries.
+    
+    bound limits the objective total from the optimal side: an upper bound when
+    maximizing and a lower bound when minimizing. epsilon is given for fptas answers.
+    """
+    index = 3 + columns.index(objective)
+    sign = -1 if minimize else 1
+    value = sign * sum(row[index] for row in selected_rows)
+    if deadline is not None and deadline.hit and deadline.bound is not None:
+        bound = deadline.bound
+    elif (deadline is not None and deadline.hit) or epsilon is not None:
+        bound = top_values_bound([sign * row[index] for row in rows], item_limit)
+        if epsilon is not None:
+            bound = min(bound, value / (1 - epsilon))
+    else:
+        return 0.0, sign * value
+    bound = max(bound, value)
+    return optimality_gap(value, bound), sign * bound
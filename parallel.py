@@ -0,0 +1,82 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from batch import group_key, solve_one, solve_order
+from item_store import ItemStore
+from result_cache import ResultCache
+
+# Commands whose requests in one group share a DP table, so the group stays one task
+TABLE_SHARING_COMMANDS = {'max-protein'}
+
+# Worker process state, set up once by _attach
+_shm = None
+_store = None
+_cache = None
+
+def _attach(shm_name, shape, names, company_names, data_version):
+    global _shm, _store, _cache
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    matrix = np.ndarray(shape, dtype=np.float64, buffer=_shm.buf)
+    _store = ItemStore.from_matrix(matrix, names, company_names, data_version)
+    _cache = ResultCache()
+
+def _solve_task(task):
+    return [(index, solve_one(_store, request, _cache)) for index, request in task]
+
+def split_tasks(requests):
+    """Split requests into independent tasks, in batch solve order.
+    
+    A max-protein group becomes one task so its largest DP table answers the rest;
+    every other request, whose solvers share nothing, is a task of its own.
+    """
+    tasks = []
+    previous = None
+    for index in solve_order(requests):
+        request = requests[index]
+        key = group_key(request)
+        if key is not None and key == previous and key[0] in TABLE_SHARING_COMMANDS:
+            tasks[-1].append((index, request))
+        else:
+            tasks.append([(index, request)])
+        previous = key
+    return tasks
+
+class ParallelSolver:
+    """Fans solve requests out to worker processes that share one ItemStore.
+    
+    The store's numeric matrix is copied once into shared memory and every worker
+    maps it, so no task pickles item data; names travel once per worker at start.
+    Results come back in batch solve order whatever the number of workers, so the
+    output is identical to a serial run.
+    """
+    
+    def __init__(self, store, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        matrix = store.matrix
+        self._shm = shared_memory.SharedMemory(create=True, size=max(matrix.nbytes, 1))
+        np.ndarray(matrix.shape, dtype=np.float64, buffer=self._shm.buf)[:] = matrix
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_attach,
+            initargs=(self._shm.name, matrix.shape, list(store.names), store.company_names, store.data_version))
+    
+    def solve(self, requests):
+        """Yield (index, response) for every request, streaming in batch solve order."""
+        tasks = split_tasks(requests)
+        # A few tasks per worker at a time keeps IPC overhead low and the load balanced
+        chunksize = max(1, len(tasks) // (self.workers * 8))
+        for results in self._pool.map(_solve_task, tasks, chunksize=chunksize):
+            yield from results
+    
+    def close(self):
+        self._pool.shutdown()
+        self._shm.close()
+        self._shm.unlink()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
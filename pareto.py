@@ -0,0 +1,157 @@
+import bisect
+
+import numpy as np
+
+from knapsack import knapsack_dp_backtrack_many, knapsack_dp_table
+
+# Default grid step per column for multi-objective dominance pruning (1 when absent);
+# three objectives multiply it by THREE_OBJECTIVE_COARSENING to keep the frontier small
+DEFAULT_RESOLUTION = {
+    'calories': 10, 'calories_from_fat': 10, 'cholesterol': 5, 'sodium': 10,
+    'weight_watchers_points': 10,
+}
+THREE_OBJECTIVE_COARSENING = 5
+
+# Largest dominance grid built while pruning one layer of labels
+MAX_GRID_CELLS = 4_000_000
+
+MAX_OBJECTIVES = 3
+
+def pareto_frontier(rows, columns, calorie_limit, objectives, resolution=None, deadline=None):
+    """Compute every non-dominated (calories, objective totals) meal within calorie_limit.
+    
+    rows are (id, item, company, *columns) tuples with 'calories' among columns, and
+    objectives is a list of (column, sense) pairs with sense 'max' or 'min'.
+    Returns points sorted by calories as (calories, totals, selected_rows) tuples.
+    
+    A single maximized objective comes straight from the last knapsack DP row, which
+    already holds the best value for every budget. Several objectives use label
+    setting with dominance pruning on a grid of the given resolution per column, so
+    each kept point is within one grid step of any point it pruned.
+    
+    If the deadline expires, both stop adding items: the points returned are real
+    meals, but only the frontier of the items processed so far (deadline.hit is set).
+    """
+    if not 1 <= len(objectives) <= MAX_OBJECTIVES:
+        raise ValueError(f"Between 1 and {MAX_OBJECTIVES} objectives are supported")
+    if not rows or calorie_limit < 0:
+        return []
+    
+    calorie_index = 3 + columns.index('calories')
+    indexes = [3 + columns.index(column) for column, _ in objectives]
+    
+    if len(objectives) == 1 and objectives[0][1] == 'max':
+        return dp_frontier(rows, calorie_index, indexes[0], calorie_limit, deadline)
+    
+    resolution = resolution or {}
+    coarsening = THREE_OBJECTIVE_COARSENING if len(objectives) == 3 else 1
+    steps = [resolution.get(column, DEFAULT_RESOLUTION.get(column, 1) * coarsening)
+             for column in ['calories'] + [column for column, _ in objectives]]
+    signs = [1.0] + [-1.0 if sense == 'max' else 1.0 for _, sense in objectives]
+    return label_frontier(rows, [calorie_index] + indexes, signs, steps, calorie_limit, deadline)
+
+def dp_frontier(rows, calorie_index, value_index, calorie_limit, deadline=None):
+    weights = [int(row[calorie_index]) for row in rows]
+    values = [row[value_index] for row in rows]
+    dp_row, keep = knapsack_dp_table(weights, values, calorie_limit, deadline)
+    
+    # A budget improves on the one below it only when its best meal uses exactly that budget
+    improved = (np.flatnonzero(dp_row[1:] > dp_row[:-1]) + 1).tolist()
+    points = [(0, (0.0,), [])]
+    for w, chosen in zip(improved, knapsack_dp_backtrack_many(weights, keep, improved)):
+        points.append((w, (float(dp_row[w]),), [rows[i] for i in reversed(chosen)]))
+    
+    return points
+
+def label_frontier(rows, indexes, signs, steps, calorie_limit, deadline=None):
+    # Every axis is turned into one to minimize; axis 0 is calories
+    data = np.array([[row[index] for index in indexes] for row in rows], dtype=np.float64)
+    data *= np.array(signs)
+    steps = np.array(steps, dtype=np.float64)
+    
+    # Selections are linked lists: node_item[k] was added on top of node_parent[k]
+    node_item = []
+    node_parent = []
+    
+    totals = np.zeros((1, len(indexes)), dtype=np.float64)
+    nodes = np.array([-1], dtype=np.int64)
+    
+    for i in range(len(rows)):
+        if deadline is not None and deadline.expired():
+            break
+        extended = totals + data[i]
+        fits = extended[:, 0] <= calorie_limit
+        if not fits.any():
+            continue
+    
+        candidates = np.vstack([totals, extended[fits]])
+        origins = np.concatenate([nodes, nodes[fits]])
+        added = np.concatenate([np.zeros(len(totals), dtype=bool), np.ones(fits.sum(), dtype=bool)])
+    
+        survivors = non_dominated(candidates, steps)
+    
+        totals = candidates[survivors]
+        new_nodes = origins[survivors].copy()
+        for k in np.flatnonzero(added[survivors]).tolist():
+            node_item.append(i)
+            node_parent.append(int(new_nodes[k]))
+            new_nodes[k] = len(node_item) - 1
+        nodes = new_nodes
+    
+    points = []
+    for total, node in sorted(zip(totals.tolist(), nodes.tolist())):
+        selected = []
+        while node != -1:
+            selected.append(rows[node_item[node]])
+            node = node_parent[node]
+        selected.reverse()
+        values = tuple(value * sign + 0.0 for value, sign in zip(total[1:], signs[1:]))
+        points.append((int(round(total[0])), values, selected))
+    
+    return points
+
+def non_dominated(candidates, steps):
+    """Return indexes of candidates whose grid cell no other candidate's cell dominates."""
+    keys = np.floor(candidates / steps).astype(np.int64)
+    
+    # One candidate per grid cell: the best on the first axis, then the next, and so on
+    order = np.lexsort(candidates.T[::-1])
+    order = order[np.lexsort(keys[order].T[::-1])]
+    sorted_keys = keys[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = np.any(sorted_keys[1:] != sorted_keys[:-1], axis=1)
+    order = order[first]
+    keys = keys[order]
+    
+    # Ranks preserve dominance and keep the grid no larger than the distinct keys per axis
+    keys = np.column_stack([np.unique(column, return_inverse=True)[1] for column in keys.T])
+    
+    # grid[cell] = lowest last-axis key among candidates at that cell of the other axes,
+    # and a running minimum along every axis gives the lowest one at or below each cell
+    shape = tuple(keys[:, :-1].max(axis=0) + 2)
+    if int(np.prod(shape)) > MAX_GRID_CELLS:
+        raise ValueError("Dominance grid is too fine for these objectives; use a coarser resolution")
+    
+    cells = tuple((keys[:, :-1] + 1).T)
+    grid = np.full(shape, np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(grid, cells, keys[:, -1])
+    for axis in range(grid.ndim):
+        np.minimum.accumulate(grid, axis=axis, out=grid)
+    
+    # Dominated: strictly lower last key at or below the cell, or an equal one strictly below
+    last = keys[:, -1]
+    dominated = grid[cells] < last
+    for axis in range(grid.ndim):
+        below = list(cells)
+        below[axis] = below[axis] - 1
+        dominated |= grid[tuple(below)] <= last
+    
+    return np.sort(order[~dominated])
+
+def best_within(frontier, calorie_budget):
+    """Return the frontier points whose calories fit the budget, by binary search.
+    
+    For a single maximized objective the last returned point is the optimal meal.
+    """
+    calories = [point[0] for point in frontier]
+    return frontier[:bisect.bisect_right(calories, calorie_budget)]
@@ -0,0 +1,252 @@
+import json
+import time
+
+import numpy as np
+
+from ilp_model import MODELS, backend_available
+from knapsack import (DEFAULT_EPSILON, ILP_MISSING, MITM_MAX_ITEMS, fptas_max_protein, ilp_max_calories, ilp_max_protein,
+                      knapsack_dp, knapsack_dp_limited, knapsack_max_calories, mitm_max_calories, most_items)
+
+# Written by `nutrition_cli.py calibrate`; the defaults below are used without it
+CALIBRATION_PATH = 'planner_calibration.json'
+
+# Latency a single solve may take before the planner settles for a heuristic
+DEFAULT_BUDGET_MS = 1000
+
+# Time limit optimize's branch-and-bound runs under when the caller gives none,
+# since packing and minimizing problems can keep it going for minutes
+FALLBACK_TIME_LIMIT_MS = 5000
+
+# Largest DP keep matrix the planner will allocate (one bit per item x budget x layer cell)
+DP_MEMORY_LIMIT = 512 * 2**20
+
+# (overhead seconds, seconds per unit of size) for each method, measured on a
+# single-core development machine with HiGHS and CBC both installed
+DEFAULT_COEFFICIENTS = {
+    'dp': (0.002, 6e-10),
+    'ilp_packing': (0.007, 2.9e-5),
+    'ilp_covering': (0.0004, 4.8e-6),
+    'bnb': (0.0004, 1.7e-6),
+    'mitm': (0.0002, 8e-7),
+    'fptas': (0.003, 9e-10),
+}
+
+class CostModel:
+    """Estimated solve time in seconds for each method, from the problem shape.
+    
+    Every estimate is overhead + rate * size, where size is the DP cell count
+    (items x (budget + 1) x item-count layers) for dp, items x layers x most
+    items / epsilon for the FPTAS, and the item count for ILP, branch-and-bound
+    and meet-in-the-middle. ILP is split into packing (maximum bounds) and covering
+    (minimum bounds) models, which solve at very different speeds.
+    """
+    
+    def __init__(self, coefficients=None):
+        self.coefficients = dict(DEFAULT_COEFFICIENTS)
+        self.coefficients.update({method: tuple(pair) for method, pair in (coefficients or {}).items()})
+    
+    def estimate(self, method, size):
+        overhead, rate = self.coefficients[method]
+        return overhead + rate * size
+    
+    @classmethod
+    def load(cls, path=CALIBRATION_PATH):
+        """The calibrated model at path, or the defaults if it is missing or unreadable."""
+        try:
+            with open(path, encoding='utf-8') as file:
+                return cls(json.load(file)['coefficients'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return cls()
+    
+    def save(self, path=CALIBRATION_PATH):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({'coefficients': self.coefficients, 'calibrated_at': time.time()}, file, indent=2)
+
+_cost_model = None
+
+def cost_model():
+    """The process-wide cost model, loaded from the calibration file on first use."""
+    global _cost_model
+    if _cost_model is None:
+        _cost_model = CostModel.load()
+    return _cost_model
+
+def dp_cells(n, capacity, item_limit=None):
+    layers = item_limit + 1 if item_limit is not None and item_limit < n else 1
+    return n * (int(capacity) + 1) * layers
+
+def integer_bound(weights, bound):
+    """Whether the DP can take sum(weights) <= bound exactly: whole, non-negative weights and limit."""
+    return bound >= 0 and bound == int(bound) and all(weight >= 0 and weight == int(weight) for weight in weights)
+
+def fptas_cells(n, most, item_limit=None, epsilon=DEFAULT_EPSILON):
+    layers = item_limit + 1 if item_limit is not None and item_limit < n else 1
+    most = min(most, item_limit) if item_limit is not None else most
+    return n * layers * most / epsilon
+
+def plan(estimates, budget_ms=None, heuristic=None, approximations=None):
+    """Pick the method with the smallest estimate, or a fallback if that exceeds the budget.
+    
+    estimates maps exact methods to estimated seconds, and approximations does the
+    same for methods with a guaranteed error. Past the budget the fastest
+    approximation within it is used, else the heuristic, or the fastest exact
+    method when there is none. Returns (method, note), with a note only when the
+    budget forced a fallback.
+    """
+    budget_ms = DEFAULT_BUDGET_MS if budget_ms is None else budget_ms
+    if not estimates:
+        return heuristic, None
+    best = min(estimates, key=estimates.get)
+    if estimates[best] * 1000 <= budget_ms or (heuristic is None and not approximations):
+        return best, None
+    
+    costs = ', '.join(f"{method} ~{format_seconds(seconds)}" for method, seconds in sorted(estimates.items()))
+    approximations = {method: seconds for method, seconds in (approximations or {}).items()
+                      if seconds * 1000 <= budget_ms}
+    if approximations:
+        fastest = min(approximations, key=approximations.get)
+        return fastest, (f"Exact solvers are estimated past the {budget_ms:g} ms budget ({costs}); "
+                         f"using {fastest} (~{format_seconds(approximations[fastest])}).")
+    if heuristic is None:
+        # Nothing cheaper to fall back to, so the fastest exact method runs anyway
+        return best, None
+    return heuristic, f"Exact solvers are estimated past the {budget_ms:g} ms budget ({costs}); using a heuristic."
+
+def format_seconds(seconds):
+    return f"{seconds:.1f} s" if seconds >= 1 else f"{seconds * 1000:.0f} ms"
+
+def plan_max_protein(n, calorie_limit, item_limit=None, budget_ms=None, most=None, epsilon=DEFAULT_EPSILON):
+    """'dp', 'ilp', 'fptas' or 'greedy' for a max-protein query, with a note if the budget forced a fallback.
+    
+    most is the most items that fit in the calorie limit (n if unknown), which
+    sizes the FPTAS; it is only used when both exact methods are too slow.
+    """
+    costs = cost_model()
+    estimates = {}
+    cells = dp_cells(n, calorie_limit, item_limit)
+    if cells / 8 <= DP_MEMORY_LIMIT:
+        estimates['dp'] = costs.estimate('dp', cells)
+    if backend_available():
+        estimates['ilp'] = costs.estimate('ilp_packing', n)
+    approximations = {}
+    cells = fptas_cells(n, n if most is None else most, item_limit, epsilon)
+    if cells / 8 <= DP_MEMORY_LIMIT:
+        approximations['fptas'] = costs.estimate('fptas', cells)
+    return plan(estimates, budget_ms, heuristic='greedy', approximations=approximations)
+
+def plan_protein_minimum(n, item_limit=None, budget_ms=None, epsilon=DEFAULT_EPSILON):
+    """'bnb', 'ilp', 'mitm' or 'fptas' for a protein-minimum query, with a note if the budget forced a fallback.
+    
+    max-calories, max-fat and max-carbs maximize a nutrient over a protein minimum, a covering constraint on
+    which branch-and-bound is strong. Meet-in-the-middle applies to item limits up
+    to MITM_MAX_ITEMS. There is no heuristic for a protein minimum, so when no
+    FPTAS fits the budget the fastest exact method runs anyway.
+    """
+    costs = cost_model()
+    estimates = {'bnb': costs.estimate('bnb', n)}
+    if backend_available():
+        estimates['ilp'] = costs.estimate('ilp_covering', n)
+    if item_limit is not None and 0 < item_limit <= MITM_MAX_ITEMS:
+        estimates['mitm'] = costs.estimate('mitm', n)
+    approximations = {}
+    # Any item may be needed to meet the minimum, so a meal can hold all of them
+    cells = fptas_cells(n, n, item_limit, epsilon)
+    if cells / 8 <= DP_MEMORY_LIMIT:
+        approximations['fptas'] = costs.estimate('fptas', cells)
+    return plan(estimates, budget_ms, approximations=approximations)
+
+def plan_optimize(values, minimums, maximums, item_limit):
+    """'dp', 'bnb' or 'ilp' for an optimize problem, with a note if none of them is sure to finish.
+    
+    All three are exact, so there is no budget. When neither DP nor ILP applies
+    and branch-and-bound is weak on the problem, it is still returned, but the
+    note says it runs under FALLBACK_TIME_LIMIT_MS.
+    """
+    costs = cost_model()
+    n = len(values)
+    estimates = {}
+    
+    if len(maximums) == 1 and not minimums:
+        weights, bound = maximums[0]
+        if integer_bound(weights, bound) and dp_cells(n, bound, item_limit) / 8 <= DP_MEMORY_LIMIT:
+            estimates['dp'] = costs.estimate('dp', dp_cells(n, bound, item_limit))
+    
+    if backend_available():
+        estimates['ilp'] = costs.estimate('ilp_packing' if maximums else 'ilp_covering', n)
+    
+    # Branch-and-bound is strong on covering constraints (minimums) over non-negative
+    # values, but its relaxation bounds are weak against packing constraints (maximums)
+    # and negative values (minimizing), where it can take minutes; it is then only the
+    # fallback when nothing else applies
+    if not maximums and all(value >= 0 for value in values):
+        estimates['bnb'] = costs.estimate('bnb', n)
+    
+    method, _ = plan(estimates)
+    if method is None:
+        return 'bnb', (f"{ILP_MISSING}. Using branch-and-bound instead, stopping after "
+                       f"{FALLBACK_TIME_LIMIT_MS / 1000:g} s with its best answer unless --time-limit-ms is given...")
+    return method, None
+
+def optimality_gap(value, bound):
+    """Relative gap between a solution's value and an upper bound on the optimum."""
+    scale = max(abs(value), abs(bound))
+    if scale == 0:
+        return 0.0
+    return max(0.0, (bound - value) / scale)
+
+def calibrate(protein_items, calorie_items, repeat=3):
+    """Time each exact method on slices of the real catalog and fit its cost model.
+    
+    protein_items and calorie_items are the max-protein and max-calories query
+    rows. Returns a CostModel; each method keeps its default if it cannot be timed
+    (e.g. ILP without a solver installed).
+    """
+    def best_time(solve):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            solve()
+            times.append(time.perf_counter() - start)
+        return min(times)
+    
+    def fit(samples):
+        sizes, times = zip(*samples)
+        rate, overhead = np.polyfit(sizes, times, 1)
+        return max(float(overhead), 0.0), max(float(rate), 1e-12)
+    
+    coefficients = {}
+    n = len(protein_items)
+    weights = [int(item[1]) for item in protein_items]
+    values = [item[2] for item in protein_items]
+    if protein_items:
+        samples = []
+        for capacity in [250, 1000, 4000]:
+            samples.append((dp_cells(n, capacity), best_time(lambda: knapsack_dp(weights, values, capacity))))
+            samples.append((dp_cells(n, capacity, 5),
+                            best_time(lambda: knapsack_dp_limited(weights, values, capacity, 5))))
+        coefficients['dp'] = fit(samples)
+    
+        samples = []
+        for epsilon in [0.1, 0.01]:
+            for item_limit in [None, 5]:
+                cells = fptas_cells(n, most_items(weights, 4000), item_limit, epsilon)
+                samples.append((cells, best_time(
+                    lambda: fptas_max_protein(protein_items, 4000, item_limit, epsilon))))
+        coefficients['fptas'] = fit(samples)
+    
+    sizes = sorted({max(len(protein_items) // 8, 1), max(len(protein_items) // 2, 1), len(protein_items)})
+    if backend_available() and protein_items:
+        # A fresh list per solve, so every solve includes building its model
+        coefficients['ilp_packing'] = fit([(size, best_time(
+            lambda: (MODELS.clear(), ilp_max_protein(list(protein_items[:size]), 1500, 5)))) for size in sizes])
+    sizes = sorted({max(len(calorie_items) // 8, 1), max(len(calorie_items) // 2, 1), len(calorie_items)})
+    if backend_available() and calorie_items:
+        coefficients['ilp_covering'] = fit([(size, best_time(
+            lambda: (MODELS.clear(), ilp_max_calories(list(calorie_items[:size]), 50, 3)))) for size in sizes])
+    if calorie_items:
+        coefficients['bnb'] = fit([(size, best_time(lambda: knapsack_max_calories(calorie_items[:size], 50, 3)))
+                                   for size in sizes])
+        coefficients['mitm'] = fit([(size, best_time(lambda: mitm_max_calories(calorie_items[:size], 50, 3)))
+                                    for size in sizes])
+    MODELS.clear()
+    return CostModel(coefficients)
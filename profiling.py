@@ -0,0 +1,104 @@
+import json
+import time
+
+# Off unless a caller opts in, so the solvers pay one flag check per span or counter
+_profile = None
+
+class Span:
+    """A timed region; nested spans are recorded under their parent's path."""
+    
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+    
+    def __enter__(self):
+        self.profile.stack.append(self.name)
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        path = tuple(self.profile.stack)
+        self.profile.stack.pop()
+        self.profile.events.append((path, self.start, end))
+        return False
+
+class NullSpan:
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+
+NULL_SPAN = NullSpan()
+
+class Profile:
+    """Spans and counters recorded while profiling is enabled."""
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stack = []
+        self.events = []
+        self.counters = {}
+    
+    def totals(self):
+        """{path: (seconds, calls)} over every recorded span, each parent before its children."""
+        totals = {}
+        first = {}
+        for path, start, end in self.events:
+            seconds, calls = totals.get(path, (0.0, 0))
+            totals[path] = (seconds + end - start, calls + 1)
+            first[path] = min(first.get(path, start), start)
+        # A parent span encloses its children, so every prefix of a path has a start time
+        order = sorted(totals, key=lambda path: [first.get(path[:i + 1], 0.0) for i in range(len(path))])
+        return {path: totals[path] for path in order}
+    
+    def report(self, file):
+        """Print the span tree with total and self time, then the counters."""
+        totals = self.totals()
+        children = {}
+        for path, (seconds, _) in totals.items():
+            children[path[:-1]] = children.get(path[:-1], 0.0) + seconds
+    
+        print(f"\nProfile{'':<33} {'Total (ms)':>11} {'Self (ms)':>10} {'Calls':>6}", file=file)
+        print("-" * 64, file=file)
+        for path, (seconds, calls) in totals.items():
+            label = '  ' * (len(path) - 1) + path[-1]
+            print(f"{label:<40} {seconds * 1000:>11.2f} {(seconds - children.get(path, 0.0)) * 1000:>10.2f} "
+                  f"{calls:>6}", file=file)
+        if self.counters:
+            print("\nCounters:", file=file)
+            for name, value in self.counters.items():
+                print(f"  {name:<38} {value:>23,}", file=file)
+    
+    def write_trace(self, path):
+        """Write the spans as Chrome trace events (chrome://tracing, Perfetto) with the counters."""
+        events = [{'name': span[-1], 'cat': '/'.join(span[:-1]) or 'root', 'ph': 'X', 'pid': 0, 'tid': 0,
+                   'ts': (start - self.started) * 1e6, 'dur': (end - start) * 1e6}
+                  for span, start, end in sorted(self.events, key=lambda event: event[1])]
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({'traceEvents': events, 'counters': self.counters}, file, indent=1)
+
+def enable():
+    """Start recording spans and counters into a fresh Profile, which is returned."""
+    global _profile
+    _profile = Profile()
+    return _profile
+
+def disable():
+    global _profile
+    _profile = None
+
+def span(name):
+    """Context manager timing a region as name when profiling is enabled."""
+    if _profile is None:
+        return NULL_SPAN
+    return Span(_profile, name)
+
+def count(name, amount=1):
+    """Add amount to the counter name when profiling is enabled.
+    
+    Hot loops should count locally and call this once with the total.
+    """
+    if _profile is not None:
+        _profile.counters[name] = _profile.counters.get(name, 0) + int(amount)
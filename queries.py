@@ -0,0 +1,172 @@
+import math
+from functools import partial
+
+from knapsack import (knapsack_max_protein, greedy_max_protein, ilp_max_protein, fptas_max_protein,
+                     knapsack_max_calories, ilp_max_calories, fptas_max_calories, mitm_max_calories,
+                     knapsack_max_fat, ilp_max_fat, fptas_max_fat, mitm_max_fat,
+                     knapsack_max_carbs, ilp_max_carbs, fptas_max_carbs, mitm_max_carbs,
+                     knapsack_max_calorie_protein, ilp_max_calorie_protein,
+                     DEFAULT_EPSILON, MITM_MAX_ITEMS, max_protein_upper_bound, most_items, top_values_bound)
+from optimizer import ilp_available
+from planner import optimality_gap, plan_max_protein, plan_protein_minimum
+
+# Row shape and validity predicate of every built-in optimizer query; the solvers
+# index rows positionally, so 'columns' fixes the tuple layout they receive
+QUERIES = {
+    'max-protein': {
+        'columns': ['id', 'calories', 'protein', 'item', 'company'],
+        'not_null': ['calories', 'protein'],
+        'positive': ['calories'],
+    },
+    'max-calories': {
+        'columns': ['id', 'calories', 'protein', 'item', 'company'],
+        'not_null': ['calories', 'protein'],
+        'positive': ['protein'],
+    },
+    'max-fat': {
+        'columns': ['id', 'calories', 'protein', 'item', 'company', 'total_fat'],
+        'not_null': ['protein', 'total_fat'],
+        'positive': ['protein'],
+    },
+    'max-carbs': {
+        'columns': ['id', 'calories', 'protein', 'item', 'company', 'total_fat', 'carbs'],
+        'not_null': ['protein', 'carbs'],
+        'positive': ['protein'],
+    },
+    'max-calorie-protein': {
+        'columns': ['id', 'calories', 'protein', 'item', 'company'],
+        'not_null': ['calories', 'protein'],
+        'positive': ['calories', 'protein'],
+    },
+}
+
+# CLI default --algorithm of each query
+DEFAULT_ALGORITHMS = {
+    'max-protein': 'auto',
+    'max-calories': 'auto',
+    'max-fat': 'auto',
+    'max-carbs': 'auto',
+    'max-calorie-protein': 'weighted',
+}
+
+# Every algorithm each built-in query accepts ('mixed' is an alias of 'bnb')
+ALGORITHMS = {
+    'max-protein': ['auto', 'dp', 'greedy', 'ilp', 'fptas'],
+    'max-calories': ['auto', 'bnb', 'mixed', 'ilp', 'fptas', 'mitm'],
+    'max-fat': ['auto', 'bnb', 'mixed', 'ilp', 'fptas', 'mitm'],
+    'max-carbs': ['auto', 'bnb', 'mixed', 'ilp', 'fptas', 'mitm'],
+    'max-calorie-protein': ['weighted', 'ilp'],
+}
+
+# Value each built-in query maximizes, over its row layout
+OBJECTIVES = {
+    'max-protein': lambda item: item[2],
+    'max-calories': lambda item: item[1],
+    'max-fat': lambda item: item[5],
+    'max-carbs': lambda item: item[6],
+    'max-calorie-protein': lambda item: item[1] + item[2] * 20,
+}
+
+DP_NAME = "Optimal 0/1 knapsack with dynamic programming"
+GREEDY_NAME = "Greedy heuristic (not knapsack - using protein-to-calorie ratio)"
+BNB_NAME = "Branch-and-bound with fractional relaxation bounds (optimal solution)"
+ILP_NAME = "Integer Linear Programming (optimal solution)"
+MITM_NAME = "Meet-in-the-middle over dominance-pruned items (optimal solution)"
+WEIGHTED_NAME = "Top-K selection with weighted calorie-protein scoring"
+
+def fptas_name(epsilon):
+    return f"Value-scaled dynamic programming (FPTAS, within {epsilon * 100:g}% of optimal)"
+
+def select_solver(command, algorithm, items, limit, item_limit=None, budget_ms=None, deadline=None, epsilon=None):
+    """Pick the solver for a built-in query.
+    
+    Returns (algorithm_name, solver, note) where solver(items, limit, item_limit)
+    returns the selected rows and note explains any fallback (or is None). For
+    max-protein, 'auto' asks the planner for the fastest exact method, or the
+    FPTAS or greedy when every exact method is estimated past budget_ms. For
+    max-calories, max-fat and max-carbs it picks among branch-and-bound, ILP,
+    meet-in-the-middle and the FPTAS the same way. With a deadline the budget is
+    ignored: exact solvers stop at the deadline with their best answer so far,
+    which is no worse than the fallbacks would give. epsilon is the FPTAS's
+    relative error.
+    'mitm' needs an item limit of at most MITM_MAX_ITEMS and otherwise falls back
+    to branch-and-bound.
+    """
+    note = None
+    epsilon = DEFAULT_EPSILON if epsilon is None else epsilon
+    if algorithm == 'ilp' and not ilp_available():
+        algorithm = 'auto'
+        note = "Neither highspy nor PuLP is installed. Falling back to the default algorithm..."
+    
+    if command == 'max-protein':
+        if algorithm not in ('dp', 'greedy', 'ilp', 'fptas'):
+            if deadline is not None:
+                budget_ms = math.inf
+            most = most_items([item[1] for item in items], limit)
+            algorithm, plan_note = plan_max_protein(len(items), limit, item_limit, budget_ms, most, epsilon)
+            note = ' '.join(filter(None, [note, plan_note])) or None
+        if algorithm == 'ilp':
+            return ILP_NAME, partial(ilp_max_protein, deadline=deadline), note
+        if algorithm == 'greedy':
+            return GREEDY_NAME, greedy_max_protein, note
+        if algorithm == 'fptas':
+            return fptas_name(epsilon), partial(fptas_max_protein, epsilon=epsilon, deadline=deadline), note
+        return DP_NAME, partial(knapsack_max_protein, deadline=deadline), note
+    
+    if command == 'max-calorie-protein':
+        if algorithm == 'ilp':
+            return ILP_NAME, lambda rows, _, item_limit: ilp_max_calorie_protein(rows, item_limit, deadline), note
+        return WEIGHTED_NAME, lambda rows, _, item_limit: knapsack_max_calorie_protein(rows, item_limit), note
+    
+    exact, ilp, fptas, mitm = {
+        'max-calories': (knapsack_max_calories, ilp_max_calories, fptas_max_calories, mitm_max_calories),
+        'max-fat': (knapsack_max_fat, ilp_max_fat, fptas_max_fat, mitm_max_fat),
+        'max-carbs': (knapsack_max_carbs, ilp_max_carbs, fptas_max_carbs, mitm_max_carbs),
+    }[command]
+    if algorithm not in ('bnb', 'mixed', 'ilp', 'fptas', 'mitm'):
+        if deadline is not None:
+            budget_ms = math.inf
+        algorithm, plan_note = plan_protein_minimum(len(items), item_limit, budget_ms, epsilon)
+        note = ' '.join(filter(None, [note, plan_note])) or None
+    if algorithm == 'mitm':
+        if item_limit is not None and 0 < item_limit <= MITM_MAX_ITEMS:
+            return MITM_NAME, partial(mitm, deadline=deadline), note
+        note = ' '.join(filter(None, [note, f"Meet-in-the-middle needs --items between 1 and {MITM_MAX_ITEMS}. "
+                                            "Using branch-and-bound instead..."]))
+    if algorithm == 'ilp':
+        return ILP_NAME, partial(ilp, deadline=deadline), note
+    if algorithm == 'fptas':
+        return fptas_name(epsilon), partial(fptas, epsilon=epsilon, deadline=deadline), note
+    return BNB_NAME, partial(exact, deadline=deadline), note
+
+def relaxation_bound(command, items, limit, item_limit):
+    """An upper bound on a built-in query's optimum from a relaxation of its constraints."""
+    if command == 'max-protein':
+        return max_protein_upper_bound(items, limit, item_limit)
+    # Dropping the protein minimum leaves the item_limit best objective values
+    objective = OBJECTIVES[command]
+    return top_values_bound([objective(item) for item in items if None not in item[1:3]], item_limit)
+
+def solution_quality(command, algorithm_name, items, limit, item_limit, selected_items, deadline=None, epsilon=None):
+    """(gap, bound) for a solution: its relative optimality gap and an upper bound on the optimum.
+    
+    Exact answers have gap 0 and their own value as the bound. A heuristic answer,
+    or one cut short by the deadline, is measured against the solver's bound or,
+    failing that, the query's relaxation bound. An FPTAS answer (epsilon being the
+    one it was solved with) is also within epsilon of its bound.
+    """
+    objective = OBJECTIVES[command]
+    value = sum(objective(item) for item in selected_items)
+    epsilon = DEFAULT_EPSILON if epsilon is None else epsilon
+    if deadline is not None and deadline.hit:
+        bound = deadline.bound
+        if bound is None:
+            bound = relaxation_bound(command, items, limit, item_limit)
+    elif algorithm_name == GREEDY_NAME:
+        bound = max_protein_upper_bound(items, limit, item_limit)
+    elif algorithm_name == fptas_name(epsilon):
+        bound = min(relaxation_bound(command, items, limit, item_limit), value / (1 - epsilon))
+    else:
+        return 0.0, value
+    bound = max(bound, value)
+    return optimality_gap(value, bound), bound
@@ -0,0 +1,204 @@
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from knapsack import (knapsack_max_protein, knapsack_dp_table, knapsack_dp_backtrack,
+                      knapsack_dp_limited_table, knapsack_dp_limited_backtrack)
+from planner import DP_MEMORY_LIMIT, dp_cells
+from queries import DP_NAME, select_solver
+from search import has_table
+
+DEFAULT_MAX_ENTRIES = 1024
+
+# DP tables kept for monotonic reuse; each holds a bit-packed keep matrix of
+# n * (K + 1) * (C + 1) / 8 bytes
+DEFAULT_MAX_TABLES = 8
+
+def data_version(conn):
+    """Return the data-version stamp create_database.py wrote, or None for unstamped databases."""
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT value FROM metadata WHERE key = 'data_version'")
+        row = cursor.fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+class ResultCache:
+    """Memoizes built-in query results keyed on (query, parameters, company filter, data version).
+    
+    Results live in a size-bounded LRU and, when db_path is given, in a result_cache
+    side table of that database so they survive between processes. max-protein DP
+    tables are kept too: a table built for some calorie limit and item limit answers
+    every smaller limit by backtracking, without solving again.
+    """
+    
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_tables=DEFAULT_MAX_TABLES, db_path=None):
+        self.max_entries = max_entries
+        self.max_tables = max_tables
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+        self._tables = OrderedDict()
+        self._lock = threading.Lock()
+    
+        if db_path:
+            self._prepare_table()
+    
+    def _prepare_table(self):
+        """Create the result_cache table, or prune entries from older data, only when needed.
+        
+        Every --cache run opens a cache, so the usual case, a table already current,
+        only reads: it takes no write lock and works on a read-only database.
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            if not has_table(conn, 'result_cache'):
+                conn.execute('''
+                CREATE TABLE result_cache (
+                    key TEXT PRIMARY KEY,
+                    data_version TEXT,
+                    value TEXT
+                )
+                ''')
+                conn.commit()
+            else:
+                version = data_version(conn)
+                cursor = conn.cursor()
+                cursor.execute('SELECT 1 FROM result_cache WHERE data_version IS NOT ? LIMIT 1', [version])
+                if cursor.fetchone() is not None:
+                    # Entries from an older build of the data can never be hit again
+                    conn.execute('DELETE FROM result_cache WHERE data_version IS NOT ?', [version])
+                    conn.commit()
+        except sqlite3.OperationalError:
+            # A read-only database: stale entries are never hit anyway, since keys carry
+            # the data version, but without a table results stay in memory
+            if not has_table(conn, 'result_cache'):
+                self.db_path = None
+        finally:
+            conn.close()
+    
+    def get(self, key):
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+    
+        if not self.db_path:
+            return None
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('SELECT value FROM result_cache WHERE key = ?', [json.dumps(key)])
+        row = cursor.fetchone()
+        conn.close()
+        if row is None:
+            return None
+    
+        value = json.loads(row[0])
+        value['items'] = [tuple(item) for item in value['items']]
+        self._remember(key, value)
+        return value
+    
+    def put(self, key, value):
+        self._remember(key, value)
+        if self.db_path:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                conn.execute('INSERT OR REPLACE INTO result_cache (key, data_version, value) VALUES (?, ?, ?)',
+                             [json.dumps(key), key[-1], json.dumps(value)])
+                conn.commit()
+            except sqlite3.OperationalError:
+                # Read-only or busy: the result is still remembered in memory
+                pass
+            finally:
+                conn.close()
+    
+    def _remember(self, key, value):
+        with self._lock:
+            self._results[key] = value
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+    
+    def solve(self, command, algorithm, items, limit, item_limit, company, version, budget_ms=None, deadline=None,
+              epsilon=None):
+        """Solve a built-in query through the cache.
+    
+        Returns (algorithm_name, selected_items, note, cached). With a deadline,
+        cached answers are still served, but a fresh answer is solved directly
+        rather than through a DP table, and is not stored if the deadline cut it short.
+        """
+        algorithm_name, solver, note = select_solver(command, algorithm, items, limit, item_limit, budget_ms,
+                                                     deadline, epsilon)
+        if version is None:
+            return algorithm_name, solver(items, limit, item_limit), note, False
+    
+        key = (command, algorithm_name, limit, item_limit, company.lower() if company else None, version)
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value['algorithm'], value['items'], value['note'], True
+        self.misses += 1
+    
+        if command == 'max-protein' and algorithm_name == DP_NAME and deadline is None:
+            selected_items = self.max_protein_from_table(items, limit, item_limit, key[4], version)
+        else:
+            selected_items = solver(items, limit, item_limit)
+    
+        if deadline is None or not deadline.hit:
+            self.put(key, {'algorithm': algorithm_name, 'items': selected_items, 'note': note})
+        return algorithm_name, selected_items, note, False
+    
+    def max_protein_from_table(self, items, calorie_limit, item_limit, company, version):
+        """Answer knapsack_max_protein from a cached DP table covering this limit, or build one."""
+        n = len(items)
+        if n == 0 or calorie_limit < 0 or (item_limit is not None and item_limit <= 0):
+            return []
+        # Matches knapsack_max_protein: an item limit of n or more is no limit at all
+        layers = item_limit if item_limit is not None and item_limit < n else None
+        weights = [int(item[1]) for item in items]
+    
+        # Tables are prefix-consistent in budget and item count, so any cached table at
+        # least this large in both answers the request exactly
+        table_key = (company, version, layers is None)
+        with self._lock:
+            table = self._tables.get(table_key)
+        capacity, table_layers = calorie_limit, layers
+        if table is not None:
+            if table[0] >= calorie_limit and (layers is None or table[1] >= layers):
+                with self._lock:
+                    self._tables.move_to_end(table_key)
+            else:
+                # Grow to cover both the old table and this request, so neither rebuilds again,
+                # unless the grown table would break the DP memory limit; then a table sized
+                # for this request alone replaces the old one
+                grown_capacity = max(capacity, table[0])
+                grown_layers = None if layers is None else max(layers, table[1])
+                if dp_cells(n, grown_capacity, grown_layers) / 8 <= DP_MEMORY_LIMIT:
+                    capacity, table_layers = grown_capacity, grown_layers
+                table = None
+    
+        if table is None:
+            if dp_cells(n, capacity, table_layers) / 8 > DP_MEMORY_LIMIT:
+                # Too large to keep around: solve this request without caching a table
+                return knapsack_max_protein(items, calorie_limit, item_limit)
+            values = [item[2] for item in items]
+            if table_layers is None:
+                _, keep = knapsack_dp_table(weights, values, capacity)
+            else:
+                _, keep = knapsack_dp_limited_table(weights, values, capacity, table_layers)
+            table = (capacity, table_layers, keep)
+            with self._lock:
+                self._tables[table_key] = table
+                self._tables.move_to_end(table_key)
+                while len(self._tables) > self.max_tables:
+                    self._tables.popitem(last=False)
+    
+        keep = table[2]
+        if layers is None:
+            selected = knapsack_dp_backtrack(weights, keep, calorie_limit)
+        else:
+            selected = knapsack_dp_limited_backtrack(weights, keep, calorie_limit, layers)
+        return [items[i] for i in selected]
@@ -0,0 +1,160 @@
+import bisect
+import difflib
+import re
+import sqlite3
+import unicodedata
+
+# Lowest difflib similarity for a fuzzy company match ("Mcdonlds" -> "McDonald's")
+FUZZY_CUTOFF = 0.75
+
+# Trigram full-text search needs at least this many characters in the query
+MIN_TRIGRAM_LENGTH = 3
+
+def normalize_name(name):
+    """Fold a name for matching: accents, case, apostrophes and punctuation are dropped."""
+    name = unicodedata.normalize('NFKD', name)
+    name = ''.join(c for c in name if not unicodedata.combining(c)).lower()
+    name = re.sub(r"['’`´]", '', name)
+    return ' '.join(re.sub(r'[^\w]+', ' ', name).split())
+
+class CompanyIndex:
+    """Sorted normalized company names, resolving a user's filter to canonical names.
+    
+    A filter resolves to the first non-empty tier of: an exact normalized match,
+    normalized names starting with it, names containing it, then fuzzy matches.
+    Lookups scale with the number of companies, never with the number of items.
+    """
+    
+    def __init__(self, entries):
+        """entries are (normalized, name) pairs, as stored in the companies table."""
+        entries = sorted(set(entries))
+        self.keys = [key for key, _ in entries]
+        self.names = [name for _, name in entries]
+    
+    @classmethod
+    def from_names(cls, names):
+        return cls((normalize_name(name), name) for name in names if name is not None)
+    
+    def __len__(self):
+        return len(self.names)
+    
+    def resolve(self, query):
+        """Return the canonical company names a --company filter refers to."""
+        key = normalize_name(query)
+        if not key:
+            return []
+    
+        start = bisect.bisect_left(self.keys, key)
+        end = bisect.bisect_right(self.keys, key + '\uffff')
+        exact = [name for k, name in zip(self.keys[start:end], self.names[start:end]) if k == key]
+        if exact:
+            return exact
+        if end > start:
+            return self.names[start:end]
+    
+        contained = [name for k, name in zip(self.keys, self.names) if key in k]
+        if contained:
+            return contained
+    
+        close = set(difflib.get_close_matches(key, self.keys, n=3, cutoff=FUZZY_CUTOFF))
+        return [name for k, name in zip(self.keys, self.names) if k in close]
+
+def has_table(conn, name):
+    cursor = conn.cursor()
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?", [name])
+    return cursor.fetchone() is not None
+
+def load_company_index(conn):
+    """Build a CompanyIndex from the companies table, or from the items for older databases."""
+    cursor = conn.cursor()
+    if has_table(conn, 'companies'):
+        cursor.execute('SELECT normalized, name FROM companies')
+        return CompanyIndex(cursor.fetchall())
+    cursor.execute('SELECT DISTINCT company FROM fast_food_items')
+    return CompanyIndex.from_names(row[0] for row in cursor.fetchall())
+
+def resolve_companies(conn, query):
+    return load_company_index(conn).resolve(query)
+
+def company_predicate(companies):
+    """SQL predicate and params restricting rows to the given canonical companies (uses idx_company_item)."""
+    return f"company IN ({', '.join('?' * len(companies))})", list(companies)
+
+def item_predicate(conn, text):
+    """SQL predicate and params for items whose name contains text, case-insensitively.
+    
+    Uses the item_search trigram index when the text is long enough to form a
+    trigram, building the index on the database's first such search; otherwise,
+    or if the index cannot be built, falls back to a LIKE scan.
+    """
+    if len(text) >= MIN_TRIGRAM_LENGTH and ensure_item_search(conn):
+        # A quoted FTS5 string matches the text as a substring under the trigram tokenizer
+        phrase = '"' + text.replace('"', '""') + '"'
+        return 'id IN (SELECT rowid FROM item_search WHERE item_search MATCH ?)', [phrase]
+    return 'item LIKE ?', [f'%{text}%']
+
+def create_company_table(cursor):
+    """Create and fill the companies lookup table."""
+    cursor.execute('CREATE TABLE IF NOT EXISTS companies (name TEXT PRIMARY KEY, normalized TEXT)')
+    cursor.execute('SELECT DISTINCT company FROM fast_food_items WHERE company IS NOT NULL')
+    add_companies(cursor, [row[0] for row in cursor.fetchall()])
+
+def ensure_item_search(conn):
+    """Build the item_search trigram index if the database lacks it; returns whether it is usable.
+    
+    Indexing every item name costs seconds on large catalogs, so it is left out
+    of the build and made here, once, by the first search. Triggers then keep it
+    in step with later inserts, updates and deletes. Returns False when SQLite
+    was built without FTS5 or the database is read-only.
+    """
+    if has_table(conn, 'item_search'):
+        return True
+    try:
+        # IMMEDIATE takes the write lock first, so concurrent first searches build it once
+        conn.execute('BEGIN IMMEDIATE')
+        if not has_table(conn, 'item_search'):
+            create_item_search(conn.cursor())
+        conn.commit()
+    except sqlite3.OperationalError:
+        conn.rollback()
+        return False
+    return True
+
+def create_item_search(cursor):
+    """Create and fill the item_search trigram index over item names, with the triggers that maintain it."""
+    cursor.execute('''
+    CREATE VIRTUAL TABLE item_search USING fts5(
+        item, content='fast_food_items', content_rowid='id', tokenize='trigram'
+    )
+    ''')
+    cursor.execute("INSERT INTO item_search(item_search) VALUES ('rebuild')")
+    cursor.execute('''
+    CREATE TRIGGER item_search_insert AFTER INSERT ON fast_food_items BEGIN
+        INSERT INTO item_search(rowid, item) VALUES (new.id, new.item);
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER item_search_delete AFTER DELETE ON fast_food_items BEGIN
+        INSERT INTO item_search(item_search, rowid, item) VALUES ('delete', old.id, old.item);
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER item_search_update AFTER UPDATE OF item ON fast_food_items BEGIN
+        INSERT INTO item_search(item_search, rowid, item) VALUES ('delete', old.id, old.item);
+        INSERT INTO item_search(rowid, item) VALUES (new.id, new.item);
+    END
+    ''')
+
+def add_companies(cursor, names):
+    cursor.executemany('INSERT OR IGNORE INTO companies (name, normalized) VALUES (?, ?)',
+                       [(name, normalize_name(name)) for name in names if name is not None])
+
+# Removes a company without items; the EXISTS is an index probe on idx_company_item
+UNUSED_COMPANY_SQL = '''
+DELETE FROM companies WHERE name = ?
+AND NOT EXISTS (SELECT 1 FROM fast_food_items WHERE company = ?)
+'''
+
+def drop_unused_companies(cursor, names):
+    """Remove companies that no longer have any items (an index probe per name)."""
+    cursor.executemany(UNUSED_COMPANY_SQL, [(name, name) for name in names if name is not None])
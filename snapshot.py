@@ -0,0 +1,144 @@
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from optimizer import NUTRIENT_COLUMNS
+
+# Bumped whenever the layout below changes; readers reject any other version
+SNAPSHOT_VERSION = 1
+MAGIC = b'FFSNAPSH'
+
+# magic, version, matrix rows, item count, data version, then the byte offset of the
+# column names, company names, matrix, name offsets, name NULL flags and name data,
+# and the size of the name data. Every field is little-endian
+HEADER = struct.Struct('<8sIIQ64sQQQQQQQ')
+
+# The matrix starts on a page boundary so it maps straight into a float64 array
+ALIGNMENT = 4096
+
+def snapshot_path(db_path):
+    """fast_food.db -> fast_food.snapshot"""
+    return os.path.splitext(db_path)[0] + '.snapshot'
+
+def align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+def encode_strings(strings):
+    """A string table: int64 end offsets, then the UTF-8 bytes of every string back to back."""
+    data = [string.encode('utf-8') for string in strings]
+    ends = np.cumsum([len(chunk) for chunk in data], dtype=np.int64)
+    return np.int64(len(data)).tobytes() + ends.tobytes() + b''.join(data)
+
+def decode_strings(buffer, offset):
+    count = int(np.frombuffer(buffer, dtype=np.int64, count=1, offset=offset)[0])
+    ends = np.frombuffer(buffer, dtype=np.int64, count=count, offset=offset + 8)
+    start = offset + 8 + 8 * count
+    strings = []
+    previous = 0
+    for end in ends.tolist():
+        strings.append(bytes(buffer[start + previous:start + end]).decode('utf-8'))
+        previous = end
+    return strings
+
+class StringTable:
+    """Item names read on demand from a mapped snapshot, so opening it decodes nothing."""
+    
+    def __init__(self, buffer, offsets, nulls, data_offset):
+        self._buffer = buffer
+        self._offsets = offsets
+        self._nulls = nulls
+        self._data_offset = data_offset
+    
+    def __len__(self):
+        return len(self._nulls)
+    
+    def __getitem__(self, index):
+        if self._nulls[index]:
+            return None
+        start = self._data_offset + int(self._offsets[index])
+        end = self._data_offset + int(self._offsets[index + 1])
+        return self._buffer[start:end].decode('utf-8')
+    
+    def take(self, indexes):
+        """The names at an array of row indexes, as a list."""
+        starts = (self._offsets[indexes] + self._data_offset).tolist()
+        ends = (self._offsets[indexes + 1] + self._data_offset).tolist()
+        nulls = self._nulls[indexes].tolist()
+        buffer = self._buffer
+        return [None if null else buffer[start:end].decode('utf-8') for start, end, null in zip(starts, ends, nulls)]
+    
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
+
+def write_snapshot(path, matrix, names, company_names, version):
+    """Write an ItemStore's arrays to a binary snapshot at path.
+    
+    The snapshot holds the store matrix (ids, company codes and every nutrient,
+    NaN for NULL) as one little-endian float64 array per column, the item names
+    as a string table and the company names, stamped with the database's data
+    version. It is written to a per-process build file that then replaces the
+    old snapshot atomically, so concurrent writers and readers never see half
+    of one.
+    """
+    n = matrix.shape[1]
+    width = 2 + len(NUTRIENT_COLUMNS)
+    columns_table = encode_strings(NUTRIENT_COLUMNS)
+    companies_table = encode_strings(company_names)
+    encoded = [(name or '').encode('utf-8') for name in names]
+    name_ends = np.zeros(n + 1, dtype='<i8')
+    np.cumsum([len(name) for name in encoded], out=name_ends[1:])
+    nulls = np.array([name is None for name in names], dtype=np.bool_)
+    
+    columns_offset = HEADER.size
+    companies_offset = columns_offset + len(columns_table)
+    matrix_offset = align(companies_offset + len(companies_table))
+    name_offsets_offset = matrix_offset + width * n * 8
+    nulls_offset = name_offsets_offset + (n + 1) * 8
+    names_offset = nulls_offset + n
+    
+    build_path = f'{path}.{os.getpid()}.build'
+    try:
+        with open(build_path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, SNAPSHOT_VERSION, width, n, (version or '').encode('ascii'),
+                                   columns_offset, companies_offset, matrix_offset, name_offsets_offset,
+                                   nulls_offset, names_offset, int(name_ends[-1])))
+            file.write(columns_table)
+            file.write(companies_table)
+            file.write(bytes(matrix_offset - companies_offset - len(companies_table)))
+            file.write(np.ascontiguousarray(matrix, dtype='<f8').data)
+            file.write(name_ends.tobytes())
+            file.write(nulls.tobytes())
+            file.write(b''.join(encoded))
+        os.replace(build_path, path)
+    finally:
+        if os.path.exists(build_path):
+            os.remove(build_path)
+
+def read_snapshot(path):
+    """Map a snapshot, returning (matrix, names, company_names, data_version) without copying the matrix.
+    
+    The matrix is a read-only view of the file's pages, so every process that maps
+    the same snapshot shares one copy in the page cache. Raises ValueError if the
+    file is not a snapshot of this version and column layout.
+    """
+    with open(path, 'rb') as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(buffer) < HEADER.size:
+        raise ValueError(f"{path} is not an item snapshot")
+    (magic, version, width, n, stamp, columns_offset, companies_offset, matrix_offset, name_offsets_offset,
+     nulls_offset, names_offset, names_size) = HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError(f"{path} is not a version {SNAPSHOT_VERSION} item snapshot")
+    if decode_strings(buffer, columns_offset) != NUTRIENT_COLUMNS or width != 2 + len(NUTRIENT_COLUMNS):
+        raise ValueError(f"{path} has a different column layout; rebuild it with create_database.py")
+    if len(buffer) < names_offset + names_size:
+        raise ValueError(f"{path} is truncated")
+    
+    matrix = np.frombuffer(buffer, dtype='<f8', count=width * n, offset=matrix_offset).reshape(width, n)
+    name_ends = np.frombuffer(buffer, dtype='<i8', count=n + 1, offset=name_offsets_offset)
+    nulls = np.frombuffer(buffer, dtype=np.bool_, count=n, offset=nulls_offset)
+    names = StringTable(buffer, name_ends, nulls, names_offset)
+    version = stamp.rstrip(b'\0').decode('ascii') or None
+    return matrix, names, decode_strings(buffer, companies_offset), version
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import time
+import traceback
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from item_store import load_item_store
+from knapsack import Deadline
+from queries import QUERIES, ALGORITHMS, DEFAULT_ALGORITHMS, select_solver, solution_quality
+from result_cache import DEFAULT_MAX_ENTRIES, ResultCache
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+def is_number(value):
+    """Whether a decoded JSON value is a number; JSON true and false decode to bool, a subclass of int."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def whole_number(value):
+    """value as an int if it is a number without a fractional part, else None."""
+    if is_number(value) and float(value).is_integer():
+        return int(value)
+    return None
+
+def parse_request(request):
+    """Check a solve request's fields, returning them normalized as a dict keyed like the request.
+    
+    Raises ValueError naming the first field that is missing or of the wrong kind;
+    items defaults to 5 for max-calorie-protein and algorithm to the command's default.
+    """
+    if not isinstance(request, dict):
+        raise ValueError("A request must be a JSON object")
+    command = request.get('command')
+    if not isinstance(command, str) or command not in QUERIES:
+        raise ValueError(f"Unknown command: {command}")
+    
+    limit = request.get('limit')
+    if command != 'max-calorie-protein' and not is_number(limit):
+        raise ValueError("A numeric 'limit' is required")
+    if command == 'max-protein':
+        # The calorie limit indexes the DP table, as the CLI's integer CALORIES argument does
+        if whole_number(limit) is None:
+            raise ValueError(f"'limit' must be a whole number of calories for max-protein, not {limit!r}")
+        limit = whole_number(limit)
+    item_limit = request.get('items')
+    if item_limit is not None:
+        if whole_number(item_limit) is None or item_limit <= 0:
+            raise ValueError(f"'items' must be a positive whole number, not {item_limit!r}")
+        item_limit = whole_number(item_limit)
+    elif command == 'max-calorie-protein':
+        item_limit = 5
+    algorithm = request.get('algorithm') or DEFAULT_ALGORITHMS[command]
+    if not isinstance(algorithm, str) or algorithm not in ALGORITHMS[command]:
+        raise ValueError(f"Unknown algorithm for {command}: {algorithm} (choose from {', '.join(ALGORITHMS[command])})")
+    budget_ms = request.get('budget_ms')
+    if budget_ms is not None and not is_number(budget_ms):
+        raise ValueError("'budget_ms' must be a number")
+    time_limit_ms = request.get('time_limit_ms')
+    if time_limit_ms is not None and (not is_number(time_limit_ms) or time_limit_ms <= 0):
+        raise ValueError("'time_limit_ms' must be a positive number")
+    epsilon = request.get('epsilon')
+    if epsilon is not None and (not is_number(epsilon) or not 0 < epsilon < 1):
+        raise ValueError("'epsilon' must be a number between 0 and 1")
+    company = request.get('company')
+    if company is not None and not isinstance(company, str):
+        raise ValueError(f"'company' must be a string, not {company!r}")
+    return {'command': command, 'limit': limit, 'items': item_limit, 'company': company, 'algorithm': algorithm,
+            'budget_ms': budget_ms, 'time_limit_ms': time_limit_ms, 'epsilon': epsilon}
+
+def solve_request(store, request, cache=None):
+    """Answer one solve request against the warm item store, through the result cache if given."""
+    fields = parse_request(request)
+    command, limit, item_limit, company = fields['command'], fields['limit'], fields['items'], fields['company']
+    algorithm, budget_ms, time_limit_ms, epsilon = (fields['algorithm'], fields['budget_ms'], fields['time_limit_ms'],
+                                                    fields['epsilon'])
+    
+    start = time.perf_counter()
+    deadline = Deadline(time_limit_ms) if time_limit_ms is not None else None
+    items = store.items(command, company)
+    if not items:
+        return {'found': 0, 'items': [], 'algorithm': None, 'note': None, 'gap': None, 'bound': None,
+                'timed_out': False, 'cached': False, 'elapsed_ms': 0.0}
+    
+    if cache is not None:
+        algorithm_name, selected_items, note, cached = cache.solve(command, algorithm, items, limit, item_limit,
+                                                                   company, store.data_version,
+                                                                   budget_ms, deadline, epsilon)
+    else:
+        algorithm_name, solver, note = select_solver(command, algorithm, items, limit, item_limit, budget_ms,
+                                                     deadline, epsilon)
+        selected_items = solver(items, limit, item_limit)
+        cached = False
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    gap, bound = solution_quality(command, algorithm_name, items, limit, item_limit, selected_items, deadline,
+                                  epsilon)
+    
+    return {
+        'found': len(items),
+        'items': [list(item) for item in selected_items],
+        'algorithm': algorithm_name,
+        'note': note,
+        'gap': gap,
+        'bound': bound,
+        'timed_out': deadline is not None and deadline.hit,
+        'cached': cached,
+        'elapsed_ms': elapsed_ms,
+    }
+
+def request_solve(server, payload, timeout=60):
+    """Send a solve request to a running solver server at 'host:port'."""
+    request = urllib.request.Request(f'http://{server}/solve', data=json.dumps(payload).encode('utf-8'),
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        # Rejected requests still carry a JSON body with the error message
+        return json.loads(e.read())
+
+class SolverHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Bursts of concurrent clients would otherwise overflow the default backlog of 5
+    request_queue_size = 128
+
+def make_handler(store, cache=None):
+    class SolverHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+    
+        def send_json(self, status, body):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+    
+        def do_GET(self):
+            if self.path == '/health':
+                self.send_json(200, {'status': 'ok', 'items': len(store)})
+            else:
+                self.send_json(404, {'error': 'Not found'})
+    
+        def do_POST(self):
+            if self.path != '/solve':
+                self.send_json(404, {'error': 'Not found'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                self.send_json(200, solve_request(store, request, cache))
+            except (ValueError, TypeError) as e:
+                self.send_json(400, {'error': str(e)})
+            except Exception as e:
+                # A failure in the solver is the server's fault, not the request's; the
+                # client still gets a JSON answer, and the traceback goes to stderr
+                traceback.print_exc()
+                self.send_json(500, {'error': f"Internal error: {type(e).__name__}: {e}"})
+    
+        def log_message(self, format, *args):
+            pass
+    
+    return SolverHandler
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, db_path='fast_food.db', cache_size=DEFAULT_MAX_ENTRIES,
+          persist_cache=False):
+    start = time.perf_counter()
+    store = load_item_store(db_path)
+    # Build every unfiltered query's items up front so the first requests are warm too
+    for command in QUERIES:
+        store.items(command)
+    print(f"Loaded {len(store)} items in {(time.perf_counter() - start) * 1000:.1f} ms")
+    
+    cache = ResultCache(max_entries=cache_size, db_path=db_path if persist_cache else None) if cache_size else None
+    
+    server = SolverHTTPServer((host, port), make_handler(store, cache))
+    print(f"Solver server listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Persistent solver server for the nutrition optimizers')
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'Address to bind (default: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port to bind (default: {DEFAULT_PORT})')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_ENTRIES,
+                        help=f'Solve results kept in memory, 0 to disable caching (default: {DEFAULT_MAX_ENTRIES})')
+    parser.add_argument('--persist-cache', action='store_true',
+                        help='Also store solve results in the database so they survive restarts')
+    args = parser.parse_args()
+    
+    if not os.path.exists('fast_food.db'):
+        print("Error: Database file not found. Run create_database.py first.")
+        exit(1)
+    
+    serve(args.host, args.port, cache_size=args.cache_size, persist_cache=args.persist_cache)
+
+if __name__ == "__main__":
+    main()
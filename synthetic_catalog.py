@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Generate large synthetic menus that follow the nutrient distribution of the real ones."""
+import argparse
+import csv
+import os
+import time
+from statistics import NormalDist
+
+import numpy as np
+
+from create_database import BATCH_SIZE, COLUMNS, CSV_SOURCE, build_database, load_rows, menu_files
+
+# Rounding steps tried, coarsest first, when matching a column's precision
+STEPS = [1.0, 0.5, 0.1, 0.01]
+
+# Grid the standard normal CDF is tabulated on; np.interp over it maps millions
+# of correlated normals to uniforms without a per-value call
+NORMAL_GRID = np.linspace(-9, 9, 4097)
+NORMAL_CDF = np.array([NormalDist().cdf(x) for x in NORMAL_GRID])
+
+def value_step(values):
+    """The coarsest of STEPS that every value is a multiple of."""
+    for step in STEPS:
+        if np.allclose(values / step, np.round(values / step)):
+            return step
+    return STEPS[-1]
+
+def nearest_correlation(matrix):
+    """The matrix with negative eigenvalues clipped and its diagonal reset to 1, so it is a valid correlation."""
+    eigenvalues, eigenvectors = np.linalg.eigh(matrix)
+    matrix = eigenvectors @ np.diag(np.clip(eigenvalues, 1e-6, None)) @ eigenvectors.T
+    scale = np.sqrt(np.diag(matrix))
+    return matrix / np.outer(scale, scale)
+
+class CatalogModel:
+    """A Gaussian copula over the numeric columns of a menu, with its NULL patterns.
+    
+    Each column keeps its sorted real values as its marginal, so samples never
+    leave the observed range, and the copula's correlation of normal scores
+    keeps the joint shape (calories rising with fat, protein with sodium). Which
+    columns are NULL is drawn from the patterns of real rows, since chains leave
+    whole columns out together.
+    """
+    
+    def __init__(self, marginals, steps, correlation, null_patterns, names):
+        self.marginals = marginals
+        self.steps = steps
+        self.correlation = correlation
+        self.null_patterns = null_patterns
+        self.names = names
+        self._cholesky = np.linalg.cholesky(correlation)
+    
+    @classmethod
+    def fit(cls, rows):
+        """Fit the model to cleaned rows in COLUMNS order (as create_database.load_rows yields)."""
+        matrix = np.array([[np.nan if value is None else value for value in row[2:]] for row in rows],
+                          dtype=np.float64)
+        present = ~np.isnan(matrix)
+        if not present.any(axis=0).all():
+            raise ValueError("Every numeric column needs at least one value to fit")
+    
+        # Normal scores: each present value replaced by the standard normal quantile of its rank
+        scores = np.full(matrix.shape, np.nan)
+        marginals = []
+        steps = []
+        for column in range(matrix.shape[1]):
+            rows_present = np.flatnonzero(present[:, column])
+            values = matrix[rows_present, column]
+            ranks = np.argsort(np.argsort(values, kind='stable'), kind='stable')
+            scores[rows_present, column] = [NormalDist().inv_cdf((rank + 0.5) / len(values)) for rank in ranks]
+            marginals.append(np.sort(values))
+            steps.append(value_step(values))
+    
+        # Pairwise over the rows where both columns are present
+        width = matrix.shape[1]
+        correlation = np.eye(width)
+        for a in range(width):
+            for b in range(a + 1, width):
+                both = present[:, a] & present[:, b]
+                if both.sum() > 2 and scores[both, a].std() > 0 and scores[both, b].std() > 0:
+                    correlation[a, b] = correlation[b, a] = np.corrcoef(scores[both, a], scores[both, b])[0, 1]
+    
+        names = sorted({row[1] for row in rows if row[1]})
+        return cls(marginals, steps, nearest_correlation(correlation), ~present, names)
+    
+    def sample(self, n, rng):
+        """n rows of numeric columns as a float64 matrix, NaN for NULL."""
+        normals = rng.standard_normal((n, len(self.marginals))) @ self._cholesky.T
+        uniforms = np.interp(normals, NORMAL_GRID, NORMAL_CDF)
+        matrix = np.empty_like(uniforms)
+        for column, (values, step) in enumerate(zip(self.marginals, self.steps)):
+            positions = uniforms[:, column] * len(values) - 0.5
+            sampled = np.interp(positions, np.arange(len(values)), values)
+            matrix[:, column] = np.round(sampled / step) * step
+        matrix[self.null_patterns[rng.integers(len(self.null_patterns), size=n)]] = np.nan
+        return matrix
+
+def company_names(count):
+    width = len(str(count))
+    return [f"Synthetic Chain {number:0{width}d}" for number in range(1, count + 1)]
+
+def generate_rows(model, row_count, company_count=10, seed=0, batch_size=BATCH_SIZE):
+    """Stream row_count synthetic rows in COLUMNS order, split evenly across company_count chains.
+    
+    Item names are real ones with a per-chain serial number, so every (company,
+    item) is unique. The same seed gives the same rows.
+    """
+    rng = np.random.default_rng(seed)
+    companies = company_names(company_count)
+    integer_columns = [column for column, step in enumerate(model.steps) if step == 1.0]
+    serials = [0] * company_count
+    for start in range(0, row_count, batch_size):
+        n = min(batch_size, row_count - start)
+        matrix = model.sample(n, rng)
+        name_indexes = rng.integers(len(model.names), size=n).tolist()
+        # Consecutive rows go to consecutive chains, so each chain gets an even share
+        for offset, values in enumerate(matrix.tolist()):
+            company = (start + offset) % company_count
+            serials[company] += 1
+            row = [None if value != value else value for value in values]
+            for column in integer_columns:
+                if row[column] is not None:
+                    row[column] = int(row[column])
+            yield [companies[company], f"{model.names[name_indexes[offset]]} #{serials[company]}"] + row
+
+def write_csv(rows, path):
+    """Write rows as a menu CSV that create_database.py can load, returning the row count."""
+    count = 0
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(COLUMNS)
+        for row in rows:
+            writer.writerow(['' if value is None else value for value in row])
+            count += 1
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic menu fitted to the real menu CSVs')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Rows to generate (default: 1000000)')
+    parser.add_argument('--companies', type=int, default=10, help='Synthetic chains to spread them across (default: 10)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--source', default=CSV_SOURCE,
+                        help=f'Menu CSV, directory of CSVs or glob to fit (default: {CSV_SOURCE})')
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument('--csv', help='Write a menu CSV to this path')
+    output.add_argument('--db', help='Build a database at this path through the bulk loader')
+    args = parser.parse_args()
+    
+    if args.rows < 1 or args.companies < 1:
+        print("Error: --rows and --companies must be at least 1.")
+        exit(1)
+    if not menu_files(args.source):
+        print(f"Error: No menu CSV files match {args.source}")
+        exit(1)
+    
+    model = CatalogModel.fit(list(load_rows(args.source)))
+    rows = generate_rows(model, args.rows, args.companies, args.seed)
+    if args.db:
+        build_database(rows, args.db)
+        return
+    
+    start = time.perf_counter()
+    count = write_csv(rows, args.csv)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {count} rows to {args.csv} in {elapsed:.2f} s ({count / elapsed:,.0f} rows/s, "
+          f"{os.path.getsize(args.csv) / 2**20:.1f} MiB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import os
+import random
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from create_database import COLUMNS, CSV_SOURCE, build_database, create_database
+
+def catalog_rows(count=60, seed=7):
+    """Menu rows in COLUMNS order for a few made-up chains, with some blank nutrients."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        row = [f'Chain {i % 3}', f'Item {i}']
+        for column in COLUMNS[2:]:
+            if column != 'calories' and rng.random() < 0.05:
+                row.append(None)
+            elif column == 'calories':
+                row.append(float(rng.randrange(10, 1200, 10)))
+            else:
+                row.append(float(rng.randrange(0, 80)))
+        rows.append(row)
+    return rows
+
+@pytest.fixture(scope='session')
+def catalog_db(tmp_path_factory):
+    """Path of a small database built from catalog_rows, shared by every test that only reads it."""
+    path = str(tmp_path_factory.mktemp('catalog') / 'catalog.db')
+    build_database(catalog_rows(), path)
+    return path
+
+@pytest.fixture(scope='session')
+def menu_db(tmp_path_factory):
+    """Path of a database built from the menu CSVs in the repository, for cases taken from the real data."""
+    path = str(tmp_path_factory.mktemp('menu') / 'menu.db')
+    create_database(os.path.join(ROOT, CSV_SOURCE), path)
+    return path
+
+@pytest.fixture
+def catalog_copy(catalog_db, tmp_path):
+    """A private copy of catalog_db for tests that write to it."""
+    path = str(tmp_path / 'catalog.db')
+    shutil.copy(catalog_db, path)
+    return path
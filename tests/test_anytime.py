@@ -0,0 +1,74 @@
+import pytest
+
+import ilp_model
+from item_store import ItemStore
+from knapsack import Deadline, greedy_selection, ilp_max_calories
+from nutrition_cli import print_quality
+from optimizer import ilp_available, optimize
+
+needs_ilp = pytest.mark.skipif(not ilp_available(), reason='needs highspy or PuLP')
+
+@pytest.fixture
+def solver_times_out(monkeypatch):
+    """Make every ILP solve stop at its deadline before finding a selection of its own."""
+    def solve(self, bounds=None, item_limit=None, objective=None, deadline=None, start=None):
+        if objective is not None:
+            self._objective = list(objective)
+        deadline.hit = True
+        return None
+    monkeypatch.setattr(ilp_model.SelectionModel, 'solve', solve)
+
+@needs_ilp
+def test_a_timed_out_query_returns_the_greedy_start(catalog_db, solver_times_out):
+    items = ItemStore(catalog_db).items('max-calories')
+    deadline = Deadline(1000)
+    selected = ilp_max_calories(items, 60, 3, deadline)
+    
+    assert deadline.hit
+    assert 0 < len(selected) <= 3
+    assert sum(item[2] for item in selected) >= 60
+
+@needs_ilp
+def test_a_timed_out_optimize_returns_the_greedy_start(solver_times_out):
+    rows = [(i, f'Item {i}', 'Chain', float(10 + i), float(100 * (i % 5) + 50), float(i % 4)) for i in range(20)]
+    columns = ['protein', 'calories', 'fiber']
+    selected, algorithm, _, deadline = optimize(rows, columns, 'protein', minimums={'fiber': 6},
+                                                maximums={'calories': 900}, item_limit=4, algorithm='ilp',
+                                                deadline=Deadline(1000))
+    
+    assert algorithm == 'ilp' and deadline.hit
+    assert 0 < len(selected) <= 4
+    assert sum(row[5] for row in selected) >= 6
+    assert sum(row[4] for row in selected) <= 900
+
+@needs_ilp
+def test_a_timed_out_minimize_with_a_tight_maximum_still_answers(menu_db, solver_times_out):
+    # optimize sodium --minimize --min protein=100 --max calories=1500: items without
+    # sodium but with little protein once used up the calories before protein reached 100
+    columns = ['sodium', 'protein', 'calories']
+    rows = ItemStore(menu_db).rows(columns)
+    selected, _, _, deadline = optimize(rows, columns, 'sodium', minimums={'protein': 100},
+                                        maximums={'calories': 1500}, minimize=True, algorithm='ilp',
+                                        deadline=Deadline(1000))
+    
+    assert deadline.hit and selected
+    assert sum(row[4] for row in selected) >= 100
+    assert sum(row[5] for row in selected) <= 1500
+
+def test_greedy_covers_minimums_within_the_room_left(menu_db):
+    columns = ['sodium', 'protein', 'calories']
+    rows = ItemStore(menu_db).rows(columns)
+    protein = [row[4] for row in rows]
+    calories = [row[5] for row in rows]
+    selected = greedy_selection([-row[3] for row in rows], None, [(protein, 100)], [(calories, 1500)])
+    
+    assert selected is not None
+    assert sum(protein[i] for i in selected) >= 100
+    assert sum(calories[i] for i in selected) <= 1500
+
+@pytest.mark.parametrize('minimize, side, direction', [(False, 'upper', 'below'), (True, 'lower', 'above')])
+def test_the_bound_is_named_by_the_objective_sense(capsys, minimize, side, direction):
+    print_quality((0.25, 100.0, True), minimize=minimize)
+    assert f'the {side} bound 100.00' in capsys.readouterr().out
+    print_quality((0.25, 100.0, False), minimize=minimize)
+    assert f'25.0% {direction} the best possible' in capsys.readouterr().out
@@ -0,0 +1,87 @@
+import io
+
+import pytest
+
+from batch import read_requests, solve_batch
+from item_store import ItemStore
+from parallel import ParallelSolver
+
+JSONL = '''{"id": "a", "command": "max-fat", "limit": 20, "items": 2}
+not json
+
+{"command": "max-fat",
+[1, 2]
+{"id": "b", "command": "max-protein", "limit": "lots"}
+{"id": "c", "command": "max-fat", "limit": 20, "algorithm": "greedy"}
+{"id": "d", "command": "max-protein", "limit": 800, "items": 3}
+'''
+
+@pytest.fixture(scope='module')
+def store(catalog_db):
+    return ItemStore(catalog_db)
+
+def test_malformed_lines_do_not_stop_the_batch(store):
+    requests = read_requests(io.StringIO(JSONL))
+    responses = dict(solve_batch(store, requests))
+    
+    assert len(responses) == len(requests) == 7
+    assert set(responses[1]) == {'line', 'error'} and responses[1]['line'] == 2
+    assert responses[2]['line'] == 4
+    assert 'line' not in responses[3] and responses[3]['error']
+    assert responses[4]['id'] == 'b' and responses[4]['error']
+    assert responses[5]['id'] == 'c' and 'greedy' in responses[5]['error']
+    for index, key in [(0, 'a'), (6, 'd')]:
+        assert responses[index]['id'] == key
+        assert 'error' not in responses[index] and responses[index]['items']
+
+WRONG_KINDS = '''{"id": 1, "command": "max-protein", "limit": 1000, "company": 5}
+{"id": 2, "command": ["max-fat"], "limit": 20}
+{"id": 3, "command": "max-fat", "limit": 20, "items": 2, "company": "chain 1"}
+{"id": 4, "command": "max-fat", "limit": 20, "company": ["Chain 1"]}
+{"id": 5, "command": "max-fat", "limit": {"calories": 20}}
+{"id": 6, "command": "max-fat", "limit": 20, "algorithm": ["auto"]}
+{"id": 7, "command": "max-protein", "limit": 800, "items": 3, "company": "Chain 2"}
+'''
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_fields_of_the_wrong_kind_fail_their_own_request(store, workers):
+    requests = read_requests(io.StringIO(WRONG_KINDS))
+    if workers:
+        with ParallelSolver(store, workers=workers) as solver:
+            responses = dict(solver.solve(requests))
+    else:
+        responses = dict(solve_batch(store, requests))
+    
+    assert len(responses) == 7
+    assert "'company'" in responses[0]['error'] and "'company'" in responses[3]['error']
+    for index in (1, 4, 5):
+        assert responses[index]['error']
+    for index in (2, 6):
+        assert 'error' not in responses[index] and responses[index]['items']
+    assert [responses[index]['id'] for index in range(7)] == list(range(1, 8))
+
+def test_csv_cells_that_do_not_parse_fail_their_own_request(store):
+    text = 'id,command,limit,items\nx,max-fat,20,2\ny,max-fat,twenty,2\n'
+    responses = dict(solve_batch(store, read_requests(io.StringIO(text), 'csv')))
+    assert 'error' not in responses[0]
+    assert responses[1]['id'] == 'y' and responses[1]['error']
+
+def test_csv_cells_of_the_wrong_kind_get_a_clear_error(store):
+    text = 'id,command,limit,items\nx,max-protein,1500.5,2\ny,max-fat,20,2.5\n'
+    responses = dict(solve_batch(store, read_requests(io.StringIO(text), 'csv')))
+    assert 'whole number of calories' in responses[0]['error']
+    assert "'items'" in responses[1]['error']
+
+def test_workers_answer_like_a_serial_run(store):
+    requests = read_requests(io.StringIO(JSONL))
+    serial = dict(solve_batch(store, requests))
+    with ParallelSolver(store, workers=2) as solver:
+        parallel = dict(solver.solve(requests))
+    
+    assert parallel.keys() == serial.keys()
+    for index, response in serial.items():
+        other = parallel[index]
+        if 'error' in response:
+            assert other == response
+        else:
+            assert other['items'] == response['items']
@@ -0,0 +1,212 @@
+import argparse
+import csv
+import os
+import sqlite3
+
+import numpy as np
+import pytest
+
+from create_database import build_database, create_database, load_rows, refresh_database
+from item_store import ItemStore
+from nutrition_cli import explain
+from result_cache import ResultCache, data_version
+from search import ensure_item_search
+from snapshot import read_snapshot, snapshot_path
+
+HEADER = ['Company', 'Item', 'Calories', 'Total Fat\n(g)', 'Carbs (g)', 'Protein (g)']
+
+def write_menu(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+
+def contents(db_path):
+    """Every item row without its id, the stored group hashes and the company list, in a fixed order."""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('SELECT company, item, calories, total_fat, carbs, protein FROM fast_food_items')
+    items = sorted(cursor.fetchall(), key=repr)
+    cursor.execute('SELECT company, item, hash FROM row_hashes')
+    hashes = sorted(cursor.fetchall(), key=repr)
+    cursor.execute('SELECT name FROM companies')
+    companies = sorted(row[0] for row in cursor.fetchall())
+    conn.close()
+    return items, hashes, companies
+
+def version(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return data_version(conn)
+    finally:
+        conn.close()
+
+MENU = [
+    ['KFC', 'Breast', '390', '21', '11', '39'],
+    ['KFC', 'Wing', '130', '8', '3', '10'],
+    ['KFC', 'Wing', '140', '9', '3', '10'],
+    ["Wendy's", 'Chili', '250', '7', '23', '17'],
+    ["Wendy's", 'Fries', '<420', '20', '', '5'],
+    ['Taco Bell', 'Taco', '170', '10', '13', '8'],
+]
+
+def test_refresh_matches_a_full_build(tmp_path):
+    source = str(tmp_path / 'menu.csv')
+    db_path = str(tmp_path / 'refreshed.db')
+    write_menu(source, MENU)
+    create_database(source, db_path)
+    before = version(db_path)
+    
+    # One changed item, one item with a row fewer, a new item and a chain that leaves
+    write_menu(source, [
+        ['KFC', 'Breast', '400', '21', '11', '40'],
+        ['KFC', 'Wing', '130', '8', '3', '10'],
+        ["Wendy's", 'Chili', '250', '7', '23', '17'],
+        ["Wendy's", 'Fries', '<420', '20', '', '5'],
+        ["Wendy's", 'Baked Potato', '270', '0', '61', '7'],
+    ])
+    refresh_database(source, db_path)
+    
+    rebuilt = str(tmp_path / 'rebuilt.db')
+    create_database(source, rebuilt)
+    assert contents(db_path) == contents(rebuilt)
+    assert version(db_path) != before
+
+def test_refresh_without_changes_keeps_the_data_version(tmp_path):
+    source = str(tmp_path / 'menu.csv')
+    db_path = str(tmp_path / 'menu.db')
+    write_menu(source, MENU)
+    create_database(source, db_path)
+    before = contents(db_path), version(db_path)
+    
+    refresh_database(source, db_path)
+    assert (contents(db_path), version(db_path)) == before
+
+def test_refresh_drops_results_cached_for_the_old_data(tmp_path):
+    source = str(tmp_path / 'menu.csv')
+    db_path = str(tmp_path / 'menu.db')
+    write_menu(source, MENU)
+    create_database(source, db_path)
+    store = ItemStore(db_path)
+    ResultCache(db_path=db_path).solve('max-protein', 'dp', store.items('max-protein'), 500, 2, None,
+                                       store.data_version)
+    
+    write_menu(source, MENU[1:])
+    refresh_database(source, db_path)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('SELECT count(*) FROM result_cache').fetchone() == (0,)
+    conn.close()
+
+def test_refresh_writes_a_fresh_snapshot(tmp_path):
+    source = str(tmp_path / 'menu.csv')
+    db_path = str(tmp_path / 'menu.db')
+    write_menu(source, MENU)
+    create_database(source, db_path)
+    
+    write_menu(source, MENU[1:] + [['KFC', 'Potato Wedges', '290', '15', '35', '5']])
+    refresh_database(source, db_path)
+    
+    matrix, names, _, snapshot_version = read_snapshot(snapshot_path(db_path))
+    assert snapshot_version == version(db_path)
+    assert sorted(names) == sorted([row[1] for row in MENU[1:]] + ['Potato Wedges'])
+    np.testing.assert_array_equal(matrix, ItemStore(db_path).matrix)
+
+def test_readers_keep_the_old_menu_during_a_refresh(tmp_path):
+    source = str(tmp_path / 'menu.csv')
+    db_path = str(tmp_path / 'menu.db')
+    write_menu(source, MENU)
+    create_database(source, db_path)
+    
+    # A reader in the middle of a transaction neither blocks the refresh nor sees it
+    reader = sqlite3.connect(db_path)
+    reader.execute('BEGIN')
+    reader.execute('SELECT count(*) FROM fast_food_items').fetchone()
+    write_menu(source, MENU[:2])
+    refresh_database(source, db_path)
+    assert reader.execute('SELECT count(*) FROM fast_food_items').fetchone()[0] == len(MENU)
+    reader.close()
+    
+    assert len(contents(db_path)[0]) == 2
+
+def test_a_failed_build_keeps_the_old_database_and_leaves_no_build_file(tmp_path):
+    source = str(tmp_path / 'menu.csv')
+    db_path = str(tmp_path / 'menu.db')
+    write_menu(source, MENU)
+    create_database(source, db_path)
+    before = contents(db_path)
+    
+    def rows():
+        yield from load_rows(source)
+        raise OSError('menu export cut off')
+    
+    with pytest.raises(OSError):
+        build_database(rows(), db_path)
+    assert contents(db_path) == before
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.build')]
+
+def test_refresh_builds_a_missing_database(tmp_path):
+    source = str(tmp_path / 'menu.csv')
+    write_menu(source, MENU)
+    refresh_database(source, str(tmp_path / 'new.db'))
+    create_database(source, str(tmp_path / 'full.db'))
+    assert contents(str(tmp_path / 'new.db')) == contents(str(tmp_path / 'full.db'))
+
+def test_refresh_keeps_a_built_search_index_current(tmp_path):
+    source = str(tmp_path / 'menu.csv')
+    db_path = str(tmp_path / 'menu.db')
+    write_menu(source, MENU)
+    create_database(source, db_path)
+    conn = sqlite3.connect(db_path)
+    assert ensure_item_search(conn)
+    conn.close()
+    
+    write_menu(source, MENU[:4] + [['KFC', 'Potato Wedges', '290', '15', '35', '5']])
+    refresh_database(source, db_path)
+    
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT item FROM item_search WHERE item_search MATCH 'ota' ORDER BY item")
+    assert [row[0] for row in cursor.fetchall()] == ['Potato Wedges']
+    cursor.execute("SELECT count(*) FROM item_search WHERE item_search MATCH 'ries'")
+    assert cursor.fetchone()[0] == 0
+    conn.close()
+
+@pytest.mark.parametrize('cpus', [1, 2])
+def test_later_menu_versions_own_their_items(tmp_path, monkeypatch, cpus):
+    # Two CPUs parse the files in worker processes
+    monkeypatch.setattr(os, 'cpu_count', lambda: cpus)
+    write_menu(str(tmp_path / 'MenuV2.csv'), MENU)
+    write_menu(str(tmp_path / 'MenuV10.csv'), [
+        ['KFC', 'Wing', '150', '9', '4', '11'],
+        ['Arby\'s', 'Roast Beef', '360', '14', '37', '23'],
+    ])
+    
+    rows = [tuple(row[:3]) + (row[-2],) for row in load_rows(str(tmp_path))]
+    # Version 2's rows first, less the Wing rows that version 10 replaces, in file order
+    assert rows == [
+        ('KFC', 'Breast', 390.0, 39.0),
+        ("Wendy's", 'Chili', 250.0, 17.0),
+        ("Wendy's", 'Fries', 420.0, 5.0),
+        ('Taco Bell', 'Taco', 170.0, 8.0),
+        ('KFC', 'Wing', 150.0, 11.0),
+        ("Arby's", 'Roast Beef', 360.0, 23.0),
+    ]
+
+def test_filtered_statements_are_served_by_the_item_index(catalog_copy, monkeypatch, capsys):
+    monkeypatch.chdir(os.path.dirname(catalog_copy))
+    os.rename(catalog_copy, 'fast_food.db')
+    for company in (None, 'chain 1'):
+        explain(argparse.Namespace(company=company, search='tem 1', repeat=1))
+        output = capsys.readouterr().out
+        assert 'idx_company_item' in output
+        assert 'table scan' not in output
+        assert output.rstrip().endswith('Every filtered statement is served by an index.')
+
+def test_ratio_columns_are_generated(catalog_db):
+    conn = sqlite3.connect(catalog_db)
+    rows = conn.execute('SELECT protein, calories, calories_from_fat, protein_per_calorie, fat_calorie_share '
+                        'FROM fast_food_items').fetchall()
+    conn.close()
+    for protein, calories, calories_from_fat, per_calorie, fat_share in rows:
+        assert per_calorie == (None if protein is None else pytest.approx(protein / calories))
+        assert fat_share == (None if calories_from_fat is None else pytest.approx(calories_from_fat / calories))
@@ -0,0 +1,67 @@
+import csv
+import gzip
+import json
+import sqlite3
+
+import numpy as np
+import pytest
+
+from dump_database import dump_database, infer_format
+
+@pytest.mark.parametrize('name, expected', [
+    ('menu.csv', ('csv', None)),
+    ('menu.jsonl.gz', ('jsonl', 'gzip')),
+    ('menu.npz', ('npz', None)),
+    ('menu.feather.xz', ('arrow', 'xz')),
+    ('menu.CSV.bz2', ('csv', 'bz2')),
+    ('menu', ('csv', None)),
+])
+def test_formats_are_inferred_from_the_file_name(name, expected):
+    assert infer_format(name) == expected
+
+def stored_rows(db_path, columns, where=''):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(f'SELECT {", ".join(columns)} FROM fast_food_items{where} ORDER BY id').fetchall()
+    conn.close()
+    return rows
+
+def test_csv_and_jsonl_dumps_hold_every_row(catalog_db, tmp_path):
+    columns = ['company', 'item', 'calories', 'protein']
+    expected = stored_rows(catalog_db, columns)
+    
+    path = str(tmp_path / 'out' / 'menu.csv.gz')
+    assert dump_database(path, columns=columns, batch_size=7, db_path=catalog_db) == len(expected)
+    with gzip.open(path, 'rt', encoding='utf-8', newline='') as file:
+        lines = list(csv.reader(file))
+    assert lines[0] == columns
+    assert lines[1:] == [['' if value is None else str(value) for value in row] for row in expected]
+    
+    path = str(tmp_path / 'menu.jsonl')
+    assert dump_database(path, columns=columns, db_path=catalog_db) == len(expected)
+    with open(path, encoding='utf-8') as file:
+        assert [tuple(json.loads(line).values()) for line in file] == expected
+
+def test_npz_dumps_load_with_numpy(catalog_db, tmp_path):
+    columns = ['id', 'item', 'total_fat']
+    expected = stored_rows(catalog_db, columns, " WHERE company = 'Chain 2'")
+    
+    path = str(tmp_path / 'menu.npz')
+    assert dump_database(path, fmt='npz', compression='gzip', columns=columns, company='chain 2', batch_size=5,
+                         db_path=catalog_db) == len(expected)
+    with np.load(path) as arrays:
+        assert arrays['id'].tolist() == [row[0] for row in expected]
+        assert arrays['item'].astype(str).tolist() == [row[1] for row in expected]
+        np.testing.assert_array_equal(arrays['total_fat'],
+                                      [np.nan if row[2] is None else row[2] for row in expected])
+
+@pytest.mark.parametrize('name, fmt', [('menu.npz.xz', None), ('menu.gz', 'npz')])
+def test_npz_names_with_a_compression_suffix_are_rejected(catalog_db, tmp_path, name, fmt):
+    path = tmp_path / name
+    with pytest.raises(ValueError, match='--compression'):
+        dump_database(str(path), fmt=fmt, db_path=catalog_db)
+    assert not path.exists()
+
+def test_unknown_columns_and_companies(catalog_db, tmp_path):
+    with pytest.raises(ValueError, match='Unknown columns: kale'):
+        dump_database(str(tmp_path / 'menu.csv'), columns=['item', 'kale'], db_path=catalog_db)
+    assert dump_database(str(tmp_path / 'menu.csv'), company='no such chain', db_path=catalog_db) == 0
@@ -0,0 +1,83 @@
+import itertools
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+import ilp_model
+from ilp_model import SelectionModel
+from knapsack import greedy_selection, ilp_max_protein, knapsack_max_protein
+
+def brute_force(values, rows, bounds, item_limit=None):
+    best = None
+    n = len(values)
+    for size in range(min(n, item_limit or n) + 1):
+        for subset in itertools.combinations(range(n), size):
+            if all((lower is None or sum(rows[name][i] for i in subset) >= lower) and
+                   (upper is None or sum(rows[name][i] for i in subset) <= upper)
+                   for name, (lower, upper) in bounds.items()):
+                value = sum(values[i] for i in subset)
+                best = value if best is None else max(best, value)
+    return best
+
+@pytest.mark.parametrize('backend', ['highs', 'cbc'])
+@pytest.mark.parametrize('seed', range(12))
+def test_a_start_does_not_cut_off_the_optimum(monkeypatch, backend, seed):
+    highspy, pulp = ilp_model.load_backends()
+    if (backend == 'highs' and highspy is None) or (backend == 'cbc' and pulp is None):
+        pytest.skip(f'{backend} is not installed')
+    monkeypatch.setattr(ilp_model, 'choose_backend', lambda packing=False: backend)
+    rng = random.Random(seed)
+    n = 12
+    # Minimizing sodium in multiples of 5, which lets CBC raise its cutoff increment
+    values = [-5.0 * rng.randrange(0, 80) for _ in range(n)]
+    rows = {'protein': [float(rng.randrange(0, 40)) for _ in range(n)],
+            'calories': [float(rng.randrange(10, 600)) for _ in range(n)]}
+    bounds = {'protein': (rng.randrange(30, 90), None), 'calories': (None, rng.randrange(600, 1500))}
+    expected = brute_force(values, rows, bounds)
+    start = greedy_selection(values, None, [(rows['protein'], bounds['protein'][0])],
+                             [(rows['calories'], bounds['calories'][1])])
+    if start is None or expected is None:
+        pytest.skip('no feasible start')
+    
+    model = SelectionModel(values, rows, packing=True)
+    assert model.backend == backend
+    selected = model.solve(bounds, start=start)
+    assert sum(values[i] for i in selected) == pytest.approx(expected)
+    # A re-solve starting from that answer keeps it
+    selected = model.solve(bounds)
+    assert sum(values[i] for i in selected) == pytest.approx(expected)
+
+def test_solver_modules_are_imported_only_to_build_a_model():
+    code = ("import sys, ilp_model, nutrition_cli; ilp_model.backend_available(); "
+            "print(sorted({'highspy', 'pulp'} & set(sys.modules)))")
+    result = subprocess.run([sys.executable, '-c', code], cwd=os.path.dirname(os.path.dirname(__file__)) or '.',
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == '[]'
+
+@pytest.mark.parametrize('change', ['append', 'overwrite'])
+def test_a_list_changed_in_place_gets_a_new_model(change):
+    if not ilp_model.backend_available():
+        pytest.skip('no ILP backend is installed')
+    items = [(1, 100, 10.0, 'a', 'x'), (2, 200, 30.0, 'b', 'x')]
+    assert ilp_max_protein(items, 250) == [(2, 200, 30.0, 'b', 'x')]
+    
+    if change == 'append':
+        items.append((3, 50, 50.0, 'c', 'x'))
+    else:
+        items[0] = (3, 50, 50.0, 'c', 'x')
+    assert sorted(ilp_max_protein(items, 250)) == sorted(knapsack_max_protein(items, 250)) == \
+        [(2, 200, 30.0, 'b', 'x'), (3, 50, 50.0, 'c', 'x')]
+
+def test_tuples_of_items_reuse_their_model():
+    if not ilp_model.backend_available():
+        pytest.skip('no ILP backend is installed')
+    items = ((1, 100, 10.0, 'a', 'x'), (2, 200, 30.0, 'b', 'x'), (3, 50, 50.0, 'c', 'x'))
+    ilp_model.MODELS.clear()
+    ilp_max_protein(items, 250)
+    built = ilp_model.MODELS.model('max-protein', items, lambda: None)
+    assert built is not None
+    assert ilp_max_protein(items, 140) == [(3, 50, 50.0, 'c', 'x')]
+    assert ilp_model.MODELS.model('max-protein', items, lambda: None) is built
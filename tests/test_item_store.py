@@ -0,0 +1,33 @@
+import sqlite3
+
+from item_store import ItemStore
+from queries import QUERIES
+
+def test_company_views_match_filtering_every_row(catalog_db):
+    store = ItemStore(catalog_db)
+    for command in QUERIES:
+        everything = store.items(command)
+        for company in ['Chain 1', 'chain 2']:
+            expected = [row for row in everything if row[4].lower() == company.lower()]
+            assert list(store.items(command, company)) == expected
+    assert store.items('max-protein', 'No Such Chain') == ()
+
+def test_rows_match_sqlite(catalog_db):
+    store = ItemStore(catalog_db)
+    columns = QUERIES['max-carbs']['columns']
+    conn = sqlite3.connect(catalog_db)
+    expected = conn.execute(f"SELECT {', '.join(columns)} FROM fast_food_items "
+                            "WHERE protein IS NOT NULL AND carbs IS NOT NULL AND protein > 0 ORDER BY id").fetchall()
+    conn.close()
+    
+    rows = store.items('max-carbs')
+    assert list(rows) == expected
+    assert [tuple(map(type, row)) for row in rows] == [tuple(map(type, row)) for row in expected]
+
+def test_rows_are_cached_per_resolved_company_not_per_spelling(catalog_db):
+    store = ItemStore(catalog_db)
+    spellings = ['Chain 1', 'chain 1', 'CHAIN  1', 'Chain-1', 'chian 1'] + [f'no such chain {i}' for i in range(50)]
+    for company in spellings:
+        store.items('max-protein', company)
+    assert store.items('max-protein', 'chain 1') is store.items('max-protein', 'Chain 1')
+    assert len(store._rows) == 2
@@ -0,0 +1,217 @@
+import itertools
+import random
+
+import pytest
+
+from knapsack import (MITM_MAX_ITEMS, Deadline, branch_and_bound_max, fptas_max_calories, fptas_max_protein,
+                      knapsack_dp_backtrack, knapsack_dp_backtrack_many, knapsack_dp_limited_backtrack,
+                      knapsack_dp_limited_table, knapsack_dp_table, knapsack_max_calories, knapsack_max_fat,
+                      knapsack_max_protein, mitm_max_calories, mitm_max_carbs)
+
+def random_items(rng, n):
+    """Rows shaped like the max-fat query's: (id, calories, protein, item, company, total_fat)."""
+    return [(i, rng.randrange(10, 900), float(rng.randrange(1, 40)), f'Item {i}', 'Chain',
+             float(rng.randrange(0, 50))) for i in range(n)]
+
+def best_total(items, value_index, protein_min, item_limit):
+    """Brute-force best value total with at least protein_min protein, or None if nothing qualifies."""
+    best = None
+    for size in range(min(len(items), item_limit or len(items)) + 1):
+        for subset in itertools.combinations(items, size):
+            if sum(item[2] for item in subset) >= protein_min:
+                value = sum(item[value_index] for item in subset)
+                best = value if best is None else max(best, value)
+    return best
+
+def check(selected, expected, value_index, protein_min, item_limit):
+    if expected is None:
+        assert selected == []
+        return
+    assert sum(item[value_index] for item in selected) == pytest.approx(expected)
+    assert sum(item[2] for item in selected) >= protein_min
+    assert item_limit is None or len(selected) <= item_limit
+
+@pytest.mark.parametrize('seed', range(10))
+def test_branch_and_bound_matches_brute_force(seed):
+    rng = random.Random(seed)
+    items = random_items(rng, 10)
+    protein_min = rng.randrange(10, 120)
+    item_limit = rng.choice([None, 2, 3, 5])
+    
+    check(knapsack_max_calories(items, protein_min, item_limit), best_total(items, 1, protein_min, item_limit),
+          1, protein_min, item_limit)
+    check(knapsack_max_fat(items, protein_min, item_limit), best_total(items, 5, protein_min, item_limit),
+          5, protein_min, item_limit)
+
+@pytest.mark.parametrize('seed', range(10))
+def test_branch_and_bound_max_with_mixed_signs(seed):
+    rng = random.Random(seed)
+    n = 9
+    values = [rng.uniform(-10, 30) for _ in range(n)]
+    covers = [rng.uniform(0, 20) for _ in range(n)]
+    packs = [rng.choice([0.0, rng.uniform(0, 400)]) for _ in range(n)]
+    cover_min, pack_max = rng.uniform(5, 50), rng.uniform(200, 1200)
+    item_limit = rng.choice([None, 3, 4])
+    
+    best = None
+    for size in range(min(n, item_limit or n) + 1):
+        for subset in itertools.combinations(range(n), size):
+            if sum(covers[i] for i in subset) >= cover_min and sum(packs[i] for i in subset) <= pack_max:
+                value = sum(values[i] for i in subset)
+                best = value if best is None else max(best, value)
+    
+    selected = branch_and_bound_max(values, item_limit, [(covers, cover_min)], [(packs, pack_max)])
+    if best is None:
+        assert not selected
+    else:
+        assert sum(values[i] for i in selected) == pytest.approx(best)
+        assert sum(covers[i] for i in selected) >= cover_min
+        assert sum(packs[i] for i in selected) <= pack_max + 1e-9
+
+def best_protein(items, calorie_limit, item_limit):
+    best = 0.0
+    for size in range(min(len(items), item_limit or len(items)) + 1):
+        for subset in itertools.combinations(items, size):
+            if sum(item[1] for item in subset) <= calorie_limit:
+                best = max(best, sum(item[2] for item in subset))
+    return best
+
+def baseline_max_protein(items, calorie_limit):
+    """The list-of-lists DP knapsack_max_protein replaced, kept as the reference for its selections."""
+    n = len(items)
+    dp = [[0 for _ in range(calorie_limit + 1)] for _ in range(n + 1)]
+    for i in range(1, n + 1):
+        calories, protein = int(items[i - 1][1]), items[i - 1][2]
+        for w in range(1, calorie_limit + 1):
+            if calories <= w:
+                dp[i][w] = max(dp[i - 1][w], dp[i - 1][w - calories] + protein)
+            else:
+                dp[i][w] = dp[i - 1][w]
+    
+    w = calorie_limit
+    selected_items = []
+    for i in range(n, 0, -1):
+        calories = int(items[i - 1][1])
+        if w >= calories and dp[i][w] != dp[i - 1][w]:
+            selected_items.append(items[i - 1])
+            w -= calories
+    return selected_items
+
+def protein_items(rng, n, weightless=False):
+    """Rows shaped like the max-protein query's; with weightless, about a third have no calories."""
+    def calories():
+        return 0 if weightless and rng.random() < 0.3 else rng.randrange(1, 400)
+    
+    return [(i, calories(), float(rng.randrange(0, 40)), f'Item {i}', 'Chain') for i in range(n)]
+
+@pytest.mark.parametrize('seed', range(40))
+def test_max_protein_selects_what_the_baseline_dp_selected(seed):
+    rng = random.Random(seed)
+    items = protein_items(rng, rng.randrange(1, 12), weightless=True)
+    calorie_limit = rng.choice([0, 1, rng.randrange(50, 1500)])
+    
+    selected = knapsack_max_protein(items, calorie_limit)
+    assert selected == baseline_max_protein(items, calorie_limit)
+    assert sum(item[1] for item in selected) <= calorie_limit
+    # Like the baseline, the DP only counts a weightless item while a calorie is left
+    # over; the max-protein query passes only calories > 0, where it is optimal
+    positive = [item for item in items if item[1] > 0]
+    assert sum(item[2] for item in knapsack_max_protein(positive, calorie_limit)) == \
+        best_protein(positive, calorie_limit, None)
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('item_limit', [1, 2, 4])
+def test_item_limited_max_protein_matches_brute_force(seed, item_limit):
+    rng = random.Random(seed)
+    items = protein_items(rng, rng.randrange(1, 11))
+    calorie_limit = rng.randrange(0, 1200)
+    
+    selected = knapsack_max_protein(items, calorie_limit, item_limit)
+    assert len(selected) <= item_limit
+    assert sum(item[1] for item in selected) <= calorie_limit
+    assert sum(item[2] for item in selected) == best_protein(items, calorie_limit, item_limit)
+    if item_limit >= len(items):
+        # An item limit the menu cannot reach is no limit: the plain DP answers
+        assert selected == knapsack_max_protein(items, calorie_limit)
+
+@pytest.mark.parametrize('seed', range(5))
+def test_one_limited_table_answers_every_smaller_budget_and_item_limit(seed):
+    rng = random.Random(seed)
+    items = protein_items(rng, 10)
+    weights = [item[1] for item in items]
+    _, keep = knapsack_dp_limited_table(weights, [item[2] for item in items], 1000, 4)
+    for budget in (0, 150, 400, 1000):
+        for item_limit in (1, 2, 4):
+            selected = [items[i] for i in knapsack_dp_limited_backtrack(weights, keep, budget, item_limit)]
+            assert len(selected) <= item_limit
+            assert sum(item[1] for item in selected) <= budget
+            assert sum(item[2] for item in selected) == best_protein(items, budget, item_limit)
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('epsilon', [0.01, 0.2])
+def test_fptas_max_protein_is_within_epsilon(seed, epsilon):
+    rng = random.Random(seed)
+    items = [item[:5] for item in random_items(rng, 10)]
+    # A few weightless items, which the fractional bound once left out
+    items += [(100 + i, 0, float(rng.randrange(1, 40)), f'Free {i}', 'Chain') for i in range(2)]
+    calorie_limit = rng.randrange(300, 2500)
+    item_limit = rng.choice([None, 2, 4])
+    
+    selected = fptas_max_protein(items, calorie_limit, item_limit, epsilon=epsilon)
+    assert sum(item[1] for item in selected) <= calorie_limit
+    assert item_limit is None or len(selected) <= item_limit
+    assert sum(item[2] for item in selected) >= (1 - epsilon) * best_protein(items, calorie_limit, item_limit) - 1e-9
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('epsilon', [0.01, 0.2])
+def test_fptas_max_calories_is_within_epsilon(seed, epsilon):
+    rng = random.Random(seed)
+    items = random_items(rng, 10)
+    protein_min = rng.randrange(10, 120)
+    item_limit = rng.choice([None, 3, 5])
+    expected = best_total(items, 1, protein_min, item_limit)
+    
+    selected = fptas_max_calories(items, protein_min, item_limit, epsilon=epsilon)
+    if expected is None:
+        assert selected == []
+        return
+    assert sum(item[2] for item in selected) >= protein_min
+    assert item_limit is None or len(selected) <= item_limit
+    assert sum(item[1] for item in selected) >= (1 - epsilon) * expected - 1e-9
+
+@pytest.mark.parametrize('seed', range(10))
+def test_mitm_matches_brute_force(seed):
+    rng = random.Random(seed)
+    items = random_items(rng, 11)
+    # max-carbs rows add carbs after total_fat
+    carb_items = [item + (float(rng.randrange(0, 90)),) for item in items]
+    protein_min = rng.randrange(10, 120)
+    item_limit = rng.randrange(1, MITM_MAX_ITEMS + 1)
+    
+    check(mitm_max_calories(items, protein_min, item_limit), best_total(items, 1, protein_min, item_limit),
+          1, protein_min, item_limit)
+    check(mitm_max_carbs(carb_items, protein_min, item_limit), best_total(carb_items, 6, protein_min, item_limit),
+          6, protein_min, item_limit)
+
+@pytest.mark.parametrize('seed', range(5))
+def test_mitm_past_its_deadline_keeps_a_feasible_answer(seed):
+    rng = random.Random(seed)
+    items = random_items(rng, 11)
+    protein_min = rng.randrange(10, 60)
+    deadline = Deadline(0)
+    selected = mitm_max_calories(items, protein_min, 3, deadline)
+    
+    assert deadline.hit and 0 < len(selected) <= 3
+    assert sum(item[2] for item in selected) >= protein_min
+    assert deadline.bound >= best_total(items, 1, protein_min, 3)
+
+@pytest.mark.parametrize('seed', range(5))
+def test_backtracking_many_budgets_matches_one_at_a_time(seed):
+    rng = random.Random(seed)
+    weights = [rng.randrange(0, 60) for _ in range(30)]
+    values = [float(rng.randrange(0, 40)) for _ in range(30)]
+    _, keep = knapsack_dp_table(weights, values, 500)
+    budgets = rng.sample(range(501), 40)
+    
+    assert knapsack_dp_backtrack_many(weights, keep, budgets) == \
+        [knapsack_dp_backtrack(weights, keep, budget) for budget in budgets]
@@ -0,0 +1,145 @@
+import itertools
+import random
+import time
+
+import pytest
+
+import optimizer
+from item_store import ItemStore
+from ilp_model import backend_available
+from knapsack import Deadline, greedy_selection
+from optimizer import ilp_available, optimize, selection_quality
+
+COLUMNS = ['protein', 'calories', 'sodium']
+
+def random_rows(rng, n, fractional=False):
+    rows = []
+    for i in range(n):
+        calories = rng.randrange(50, 900)
+        if fractional:
+            calories += rng.choice([0.25, 0.5, 0.75])
+        rows.append((i, f'Item {i}', 'Chain', float(rng.randrange(0, 60)), calories, float(rng.randrange(0, 2000))))
+    return rows
+
+def total(rows, column):
+    return sum(row[3 + COLUMNS.index(column)] for row in rows)
+
+def brute_force(rows, objective, minimums, maximums, item_limit, minimize=False):
+    """Best objective total over every subset meeting the bounds, or None if none does."""
+    best = None
+    for size in range(min(len(rows), item_limit or len(rows)) + 1):
+        for subset in itertools.combinations(rows, size):
+            if any(total(subset, column) < bound for column, bound in minimums.items()):
+                continue
+            if any(total(subset, column) > bound + 1e-9 for column, bound in maximums.items()):
+                continue
+            value = total(subset, objective)
+            if best is None or (value < best if minimize else value > best):
+                best = value
+    return best
+
+def exact_algorithms(dp=True):
+    algorithms = ['auto', 'bnb'] + (['dp'] if dp else [])
+    return algorithms + (['ilp'] if ilp_available() else [])
+
+@pytest.mark.parametrize('seed', range(8))
+def test_integer_calorie_limit_agrees_across_algorithms(seed):
+    rng = random.Random(seed)
+    rows = random_rows(rng, 10)
+    maximums = {'calories': rng.randrange(500, 2000)}
+    item_limit = rng.choice([None, 2, 4])
+    expected = brute_force(rows, 'protein', {}, maximums, item_limit)
+    
+    for algorithm in exact_algorithms():
+        selected, *_ = optimize(rows, COLUMNS, 'protein', maximums=maximums, item_limit=item_limit,
+                                algorithm=algorithm)
+        assert total(selected, 'protein') == pytest.approx(expected), algorithm
+        assert total(selected, 'calories') <= maximums['calories']
+
+@pytest.mark.parametrize('seed', range(8))
+def test_fractional_weights_are_not_truncated(seed):
+    rng = random.Random(seed)
+    rows = random_rows(rng, 10, fractional=True)
+    maximums = {'calories': rng.randrange(500, 2000)}
+    expected = brute_force(rows, 'protein', {}, maximums, 3)
+    
+    for algorithm in exact_algorithms(dp=False):
+        selected, used, *_ = optimize(rows, COLUMNS, 'protein', maximums=maximums, item_limit=3,
+                                      algorithm=algorithm)
+        assert used != 'dp'
+        assert total(selected, 'protein') == pytest.approx(expected), algorithm
+        assert total(selected, 'calories') <= maximums['calories']
+
+def test_dp_rejects_a_fractional_column():
+    # Truncated to whole calories, all three would fit under 10
+    rows = [(i, f'Item {i}', 'Chain', 10.0, 3.6, 0.0) for i in range(3)]
+    with pytest.raises(ValueError):
+        optimize(rows, COLUMNS, 'protein', maximums={'calories': 10}, algorithm='dp')
+    
+    selected, *_ = optimize(rows, COLUMNS, 'protein', maximums={'calories': 10})
+    assert len(selected) == 2
+
+def test_dp_rejects_a_fractional_limit():
+    rows = [(i, f'Item {i}', 'Chain', 10.0, 5.0, 0.0) for i in range(3)]
+    with pytest.raises(ValueError):
+        optimize(rows, COLUMNS, 'protein', maximums={'calories': 10.5}, algorithm='dp')
+
+@pytest.mark.parametrize('seed', range(6))
+def test_minimizing_with_minimums_agrees_with_brute_force(seed):
+    rng = random.Random(seed)
+    rows = random_rows(rng, 9)
+    minimums = {'protein': rng.randrange(20, 80)}
+    expected = brute_force(rows, 'sodium', minimums, {}, 3, minimize=True)
+    
+    for algorithm in exact_algorithms(dp=False):
+        selected, *_ = optimize(rows, COLUMNS, 'sodium', minimums=minimums, item_limit=3, minimize=True,
+                                algorithm=algorithm)
+        if expected is None:
+            assert selected == []
+        else:
+            assert total(selected, 'sodium') == pytest.approx(expected), algorithm
+            assert total(selected, 'protein') >= minimums['protein']
+
+@pytest.mark.parametrize('seed', range(20))
+def test_greedy_selection_meets_every_bound(seed):
+    rng = random.Random(seed)
+    n = 12
+    values = [rng.uniform(-5, 20) for _ in range(n)]
+    min_weights = [rng.uniform(0, 30) for _ in range(n)]
+    max_weights = [rng.uniform(0, 500) for _ in range(n)]
+    minimums = [(min_weights, rng.uniform(10, 60))]
+    maximums = [(max_weights, rng.uniform(300, 1500))]
+    item_limit = rng.choice([None, 3, 5])
+    
+    selected = greedy_selection(values, item_limit, minimums, maximums)
+    if selected is None:
+        return
+    assert len(set(selected)) == len(selected)
+    assert item_limit is None or len(selected) <= item_limit
+    assert sum(min_weights[i] for i in selected) >= minimums[0][1]
+    assert sum(max_weights[i] for i in selected) <= maximums[0][1]
+
+def test_explicit_bnb_stops_at_the_fallback_time_limit(menu_db, monkeypatch):
+    # Two packing bounds over the whole menu keep branch-and-bound searching for minutes
+    monkeypatch.setattr(optimizer, 'FALLBACK_TIME_LIMIT_MS', 300)
+    rows = ItemStore(menu_db).rows(COLUMNS)
+    maximums = {'calories': 1500, 'sodium': 2000}
+    start = time.perf_counter()
+    selected, algorithm, note, deadline = optimize(rows, COLUMNS, 'protein', maximums=maximums, algorithm='bnb')
+    
+    assert time.perf_counter() - start < 2
+    assert algorithm == 'bnb' and deadline is not None and deadline.hit
+    # Stopped by a cap the caller never set, so the note says it is not a proven optimum
+    assert '0.3 s cap' in note and '--time-limit-ms' in note
+    assert ('--algorithm ilp' in note) == backend_available()
+    assert selected and total(selected, 'calories') <= 1500 and total(selected, 'sodium') <= 2000
+    gap, bound = selection_quality(rows, COLUMNS, 'protein', selected, deadline=deadline)
+    assert bound >= total(selected, 'protein') and 0 <= gap < 1
+
+def test_bnb_under_the_callers_deadline_adds_no_note(menu_db):
+    rows = ItemStore(menu_db).rows(COLUMNS)
+    deadline = Deadline(300)
+    _, _, note, used = optimize(rows, COLUMNS, 'protein', maximums={'calories': 1500, 'sodium': 2000},
+                                algorithm='bnb', deadline=deadline)
+    assert used is deadline and deadline.hit
+    assert note is None
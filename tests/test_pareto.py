@@ -0,0 +1,90 @@
+import itertools
+import random
+
+import pytest
+
+from knapsack import Deadline
+from pareto import best_within, pareto_frontier
+
+COLUMNS = ['calories', 'protein', 'total_fat', 'sodium']
+
+def random_rows(rng, n):
+    """Rows shaped like ItemStore.rows(COLUMNS): (id, item, company, calories, protein, total_fat, sodium)."""
+    return [(i, f'Item {i}', 'Chain', rng.randrange(10, 400), float(rng.randrange(0, 40)),
+             float(rng.randrange(0, 30)), float(rng.randrange(0, 900))) for i in range(n)]
+
+def brute_force_frontier(rows, objectives, calorie_limit):
+    """Every distinct non-dominated (calories, totals) over all subsets within calorie_limit."""
+    indexes = [3 + COLUMNS.index(column) for column, _ in objectives]
+    signs = [-1 if sense == 'max' else 1 for _, sense in objectives]
+    points = set()
+    for size in range(len(rows) + 1):
+        for subset in itertools.combinations(rows, size):
+            calories = sum(row[3] for row in subset)
+            if calories <= calorie_limit:
+                points.add((calories,) + tuple(sum(row[index] for row in subset) for index in indexes))
+    
+    def key(point):
+        return (point[0],) + tuple(sign * value for sign, value in zip(signs, point[1:]))
+    
+    def dominates(a, b):
+        return a != b and all(x <= y for x, y in zip(key(a), key(b)))
+    
+    return sorted(point for point in points if not any(dominates(other, point) for other in points))
+
+def check_selections(frontier, objectives):
+    for calories, totals, selected in frontier:
+        assert sum(row[3] for row in selected) == calories
+        for (column, _), total in zip(objectives, totals):
+            assert sum(row[3 + COLUMNS.index(column)] for row in selected) == pytest.approx(total)
+        assert len({row[0] for row in selected}) == len(selected)
+
+@pytest.mark.parametrize('seed', range(10))
+def test_single_objective_frontier_matches_brute_force(seed):
+    rng = random.Random(seed)
+    rows = random_rows(rng, 9)
+    objectives = [('protein', 'max')]
+    calorie_limit = rng.randrange(200, 1500)
+    
+    frontier = pareto_frontier(rows, COLUMNS, calorie_limit, objectives)
+    assert [(calories,) + totals for calories, totals, _ in frontier] == \
+        brute_force_frontier(rows, objectives, calorie_limit)
+    check_selections(frontier, objectives)
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('objectives', [
+    [('protein', 'max'), ('total_fat', 'min')],
+    [('protein', 'max'), ('total_fat', 'min'), ('sodium', 'min')],
+])
+def test_label_frontier_matches_brute_force_at_unit_resolution(seed, objectives):
+    rng = random.Random(seed)
+    rows = random_rows(rng, 8)
+    calorie_limit = rng.randrange(200, 1200)
+    # With a step of 1 on whole numbers every grid cell holds one point, so pruning is exact
+    resolution = {column: 1 for column in COLUMNS}
+    
+    frontier = pareto_frontier(rows, COLUMNS, calorie_limit, objectives, resolution)
+    assert [calories for calories, _, _ in frontier] == sorted(calories for calories, _, _ in frontier)
+    assert sorted((calories,) + totals for calories, totals, _ in frontier) == \
+        brute_force_frontier(rows, objectives, calorie_limit)
+    check_selections(frontier, objectives)
+
+def test_best_within_ends_at_the_optimal_meal():
+    rng = random.Random(7)
+    rows = random_rows(rng, 9)
+    frontier = pareto_frontier(rows, COLUMNS, 1500, [('protein', 'max')])
+    for budget in (0, 150, 600, 1500):
+        best = max(sum(row[4] for row in subset)
+                   for size in range(len(rows) + 1) for subset in itertools.combinations(rows, size)
+                   if sum(row[3] for row in subset) <= budget)
+        assert best_within(frontier, budget)[-1][1][0] == best
+
+@pytest.mark.parametrize('objectives', [[('protein', 'max')], [('protein', 'max'), ('sodium', 'min')]])
+def test_an_expired_deadline_keeps_the_frontier_of_the_items_processed(objectives):
+    rows = random_rows(random.Random(3), 9)
+    deadline = Deadline(0)
+    frontier = pareto_frontier(rows, COLUMNS, 1500, objectives, deadline=deadline)
+    
+    assert deadline.hit
+    assert [calories for calories, _, _ in frontier] == [0]
+    check_selections(frontier, objectives)
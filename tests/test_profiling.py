@@ -0,0 +1,45 @@
+import io
+import json
+
+import profiling
+
+def test_spans_and_counters_are_recorded_only_while_enabled(tmp_path):
+    with profiling.span('ignored'):
+        profiling.count('ignored')
+    
+    profile = profiling.enable()
+    try:
+        with profiling.span('solve'):
+            with profiling.span('table'):
+                profiling.count('cells', 10)
+            with profiling.span('backtrack'):
+                pass
+            with profiling.span('table'):
+                profiling.count('cells', 5.0)
+        with profiling.span('write'):
+            pass
+    finally:
+        profiling.disable()
+    with profiling.span('ignored'):
+        profiling.count('cells')
+    
+    totals = profile.totals()
+    assert list(totals) == [('solve',), ('solve', 'table'), ('solve', 'backtrack'), ('write',)]
+    assert [calls for _, calls in totals.values()] == [1, 2, 1, 1]
+    assert totals[('solve',)][0] >= totals[('solve', 'table')][0] + totals[('solve', 'backtrack')][0]
+    assert profile.counters == {'cells': 15}
+    
+    report = io.StringIO()
+    profile.report(report)
+    lines = report.getvalue().splitlines()
+    assert [line.split()[0] for line in lines[3:7]] == ['solve', 'table', 'backtrack', 'write']
+    assert lines[4].startswith('  table')
+    assert 'cells' in lines[-1]
+    
+    path = str(tmp_path / 'trace.json')
+    profile.write_trace(path)
+    with open(path, encoding='utf-8') as file:
+        trace = json.load(file)
+    assert [(event['cat'], event['name']) for event in trace['traceEvents']] == \
+        [('root', 'solve'), ('solve', 'table'), ('solve', 'backtrack'), ('solve', 'table'), ('root', 'write')]
+    assert trace['counters'] == {'cells': 15}
@@ -0,0 +1,48 @@
+import pytest
+
+import planner
+from item_store import ItemStore
+from knapsack import DEFAULT_EPSILON, Deadline
+from planner import CostModel
+from queries import BNB_NAME, DP_NAME, GREEDY_NAME, ILP_NAME, MITM_NAME, OBJECTIVES, fptas_name, select_solver
+
+def test_a_deadline_keeps_the_exact_solver(catalog_db):
+    items = ItemStore(catalog_db).items('max-protein')
+    exact = {DP_NAME, ILP_NAME}
+
+    # A budget alone downgrades to a heuristic when every exact estimate is past it
+    name, _, note = select_solver('max-protein', 'auto', items, 3000, 5, budget_ms=1e-6)
+    assert name == GREEDY_NAME and note
+
+    for budget_ms in (None, 1e-6):
+        name, solver, note = select_solver('max-protein', 'auto', items, 3000, 5, budget_ms=budget_ms,
+                                           deadline=Deadline(1e-3))
+        assert name in exact and note is None
+        assert solver(items, 3000, 5)
+
+@pytest.mark.parametrize('command', ['max-calories', 'max-fat', 'max-carbs'])
+def test_auto_plans_protein_minimum_queries(catalog_db, monkeypatch, command):
+    items = ItemStore(catalog_db).items(command)
+    # The default estimates, whatever calibration file the working directory holds
+    monkeypatch.setattr(planner, '_cost_model', CostModel())
+    
+    # A small item limit makes meet-in-the-middle the cheapest exact method
+    name, solver, note = select_solver(command, 'auto', items, 30, 3)
+    assert name == MITM_NAME and note is None
+    exact = select_solver(command, 'bnb', items, 30, 3)[1](items, 30, 3)
+    assert sum(map(OBJECTIVES[command], solver(items, 30, 3))) == sum(map(OBJECTIVES[command], exact))
+    
+    name, _, _ = select_solver(command, 'auto', items, 30, None)
+    assert name in {BNB_NAME, ILP_NAME}
+    
+    # Past the budget the FPTAS answers if it fits, else the fastest exact method
+    name, _, note = select_solver(command, 'auto', items, 30, 3, budget_ms=1e-6)
+    assert name == MITM_NAME and note is None
+    monkeypatch.setattr(planner, '_cost_model', CostModel({method: (10.0, 0.0)
+                                                           for method in ('bnb', 'mitm', 'ilp_covering')}))
+    name, _, note = select_solver(command, 'auto', items, 30, 3)
+    assert name == fptas_name(DEFAULT_EPSILON) and note
+    
+    # A deadline keeps an exact solver
+    name, _, note = select_solver(command, 'auto', items, 30, 3, deadline=Deadline(1e3))
+    assert name in {BNB_NAME, ILP_NAME, MITM_NAME} and note is None
@@ -0,0 +1,82 @@
+import sqlite3
+
+from create_database import stamp_data_version
+from item_store import ItemStore
+import result_cache
+from knapsack import knapsack_max_protein
+from planner import dp_cells
+from result_cache import ResultCache, data_version
+
+def restamp(db_path):
+    """Give the database a new data version, as a rebuild or refresh would."""
+    conn = sqlite3.connect(db_path)
+    stamp_data_version(conn.cursor())
+    conn.commit()
+    version = data_version(conn)
+    conn.close()
+    return version
+
+def solve(cache, store, limit, item_limit=None, version=None):
+    items = store.items('max-protein')
+    return cache.solve('max-protein', 'dp', items, limit, item_limit, None, version or store.data_version)
+
+def test_results_are_keyed_on_the_data_version(catalog_db):
+    store = ItemStore(catalog_db)
+    cache = ResultCache()
+    
+    first = solve(cache, store, 1500, 3)
+    assert first[3] is False
+    assert solve(cache, store, 1500, 3) == first[:3] + (True,)
+    # Same problem, newer data
+    assert solve(cache, store, 1500, 3, version='newer')[3] is False
+    assert (cache.hits, cache.misses) == (1, 2)
+
+def test_persisted_results_from_older_data_are_dropped(catalog_copy):
+    store = ItemStore(catalog_copy)
+    solve(ResultCache(db_path=catalog_copy), store, 1500, 3)
+    assert solve(ResultCache(db_path=catalog_copy), store, 1500, 3)[3] is True
+    
+    version = restamp(catalog_copy)
+    cache = ResultCache(db_path=catalog_copy)
+    conn = sqlite3.connect(catalog_copy)
+    assert conn.execute('SELECT count(*) FROM result_cache').fetchone() == (0,)
+    conn.close()
+    assert solve(cache, store, 1500, 3, version=version)[3] is False
+
+def test_opening_a_current_cache_does_not_write(catalog_copy):
+    store = ItemStore(catalog_copy)
+    solve(ResultCache(db_path=catalog_copy), store, 1500, 3)
+    # Another writer holds the write lock, as the server's put would
+    writer = sqlite3.connect(catalog_copy)
+    writer.execute('BEGIN IMMEDIATE')
+    try:
+        assert solve(ResultCache(db_path=catalog_copy), store, 1500, 3)[3] is True
+    finally:
+        writer.rollback()
+        writer.close()
+
+def test_smaller_limits_are_answered_from_the_dp_table(catalog_db):
+    store = ItemStore(catalog_db)
+    items = store.items('max-protein')
+    cache = ResultCache()
+    
+    solve(cache, store, 3000, 6)
+    for limit, item_limit in [(3000, 6), (2000, 6), (2000, 2), (500, 1)]:
+        _, selected, _, _ = solve(cache, store, limit, item_limit)
+        expected = knapsack_max_protein(items, limit, item_limit)
+        assert sum(item[2] for item in selected) == sum(item[2] for item in expected)
+        assert sum(item[1] for item in selected) <= limit
+
+def test_tables_never_grow_past_the_dp_memory_limit(catalog_db, monkeypatch):
+    store = ItemStore(catalog_db)
+    items = store.items('max-protein')
+    cache = ResultCache()
+    # Room for the first table only; growing it to 8 items would not fit
+    monkeypatch.setattr(result_cache, 'DP_MEMORY_LIMIT', dp_cells(len(items), 3000, 6) / 8)
+    
+    for limit, item_limit, table in [(3000, 6, (3000, 6)), (2000, 8, (2000, 8)), (4000, 6, (2000, 8))]:
+        _, selected, _, _ = solve(cache, store, limit, item_limit)
+        expected = knapsack_max_protein(items, limit, item_limit)
+        assert sum(item[2] for item in selected) == sum(item[2] for item in expected)
+        assert sum(item[1] for item in selected) <= limit
+        assert [entry[:2] for entry in cache._tables.values()] == [table]
@@ -0,0 +1,81 @@
+import sqlite3
+
+import pytest
+
+from search import (CompanyIndex, company_predicate, has_table, item_predicate, load_company_index,
+                    normalize_name)
+
+COMPANIES = ["McDonald's", 'Burger King', 'Wendy’s', 'Taco Bell', 'Café Rio', 'Chick-fil-A', 'Five Guys',
+             'Five Guys Burgers']
+
+def test_names_are_folded_for_matching():
+    assert normalize_name("McDonald's") == 'mcdonalds'
+    assert normalize_name('Wendy’s') == 'wendys'
+    assert normalize_name('  Café   Rio ') == 'cafe rio'
+    assert normalize_name('Chick-fil-A') == 'chick fil a'
+    assert normalize_name("'") == ''
+
+@pytest.mark.parametrize('query, expected', [
+    # Exact normalized match wins over the prefix match it is also part of
+    ('five guys', ['Five Guys']),
+    ('MCDONALDS', ["McDonald's"]),
+    ('cafe rio', ['Café Rio']),
+    # Prefix
+    ('five', ['Five Guys', 'Five Guys Burgers']),
+    ('chick', ['Chick-fil-A']),
+    # Substring
+    ('king', ['Burger King']),
+    ('burger', ['Burger King']),
+    ('guys burgers', ['Five Guys Burgers']),
+    # Fuzzy
+    ('Mcdonlds', ["McDonald's"]),
+    ('wendis', ['Wendy’s']),
+    ('taco bel', ['Taco Bell']),
+    # Nothing
+    ('pizza hut', []),
+    ('', []),
+    ('!!', []),
+])
+def test_company_filters_resolve_by_tier(query, expected):
+    assert CompanyIndex.from_names(COMPANIES + [None]).resolve(query) == expected
+
+def test_the_index_is_loaded_from_the_companies_table_or_the_items(catalog_copy):
+    conn = sqlite3.connect(catalog_copy)
+    assert has_table(conn, 'companies')
+    assert load_company_index(conn).names == ['Chain 0', 'Chain 1', 'Chain 2']
+    
+    conn.execute('DROP TABLE companies')
+    assert load_company_index(conn).names == ['Chain 0', 'Chain 1', 'Chain 2']
+    assert load_company_index(conn).resolve('chain 1') == ['Chain 1']
+    conn.close()
+
+def matching_items(conn, where, params):
+    return sorted(row[0] for row in conn.execute(f'SELECT item FROM fast_food_items WHERE {where}', params))
+
+def test_item_search_matches_like_and_follows_later_writes(catalog_copy):
+    conn = sqlite3.connect(catalog_copy)
+    expected = matching_items(conn, 'item LIKE ?', ['%tem 1%'])
+    
+    where, params = item_predicate(conn, 'TEM 1')
+    assert 'item_search' in where
+    assert has_table(conn, 'item_search')
+    assert matching_items(conn, where, params) == expected
+    
+    conn.execute("UPDATE fast_food_items SET item = 'Renamed' WHERE item = 'Item 10'")
+    conn.execute("INSERT INTO fast_food_items (company, item, calories) VALUES ('Chain 0', 'Item 1000', 100)")
+    conn.execute("DELETE FROM fast_food_items WHERE item = 'Item 11'")
+    conn.commit()
+    expected = matching_items(conn, 'item LIKE ?', ['%tem 1%'])
+    assert 'Item 1000' in expected and 'Item 10' not in expected and 'Item 11' not in expected
+    assert matching_items(conn, where, params) == expected
+    
+    # Too short for a trigram: a LIKE scan
+    assert item_predicate(conn, 'm1') == ('item LIKE ?', ['%m1%'])
+    conn.close()
+
+def test_company_predicates_use_every_resolved_name(catalog_db):
+    conn = sqlite3.connect(catalog_db)
+    where, params = company_predicate(['Chain 0', 'Chain 2'])
+    assert {row[0] for row in conn.execute(f'SELECT company FROM fast_food_items WHERE {where}', params)} == \
+        {'Chain 0', 'Chain 2'}
+    conn.close()
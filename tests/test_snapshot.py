@@ -0,0 +1,79 @@
+import os
+import sqlite3
+
+import numpy as np
+import pytest
+
+from create_database import stamp_data_version
+from item_store import ItemStore, load_item_store
+from optimizer import NUTRIENT_COLUMNS
+from queries import QUERIES
+from snapshot import read_snapshot, snapshot_path, write_snapshot
+
+def test_snapshots_round_trip(tmp_path):
+    path = str(tmp_path / 'menu.snapshot')
+    names = ['Big Mac', None, 'Café Crème', '', 'Pão de Queijo']
+    matrix = np.arange((2 + len(NUTRIENT_COLUMNS)) * len(names), dtype=np.float64).reshape(-1, len(names))
+    matrix[3, 1] = np.nan
+    write_snapshot(path, matrix, names, ["McDonald's", 'Café Rouge'], 'v1')
+    
+    mapped, mapped_names, company_names, version = read_snapshot(path)
+    np.testing.assert_array_equal(mapped, matrix)
+    assert list(mapped_names) == names
+    assert mapped_names.take(np.array([4, 1, 2])) == ['Pão de Queijo', None, 'Café Crème']
+    assert company_names == ["McDonald's", 'Café Rouge']
+    assert version == 'v1'
+    assert os.listdir(tmp_path) == ['menu.snapshot']
+
+def test_the_build_writes_a_snapshot_matching_sqlite(catalog_db):
+    matrix, names, company_names, version = read_snapshot(snapshot_path(catalog_db))
+    store = ItemStore(catalog_db)
+    
+    assert version == store.data_version
+    assert company_names == store.company_names
+    assert list(names) == store.names
+    np.testing.assert_array_equal(matrix, store.matrix)
+    
+    mapped = ItemStore.from_snapshot(snapshot_path(catalog_db))
+    for command in QUERIES:
+        assert mapped.items(command) == store.items(command)
+        assert mapped.items(command, 'chain 1') == store.items(command, 'chain 1')
+
+def test_unreadable_snapshots_are_rejected(catalog_db, tmp_path):
+    with open(snapshot_path(catalog_db), 'rb') as file:
+        data = file.read()
+    for name, content in [('garbage', b'not a snapshot' * 100), ('short', b'FFSNAPSH'),
+                          ('truncated', data[:len(data) - 10])]:
+        path = str(tmp_path / f'{name}.snapshot')
+        with open(path, 'wb') as file:
+            file.write(content)
+        with pytest.raises(ValueError):
+            read_snapshot(path)
+
+@pytest.mark.parametrize('damage', ['missing', 'stale', 'corrupt', 'truncated'])
+def test_load_item_store_falls_back_to_sqlite_and_rewrites_the_snapshot(catalog_db, catalog_copy, damage):
+    path = snapshot_path(catalog_copy)
+    if damage == 'stale':
+        write_snapshot(path, *read_snapshot(snapshot_path(catalog_db)))
+        conn = sqlite3.connect(catalog_copy)
+        stamp_data_version(conn.cursor())
+        conn.commit()
+        conn.close()
+    elif damage == 'corrupt':
+        with open(path, 'wb') as file:
+            file.write(os.urandom(8192))
+    elif damage == 'truncated':
+        with open(snapshot_path(catalog_db), 'rb') as file:
+            data = file.read()
+        with open(path, 'wb') as file:
+            file.write(data[:len(data) // 2])
+    
+    store = load_item_store(catalog_copy)
+    expected = ItemStore(catalog_copy)
+    assert store.data_version == expected.data_version
+    np.testing.assert_array_equal(store.matrix, expected.matrix)
+    assert store.items('max-protein') == expected.items('max-protein')
+    
+    # The rewritten snapshot now serves the next load
+    assert read_snapshot(path)[3] == expected.data_version
+    assert load_item_store(catalog_copy).items('max-protein') == expected.items('max-protein')
@@ -0,0 +1,101 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from item_store import ItemStore
+from queries import ALGORITHMS
+from solver_server import SolverHTTPServer, make_handler, solve_request
+
+@pytest.fixture(scope='module')
+def store(catalog_db):
+    return ItemStore(catalog_db)
+
+@pytest.fixture(scope='module')
+def server(store):
+    server = SolverHTTPServer(('127.0.0.1', 0), make_handler(store))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+def post(server, body, path='/solve'):
+    """(status, decoded JSON body) of a POST with the given raw body."""
+    request = urllib.request.Request(f'http://{server}{path}', data=body,
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def test_solves_a_valid_request(server):
+    status, body = post(server, json.dumps({'command': 'max-fat', 'limit': 20, 'items': 2}).encode())
+    assert status == 200
+    assert 0 < len(body['items']) <= 2
+
+@pytest.mark.parametrize('body', [b'[]', b'1', b'"max-fat"', b'null', b'{"command": "max-fat",'])
+def test_rejects_bodies_that_are_not_objects(server, body):
+    status, response = post(server, body)
+    assert status == 400
+    assert response['error']
+
+@pytest.mark.parametrize('request_body', [
+    {'command': 'max-everything', 'limit': 20},
+    {'command': ['max-fat'], 'limit': 20},
+    {'command': 'max-fat'},
+    {'command': 'max-fat', 'limit': 20, 'algorithm': 'dp'},
+    {'command': 'max-protein', 'limit': 800, 'algorithm': 'mitm'},
+    {'command': 'max-protein', 'limit': 800, 'time_limit_ms': -5},
+    {'command': 'max-protein', 'limit': 800, 'algorithm': 'fptas', 'epsilon': 2},
+])
+def test_rejects_invalid_requests(server, request_body):
+    status, response = post(server, json.dumps(request_body).encode())
+    assert status == 400
+    assert response['error']
+
+@pytest.mark.parametrize('request_body, field', [
+    ({'command': 'max-protein', 'limit': 1500.5}, 'limit'),
+    ({'command': 'max-protein', 'limit': True}, 'limit'),
+    ({'command': 'max-fat', 'limit': True}, 'limit'),
+    ({'command': 'max-fat', 'limit': 20, 'items': '3'}, 'items'),
+    ({'command': 'max-fat', 'limit': 20, 'items': 2.5}, 'items'),
+    ({'command': 'max-fat', 'limit': 20, 'items': True}, 'items'),
+    ({'command': 'max-calorie-protein', 'items': 0}, 'items'),
+    ({'command': 'max-fat', 'limit': 20, 'company': 5}, 'company'),
+    ({'command': 'max-protein', 'limit': 800, 'company': ['Chain 1']}, 'company'),
+    ({'command': 'max-protein', 'limit': 800, 'company': {'name': 'Chain 1'}}, 'company'),
+])
+def test_rejects_limits_and_item_counts_of_the_wrong_kind(server, request_body, field):
+    # Named by the check that rejects them, not by whatever the solver makes of them
+    status, response = post(server, json.dumps(request_body).encode())
+    assert status == 400
+    assert f"'{field}'" in response['error']
+
+def test_whole_numbers_sent_as_floats_are_accepted(store):
+    response = solve_request(store, {'command': 'max-protein', 'limit': 800.0, 'items': 3.0})
+    assert 0 < len(response['items']) <= 3
+
+def test_unknown_paths_are_not_found(server):
+    assert post(server, b'{}', path='/solver')[0] == 404
+
+def test_every_listed_algorithm_is_accepted(store):
+    for command, algorithms in ALGORITHMS.items():
+        for algorithm in algorithms:
+            response = solve_request(store, {'command': command, 'limit': 30, 'items': 3, 'algorithm': algorithm})
+            assert response['algorithm'], (command, algorithm)
+
+def test_solver_failures_get_a_json_server_error(server, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError('solver crashed')
+    monkeypatch.setattr('solver_server.solve_request', fail)
+    
+    status, response = post(server, json.dumps({'command': 'max-fat', 'limit': 20}).encode())
+    assert status == 500
+    assert 'solver crashed' in response['error']
+    # The server keeps answering
+    monkeypatch.undo()
+    assert post(server, json.dumps({'command': 'max-fat', 'limit': 20, 'items': 2}).encode())[0] == 200
@@ -0,0 +1,63 @@
+import math
+
+import numpy as np
+import pytest
+
+from conftest import catalog_rows
+from create_database import COLUMNS, load_rows
+from synthetic_catalog import CatalogModel, company_names, generate_rows, write_csv
+
+def test_generated_rows_stay_within_the_fitted_values():
+    rows = catalog_rows(200)
+    model = CatalogModel.fit(rows)
+    generated = list(generate_rows(model, 500, company_count=4, seed=1, batch_size=64))
+    
+    assert len(generated) == 500
+    assert len({(row[0], row[1]) for row in generated}) == 500
+    assert [sum(row[0] == company for row in generated) for company in company_names(4)] == [125] * 4
+    for column in range(2, len(COLUMNS)):
+        real = [row[column] for row in rows if row[column] is not None]
+        for row in generated:
+            value = row[column]
+            if value is not None:
+                assert min(real) <= value <= max(real)
+                # Whole-number columns come out as whole numbers
+                assert value == int(value)
+    # Some NULLs are carried over from the real rows' patterns
+    assert any(value is None for row in generated for value in row[2:])
+
+def test_the_same_seed_gives_the_same_rows():
+    model = CatalogModel.fit(catalog_rows(100))
+    assert list(generate_rows(model, 50, seed=3)) == list(generate_rows(model, 50, seed=3))
+    assert list(generate_rows(model, 50, seed=3)) != list(generate_rows(model, 50, seed=4))
+
+def test_correlated_columns_stay_correlated():
+    rng = np.random.default_rng(0)
+    rows = []
+    for i in range(400):
+        calories = float(rng.integers(100, 1000))
+        fat = round(calories / 20 + float(rng.normal(0, 3)))
+        rows.append(['Chain', f'Item {i}', calories] + [fat] * (len(COLUMNS) - 3))
+    generated = list(generate_rows(CatalogModel.fit(rows), 2000, seed=0))
+    calories = [row[2] for row in generated]
+    fat = [row[3] for row in generated]
+    assert np.corrcoef(calories, fat)[0, 1] > 0.8
+
+def test_written_csvs_load_back(tmp_path):
+    model = CatalogModel.fit(catalog_rows(100))
+    generated = list(generate_rows(model, 30, company_count=3, seed=2))
+    path = tmp_path / 'menu.csv'
+    assert write_csv(generated, str(path)) == 30
+    
+    loaded = sorted(load_rows(str(tmp_path)))
+    assert len(loaded) == 30
+    for row, expected in zip(loaded, sorted(generated)):
+        assert row[:2] == expected[:2]
+        assert all((a is None and b is None) or math.isclose(a, b) for a, b in zip(row[2:], expected[2:]))
+
+def test_fitting_needs_a_value_in_every_column():
+    rows = catalog_rows(20)
+    for row in rows:
+        row[5] = None
+    with pytest.raises(ValueError):
+        CatalogModel.fit(rows)